@@ -14,9 +14,16 @@ Usage:
 """
 
 import argparse
-import re
+import queue
+import sqlite3
 import sys
+import threading
+import time
+from concurrent.futures import Future
+# Future.result() raises this; before Python 3.11 it is not the builtin TimeoutError
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
 
 try:
     from flask import Flask, jsonify, render_template, request
@@ -25,15 +32,29 @@ except ImportError:
     print("  pip install flask")
     sys.exit(1)
 
+try:
+    import orjson
+except ImportError:  # optional speedup — fall back to Flask's stdlib-based JSON
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # optional speedup — fall back to manual field checks
+    msgspec = None
+
 from store import (
     DEFAULT_DB_PATH,
     deactivate_subscription,
     get_connection,
     init_db,
+    start_wal_checkpointer,
     upsert_subscription,
 )
 
 app = Flask(__name__, template_folder=".")
+# Subscribe payloads are well under 1 KB; Werkzeug rejects anything larger with
+# 413 before the body is read or parsed.
+app.config["MAX_CONTENT_LENGTH"] = 4096
 
 # Set at startup by main()
 _DB_PATH = DEFAULT_DB_PATH
@@ -45,11 +66,124 @@ VALID_CATEGORIES = {
     "DV",
 }
 
-_EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+# index.html has no per-request context, so it is rendered once and reused
+_index_html: str | None = None
+# unsubscribe.html only needs the email, so the compiled template is kept and
+# rendered directly (no per-request lookup or context processors)
+_unsubscribe_template = None
+
+if msgspec is not None:
+    class _SubscribeRequest(msgspec.Struct):
+        """Shape of the /api/subscribe body; msgspec parses and type-checks it in one pass."""
+        email: Optional[str] | msgspec.UnsetType = msgspec.UNSET
+        categories: Optional[List[str]] | msgspec.UnsetType = msgspec.UNSET
+
+    _subscribe_decoder = msgspec.json.Decoder(_SubscribeRequest)
+
+# Each thread keeps one long-lived connection instead of reopening per request.
+# Writers share _db_write_lock so concurrent writes don't surface SQLITE_BUSY.
+_conn_local = threading.local()
+_db_write_lock = threading.Lock()
+
+# Subscription writes are funnelled through a single background writer thread,
+# which drains the queue and commits up to _WRITE_BATCH_SIZE upserts per transaction.
+_WRITE_BATCH_SIZE = 200
+_WRITE_BATCH_WAIT = 0.02  # seconds to wait for more items before committing a batch
+_WRITE_TIMEOUT = 5  # seconds a request waits for its write to be committed
+
+_write_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+_writer_thread: threading.Thread | None = None
+_writer_start_lock = threading.Lock()
 
 
 def _validate_email(email: str) -> bool:
-    return bool(_EMAIL_RE.match(email.strip()))
+    """
+    Accept local@domain.tld-shaped addresses: exactly one '@' with text before it,
+    a '.' in the domain with text on both sides, and no whitespace.
+
+    Same rule as the regex ^[^@\\s]+@[^@\\s]+\\.[^@\\s]+$, checked with str methods.
+    """
+    email = email.strip()
+    at = email.find("@")
+    if at <= 0 or at != email.rfind("@"):
+        return False
+    dot = email.find(".", at + 2)
+    return dot != -1 and dot < len(email) - 1 and len(email.split()) == 1
+
+
+# (unix second, ISO-8601 string) for the most recent timestamp handed out
+_timestamp_cache: tuple = (0, "")
+
+
+def _now_iso() -> str:
+    """UTC ISO-8601 timestamp at second resolution, formatted at most once per second."""
+    global _timestamp_cache
+    now = int(time.time())
+    cached = _timestamp_cache
+    if cached[0] != now:
+        cached = (now, datetime.fromtimestamp(now, timezone.utc).isoformat())
+        _timestamp_cache = cached
+    return cached[1]
+
+
+def _json(payload: Dict[str, Any]):
+    """Serialise a JSON response body, using orjson when it is installed."""
+    if orjson is None:
+        return jsonify(payload)
+    return app.response_class(orjson.dumps(payload), mimetype="application/json")
+
+
+def _request_json() -> Any:
+    """Parse the request body as JSON; None if it is not JSON (like get_json(silent=True))."""
+    if orjson is None:
+        return request.get_json(silent=True)
+    if not request.is_json:
+        return None
+    try:
+        return orjson.loads(request.get_data())
+    except orjson.JSONDecodeError:
+        return None
+
+
+def _fields_from_body(body: Any) -> Tuple[Any, Any, Optional[str]]:
+    """Pick email and categories out of a parsed JSON body, rejecting wrongly typed values."""
+    if not body or not isinstance(body, dict):
+        return None, None, "Request body must be JSON."
+    email = body.get("email")
+    categories = body.get("categories")
+    if email is not None and not isinstance(email, str):
+        return None, None, "Invalid email address."
+    if isinstance(categories, list) and not all(isinstance(c, str) for c in categories):
+        return None, None, "Categories must be a list of strings."
+    return email, categories, None
+
+
+def _subscribe_fields() -> Tuple[Any, Any, Optional[str]]:
+    """
+    Return (email, categories, error) from the subscribe body. error is None on success;
+    otherwise email and categories are None and error is the message to return.
+
+    With msgspec, well-formed bodies are decoded in one pass; anything the Struct
+    rejects or cannot tell apart (an empty object) goes through _fields_from_body,
+    so both paths give the same error for the same input.
+    """
+    if msgspec is None:
+        return _fields_from_body(_request_json())
+
+    if not request.is_json:
+        return None, None, "Request body must be JSON."
+    data = request.get_data()
+    try:
+        req = _subscribe_decoder.decode(data)
+    except msgspec.ValidationError:
+        return _fields_from_body(msgspec.json.decode(data))
+    except msgspec.DecodeError:
+        return None, None, "Request body must be JSON."
+    if req.email is msgspec.UNSET and req.categories is msgspec.UNSET:
+        return _fields_from_body(msgspec.json.decode(data))
+    email = None if req.email is msgspec.UNSET else req.email
+    categories = None if req.categories is msgspec.UNSET else req.categories
+    return email, categories, None
 
 
 def _client_ip() -> str | None:
@@ -60,14 +194,107 @@ def _client_ip() -> str | None:
     return request.remote_addr
 
 
+def _get_conn() -> sqlite3.Connection:
+    """Return this thread's pooled connection, opening it on first use."""
+    conn = getattr(_conn_local, "conn", None)
+    if conn is None:
+        conn = get_connection(_DB_PATH)
+        _conn_local.conn = conn
+    return conn
+
+
+# ---------------------------------------------------------------------------
+# Background subscription writer
+# ---------------------------------------------------------------------------
+
+
+def _commit_batch(conn, batch: List[Dict[str, Any]]) -> None:
+    """Upsert a batch in one transaction, resolving each item's future."""
+    try:
+        with _db_write_lock, conn:
+            results = [upsert_subscription(conn, commit=False, **item["params"]) for item in batch]
+    except Exception as e:
+        if len(batch) == 1:
+            batch[0]["future"].set_exception(e)
+            return
+        # One bad item must not fail the whole batch — retry each on its own.
+        for item in batch:
+            _commit_batch(conn, [item])
+        return
+    for item, result in zip(batch, results):
+        item["future"].set_result(result)
+
+
+def _writer_loop() -> None:
+    conn = None
+    while True:
+        batch = [_write_queue.get()]
+        while len(batch) < _WRITE_BATCH_SIZE:
+            try:
+                batch.append(_write_queue.get(timeout=_WRITE_BATCH_WAIT))
+            except queue.Empty:
+                break
+        # Skip items whose request already gave up waiting (see _submit_subscription);
+        # the rest are marked running so they can no longer be cancelled.
+        batch = [item for item in batch if item["future"].set_running_or_notify_cancel()]
+        if not batch:
+            continue
+        # Opened here rather than before the loop so a failure (e.g. the database
+        # is locked) fails this batch instead of killing the thread.
+        if conn is None:
+            try:
+                conn = _get_conn()
+            except Exception as e:
+                for item in batch:
+                    item["future"].set_exception(e)
+                continue
+        _commit_batch(conn, batch)
+
+
+def _submit_subscription(**params: Any) -> Dict[str, Any]:
+    """
+    Queue an upsert for the writer thread and block until it is committed.
+
+    Raises FutureTimeoutError if the writer has not picked the item up within
+    _WRITE_TIMEOUT; the item is cancelled and will never be written. Once the
+    writer has started on it, waits for the commit so the caller gets the real outcome.
+    """
+    global _writer_thread
+    if _writer_thread is None or not _writer_thread.is_alive():
+        with _writer_start_lock:
+            if _writer_thread is None or not _writer_thread.is_alive():
+                _writer_thread = threading.Thread(
+                    target=_writer_loop, name="subscription-writer", daemon=True
+                )
+                _writer_thread.start()
+    future: Future = Future()
+    _write_queue.put({"params": params, "future": future})
+    try:
+        return future.result(timeout=_WRITE_TIMEOUT)
+    except FutureTimeoutError:
+        if future.cancel():
+            raise
+        return future.result()
+
+
 # ---------------------------------------------------------------------------
 # Routes
 # ---------------------------------------------------------------------------
 
 
+@app.errorhandler(413)
+def request_too_large(_error):
+    return _json({"status": "error", "message": "Request body too large."}), 413
+
+
 @app.route("/")
 def index():
-    return render_template("index.html")
+    global _index_html
+    if app.debug:
+        return render_template("index.html")  # pick up template edits while developing
+    if _index_html is None:
+        _index_html = render_template("index.html")
+    return _index_html
 
 
 @app.route("/api/subscribe", methods=["POST"])
@@ -81,46 +308,52 @@ def subscribe():
         {"status": "updated",      "email": "...", "categories": [...], "previous_categories": [...]}
         {"status": "resubscribed", "email": "...", "categories": [...], "previous_categories": [...]}
 
-    Error responses (HTTP 400 / 500):
+    Error responses (HTTP 400 / 500 / 503):
         {"status": "error", "message": "..."}
+
+    503 means the write queue was too backed up; nothing was saved and the
+    request can be retried.
     """
-    body = request.get_json(silent=True)
-    if not body:
-        return jsonify({"status": "error", "message": "Request body must be JSON."}), 400
+    raw_email, raw_cats, error = _subscribe_fields()
+    if error is not None:
+        return _json({"status": "error", "message": error}), 400
 
     # Validate email
-    email = (body.get("email") or "").strip().lower()
+    email = (raw_email or "").strip().lower()
     if not email:
-        return jsonify({"status": "error", "message": "Email is required."}), 400
+        return _json({"status": "error", "message": "Email is required."}), 400
     if not _validate_email(email):
-        return jsonify({"status": "error", "message": "Invalid email address."}), 400
+        return _json({"status": "error", "message": "Invalid email address."}), 400
 
     # Validate categories
-    raw_cats = body.get("categories")
     if not isinstance(raw_cats, list) or len(raw_cats) == 0:
-        return jsonify({"status": "error", "message": "Select at least one visa category."}), 400
-    invalid = [c for c in raw_cats if c not in VALID_CATEGORIES]
-    if invalid:
-        return jsonify({
+        return _json({"status": "error", "message": "Select at least one visa category."}), 400
+    cat_set = set(raw_cats)
+    if not cat_set.issubset(VALID_CATEGORIES):
+        invalid = sorted(cat_set - VALID_CATEGORIES)
+        return _json({
             "status": "error",
-            "message": f"Unknown category/categories: {', '.join(sorted(invalid))}",
+            "message": f"Unknown category/categories: {', '.join(invalid)}",
         }), 400
     # Deduplicate and sort for stable storage
-    categories = sorted(set(raw_cats))
+    categories = sorted(cat_set)
 
     try:
-        now = datetime.now(timezone.utc).isoformat()
-        with get_connection(_DB_PATH) as conn:
-            result = upsert_subscription(
-                conn,
-                email=email,
-                categories=categories,
-                subscribed_at=now,
-                ip_address=_client_ip(),
-                user_agent=request.headers.get("User-Agent"),
-            )
+        now = _now_iso()
+        result = _submit_subscription(
+            email=email,
+            categories=categories,
+            subscribed_at=now,
+            ip_address=_client_ip(),
+            user_agent=request.headers.get("User-Agent"),
+        )
+    except FutureTimeoutError:
+        return _json({
+            "status": "error",
+            "message": "Server is busy; your subscription was not saved. Please try again.",
+        }), 503
     except Exception as e:
-        return jsonify({"status": "error", "message": f"Database error: {e}"}), 500
+        return _json({"status": "error", "message": f"Database error: {e}"}), 500
 
     # Don't expose unsubscribe_token to the browser
     response = {
@@ -131,7 +364,7 @@ def subscribe():
     if result["previous_categories"] is not None:
         response["previous_categories"] = result["previous_categories"]
 
-    return jsonify(response), 200
+    return _json(response), 200
 
 
 @app.route("/api/unsubscribe")
@@ -144,21 +377,27 @@ def unsubscribe():
     """
     token = (request.args.get("token") or "").strip()
     if not token:
-        return jsonify({"status": "error", "message": "Missing unsubscribe token."}), 400
+        return _json({"status": "error", "message": "Missing unsubscribe token."}), 400
 
     try:
-        with get_connection(_DB_PATH) as conn:
+        conn = _get_conn()
+        with _db_write_lock, conn:
             subscription = deactivate_subscription(conn, token)
     except Exception as e:
-        return jsonify({"status": "error", "message": f"Database error: {e}"}), 500
+        return _json({"status": "error", "message": f"Database error: {e}"}), 500
 
     if subscription is None:
-        return jsonify({
+        return _json({
             "status": "error",
             "message": "Invalid or already-used unsubscribe link.",
         }), 400
 
-    return render_template("unsubscribe.html", email=subscription["email"])
+    global _unsubscribe_template
+    if app.debug:
+        return render_template("unsubscribe.html", email=subscription["email"])
+    if _unsubscribe_template is None:
+        _unsubscribe_template = app.jinja_env.get_template("unsubscribe.html")
+    return _unsubscribe_template.render(email=subscription["email"])
 
 
 # ---------------------------------------------------------------------------
@@ -181,6 +420,7 @@ def main():
     args = _parse_args()
     _DB_PATH = args.db
     init_db(_DB_PATH)
+    start_wal_checkpointer(_DB_PATH)
     print(f"[APP] Starting on http://{args.host}:{args.port}")
     print(f"[APP] Database: {_DB_PATH}")
     app.run(host=args.host, port=args.port, debug=args.debug)
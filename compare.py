@@ -7,6 +7,7 @@ Intended to be used alongside store.py for historical comparison.
 """
 
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Any, Dict, List, Optional
 
 
@@ -34,11 +35,30 @@ _EB_ORDINAL_TO_CODE = {
     "5th": "EB-5",
 }
 
+# Ordinals are all three characters long, so a prefix match such as
+# "1st Preference" is a single lookup on the lowercased first three characters.
+_EB_PREFIX_TO_CODE = {ordinal.lower(): code for ordinal, code in _EB_ORDINAL_TO_CODE.items()}
+
+# Legacy / alternate identity keys, checked in priority order
+_LEGACY_IDENTITY_KEYS = (
+    "visa_category",
+    "preference_level",
+    "family_preference",
+    "employment_preference",
+    "category",
+)
+
 # String values that mean "immediately available / no backlog"
 _CURRENT_VALUES = frozenset({"c", "current"})
 
-# Date formats used in visa bulletins (e.g. "01 JAN 26" or "01JAN26")
-_DATE_FORMATS = ("%d %b %y", "%d%b%y", "%d %b %Y", "%d%b%Y")
+# Date formats used in visa bulletins (e.g. "01JAN26" or "01 JAN 26"), most common first
+_DATE_FORMATS = ("%d%b%y", "%d %b %y", "%d %b %Y", "%d%b%Y")
+
+# Month abbreviations for the compact "DDMMMYY" fast path in _parse_date
+_MONTH_ABBREVIATIONS = {
+    "JAN": 1, "FEB": 2, "MAR": 3, "APR": 4, "MAY": 5, "JUN": 6,
+    "JUL": 7, "AUG": 8, "SEP": 9, "OCT": 10, "NOV": 11, "DEC": 12,
+}
 
 
 def _derive_category_key(category: Dict[str, Any]) -> str:
@@ -52,13 +72,10 @@ def _derive_category_key(category: Dict[str, Any]) -> str:
     eb = category.get("employment-based")
     if eb:
         eb_clean = str(eb).strip()
-        code = _EB_ORDINAL_TO_CODE.get(eb_clean)
+        # Exact ordinal, or prefix match for entries like "1st Preference"
+        code = _EB_ORDINAL_TO_CODE.get(eb_clean) or _EB_PREFIX_TO_CODE.get(eb_clean[:3].lower())
         if code:
             return code
-        # Try prefix match for entries like "1st Preference"
-        for ordinal, mapped_code in _EB_ORDINAL_TO_CODE.items():
-            if eb_clean.lower().startswith(ordinal):
-                return mapped_code
         return eb_clean  # e.g. "Other Workers"
 
     # Diversity Visa: key per region
@@ -67,16 +84,11 @@ def _derive_category_key(category: Dict[str, Any]) -> str:
         return f"DV-{str(region).strip()}"
 
     # Legacy / alternate formats
-    for key in (
-        "visa_category",
-        "preference_level",
-        "family_preference",
-        "employment_preference",
-        "category",
-    ):
-        value = category.get(key)
-        if value:
-            return str(value).strip()
+    legacy = next(
+        (str(category[k]).strip() for k in _LEGACY_IDENTITY_KEYS if category.get(k)), None
+    )
+    if legacy is not None:
+        return legacy
 
     # Fallback: deterministic string from sorted items
     return str(sorted(category.items()))
@@ -93,9 +105,27 @@ def _build_category_index(
     return index
 
 
+@lru_cache(maxsize=4096)
 def _parse_date(value: str) -> Optional[datetime]:
-    """Attempt to parse a visa bulletin date string. Returns None if unparseable."""
+    """
+    Attempt to parse a visa bulletin date string. Returns None if unparseable.
+
+    Results are memoised: a bulletin repeats the same cutoff date across many
+    regions, so most calls are cache hits.
+    """
     value = value.strip()
+
+    # Fast path: the compact "DDMMMYY" layout, parsed without strptime.
+    # Two-digit years follow strptime's %y pivot (69-99 → 19xx, 00-68 → 20xx).
+    if len(value) == 7 and value.isascii():
+        month = _MONTH_ABBREVIATIONS.get(value[2:5].upper())
+        if month is not None and value[:2].isdigit() and value[5:].isdigit():
+            yy = int(value[5:])
+            try:
+                return datetime(1900 + yy if yy >= 69 else 2000 + yy, month, int(value[:2]))
+            except ValueError:
+                return None
+
     for fmt in _DATE_FORMATS:
         try:
             return datetime.strptime(value, fmt)
@@ -104,6 +134,7 @@ def _parse_date(value: str) -> Optional[datetime]:
     return None
 
 
+@lru_cache(maxsize=256)
 def _is_current(value: str) -> bool:
     """Return True if the value represents 'immediately available' (e.g. 'C' or 'Current')."""
     return value.strip().lower() in _CURRENT_VALUES
@@ -124,6 +155,10 @@ def _diff_date_field(
         lost_current   - was "Current", now a specific date
         changed        - value changed but dates could not be parsed
     """
+    # Most fields are unchanged between bulletins: skip the strips for exact matches
+    if current_val is previous_val or current_val == previous_val:
+        return None
+
     c_norm = current_val.strip()
     p_norm = previous_val.strip()
 
@@ -150,6 +185,17 @@ def _diff_date_field(
     return change
 
 
+def _diff_field(field: str, c_val: Any, p_val: Any) -> Optional[Dict[str, Any]]:
+    """Compare one field's current and previous values; None if there is no change."""
+    if c_val is None and p_val is None:
+        return None
+    if p_val is None:
+        return {"field": field, "previous": None, "current": str(c_val), "direction": "added"}
+    if c_val is None:
+        return {"field": field, "previous": str(p_val), "current": None, "direction": "removed"}
+    return _diff_date_field(field, str(c_val), str(p_val))
+
+
 def _diff_category(
     key: str,
     current_cat: Dict[str, Any],
@@ -158,33 +204,23 @@ def _diff_category(
     """
     Produce a field-level diff for a single category.
     Returns None if identical; otherwise a dict with 'category_key' and 'field_changes'.
+
+    Field changes follow the current row's column order, followed by any fields only
+    the previous row had — no per-category union set or sort is needed.
     """
-    all_fields = set(current_cat) | set(previous_cat)
     field_changes: List[Dict[str, Any]] = []
 
-    for field in sorted(all_fields):
+    for field, c_val in current_cat.items():
         if field in _IDENTITY_KEYS:
             continue
+        change = _diff_field(field, c_val, previous_cat.get(field))
+        if change is not None:
+            field_changes.append(change)
 
-        c_val = current_cat.get(field)
-        p_val = previous_cat.get(field)
-
-        if c_val is None and p_val is None:
-            continue
-
-        if p_val is None:
-            field_changes.append(
-                {"field": field, "previous": None, "current": str(c_val), "direction": "added"}
-            )
-            continue
-
-        if c_val is None:
-            field_changes.append(
-                {"field": field, "previous": str(p_val), "current": None, "direction": "removed"}
-            )
+    for field, p_val in previous_cat.items():
+        if field in current_cat or field in _IDENTITY_KEYS:
             continue
-
-        change = _diff_date_field(field, str(c_val), str(p_val))
+        change = _diff_field(field, None, p_val)
         if change is not None:
             field_changes.append(change)
 
@@ -226,7 +262,13 @@ def compare_bulletins(
         categories_changed: List[Dict[str, Any]] = []
         total_field_changes = 0
         for key in sorted(common_keys):
-            diff = _diff_category(key, current_index[key], previous_index[key])
+            current_cat = current_index[key]
+            previous_cat = previous_index[key]
+            # Whole-row equality is a single C-level dict compare; only rows that
+            # differ somewhere need the per-field walk.
+            if current_cat == previous_cat:
+                continue
+            diff = _diff_category(key, current_cat, previous_cat)
             if diff is not None:
                 categories_changed.append(diff)
                 total_field_changes += len(diff["field_changes"])
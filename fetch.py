@@ -13,23 +13,53 @@ Usage:
 """
 
 import argparse
+import contextlib
 import re
+import sqlite3
 import sys
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
 try:
     import requests
-    from bs4 import BeautifulSoup
+    from bs4 import BeautifulSoup, SoupStrainer
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
 except ImportError:
     print("[ERROR] Required packages not found. Please install them:")
     print("  pip install requests beautifulsoup4")
     sys.exit(1)
 
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # optional speedup — fall back to BeautifulSoup
+    LexborHTMLParser = None
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # optional speedup — fall back to BeautifulSoup
+    lxml = None
+
 from parser import parse_bulletin_html
-from persist import save_to_json, save_with_timestamp, load_from_json, format_data_for_display
-from store import DEFAULT_DB_PATH, init_db, get_connection, insert_run, get_last_successful_run, insert_comparison, get_runs
+from persist import save_to_json, save_with_timestamp, format_data_for_display
+from store import (
+    DEFAULT_DB_PATH,
+    get_cached_parse,
+    get_connection,
+    get_http_cache,
+    get_last_successful_run,
+    get_runs,
+    init_db,
+    insert_comparison,
+    insert_run,
+    set_cached_parse,
+    upsert_http_cache,
+)
 from compare import compare_bulletins, format_comparison_for_display
 
 
@@ -43,42 +73,187 @@ USER_AGENT = (
     "Chrome/91.0.4472.124 Safari/537.36"
 )
 BASE_DOMAIN = "https://travel.state.gov"
+REQUEST_HEADERS = {
+    'User-Agent': USER_AGENT,
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Connection': 'keep-alive',
+}
+# Lowercase month names as used in bulletin URLs, indexed by month number - 1
+_MONTH_NAMES = (
+    'january', 'february', 'march', 'april', 'may', 'june',
+    'july', 'august', 'september', 'october', 'november', 'december',
+)
+# Path of a monthly bulletin page on BASE_DOMAIN, filled with year and lowercase month
+_BULLETIN_PATH_TEMPLATE = "/content/travel/en/legal/visa-law0/visa-bulletin/{year}/visa-bulletin-for-{month}-{year}.html"
+# Retries for transient failures (connection errors and these statuses), with backoff
+FETCH_RETRIES = 3
+FETCH_RETRY_BACKOFF = 0.5
+FETCH_RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Seconds a fetched page is reused for repeat requests of the same URL in one process
+PAGE_CACHE_TTL = 300
+
+# Shared session: the landing-page and bulletin fetches reuse one keep-alive
+# TLS connection to travel.state.gov instead of handshaking twice per scrape.
+_SESSION = requests.Session()
+_SESSION.headers.update(REQUEST_HEADERS)
+_SESSION_ADAPTER = HTTPAdapter(
+    pool_connections=2,
+    pool_maxsize=4,
+    max_retries=Retry(
+        total=FETCH_RETRIES,
+        backoff_factor=FETCH_RETRY_BACKOFF,
+        status_forcelist=FETCH_RETRY_STATUSES,
+        raise_on_status=False,  # hand back the last response so raise_for_status() reports it
+    ),
+)
+_SESSION.mount('https://', _SESSION_ADAPTER)
+_SESSION.mount('http://', _SESSION_ADAPTER)
+
+# Fast path: the first canonical bulletin link after a "Current Visa Bulletin" heading,
+# found in the raw HTML without building a DOM
+_CURRENT_BULLETIN_HREF_RE = re.compile(
+    r'current\s+visa\s+bulletin.*?href=["\'](?P<href>[^"\']*/visa-bulletin-for-[a-z]+-\d{4}\.html)["\']',
+    re.IGNORECASE | re.DOTALL,
+)
+
+# url -> (time.monotonic() when fetched, HTML)
+_page_cache: Dict[str, Tuple[float, str]] = {}
+
+# Background threads for speculative bulletin fetches (see scrape_visa_bulletin(prefetch=True))
+_PREFETCH_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="bulletin-prefetch")
+
+# Background thread for the JSON save, so the file write overlaps the DB lookups
+_IO_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="bulletin-io")
+
+if lxml is not None:
+    _LOWER = "translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')"
+    _BTN_CLASS = "contains(concat(' ', normalize-space(@class), ' '), ' btn ')"
+    # Strategy 1: btn anchors inside an <li> whose <h2> mentions "current" and "bulletin"
+    _CURRENT_BULLETIN_XPATH = etree.XPath(
+        f"//li[.//h2[contains({_LOWER}, 'current') and contains({_LOWER}, 'bulletin')]]"
+        f"//a[{_BTN_CLASS}]/@href"
+    )
+    # Strategy 2: anchors in the recent bulletins list
+    _RECENT_BULLETINS_XPATH = etree.XPath("//ul[@id='recent_bulletins']//a/@href")
+
+
+def _load_validators(url: str, db_path: str) -> Optional[dict]:
+    """Return the stored http_cache entry for url, or None (errors are non-fatal)."""
+    try:
+        with get_connection(db_path) as conn:
+            return get_http_cache(conn, url)
+    except Exception as e:
+        print(f"[FETCH] Warning: could not read HTTP cache: {e}")
+        return None
 
 
-def fetch_bulletin_page(url: str, verbose: bool = False) -> Optional[str]:
+def _store_validators(url: str, db_path: str, response, body: str) -> None:
+    """Persist the body and ETag / Last-Modified of a 200 response, if it sent any."""
+    etag = response.headers.get('ETag')
+    last_modified = response.headers.get('Last-Modified')
+    if not etag and not last_modified:
+        return
+    try:
+        with get_connection(db_path) as conn:
+            upsert_http_cache(conn, url, body, etag=etag, last_modified=last_modified)
+    except Exception as e:
+        print(f"[FETCH] Warning: could not write HTTP cache: {e}")
+
+
+def _load_parsed(url: str, html: str, db_path: str) -> Optional[dict]:
+    """Return the memoised parse of this exact page, or None (errors are non-fatal)."""
+    try:
+        with get_connection(db_path) as conn:
+            return get_cached_parse(conn, url, html)
+    except Exception as e:
+        print(f"[FETCH] Warning: could not read parse cache: {e}")
+        return None
+
+
+def _store_parsed(url: str, html: str, data: dict, db_path: str) -> None:
+    """Memoise the parse of a page held in the HTTP cache (errors are non-fatal)."""
+    try:
+        with get_connection(db_path) as conn:
+            set_cached_parse(conn, url, html, data)
+    except Exception as e:
+        print(f"[FETCH] Warning: could not write parse cache: {e}")
+
+
+def _decode_body(response) -> str:
+    """
+    Decode a response body with its declared charset, falling back to UTF-8.
+    Unlike response.text this never runs charset detection over the whole payload.
+    """
+    try:
+        return response.content.decode(response.encoding or 'utf-8', errors='replace')
+    except LookupError:  # unknown charset label
+        return response.content.decode('utf-8', errors='replace')
+
+
+def fetch_bulletin_page(url: str, verbose: bool = False, db_path: Optional[str] = None) -> Optional[str]:
     """
     Fetch the visa bulletin webpage.
-    
+
+    Successful responses are cached for PAGE_CACHE_TTL seconds, so repeat
+    scrapes within one process do not re-download the same URL.
+
+    When db_path is given, the response's ETag / Last-Modified validators are kept
+    in the database's http_cache table and sent back on the next run; a 304 Not
+    Modified reply is answered from the stored body without re-downloading it.
+
     Args:
         url: URL to fetch
         verbose: Enable verbose logging
+        db_path: SQLite database for conditional-GET validators (None disables)
         
     Returns:
         HTML content as string, or None if failed
     """
     try:
+        cached = _page_cache.get(url)
+        if cached is not None and time.monotonic() - cached[0] < PAGE_CACHE_TTL:
+            if verbose:
+                print(f"[FETCH] Using cached page for URL: {url}")
+            return cached[1]
+
         if verbose:
             print(f"[FETCH] Fetching URL: {url}")
-        
-        headers = {
-            'User-Agent': USER_AGENT,
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Connection': 'keep-alive',
-        }
-        
-        response = requests.get(
+
+        validators = _load_validators(url, db_path) if db_path else None
+        conditional_headers = {}
+        if validators:
+            if validators.get('etag'):
+                conditional_headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                conditional_headers['If-Modified-Since'] = validators['last_modified']
+
+        response = _SESSION.get(
             url,
-            headers=headers,
-            timeout=REQUEST_TIMEOUT
+            headers=conditional_headers or None,
+            timeout=REQUEST_TIMEOUT,
         )
+
+        if response.status_code == 304 and validators:
+            if verbose:
+                print("[FETCH] Page not modified since last run; using stored copy")
+            _page_cache[url] = (time.monotonic(), validators['body'])
+            return validators['body']
+
         response.raise_for_status()
+
+        html = _decode_body(response)
         
         if verbose:
-            print(f"[FETCH] Successfully fetched page ({len(response.text)} bytes)")
-            print(f"[FETCH] Status code: {response.status_code}")
+            print(
+                f"[FETCH] Successfully fetched page ({len(html)} bytes)\n"
+                f"[FETCH] Status code: {response.status_code}"
+            )
         
-        return response.text
+        if db_path:
+            _store_validators(url, db_path, response, html)
+        _page_cache[url] = (time.monotonic(), html)
+        return html
     
     except requests.exceptions.Timeout:
         print(f"[ERROR] Request timeout after {REQUEST_TIMEOUT} seconds")
@@ -94,6 +269,31 @@ def fetch_bulletin_page(url: str, verbose: bool = False) -> Optional[str]:
         return None
 
 
+def _probe_constructed(url: str) -> bool:
+    """
+    Return True if a HEAD request for a constructed bulletin URL succeeds without
+    being redirected elsewhere (e.g. to a "page not found" page).
+    """
+    try:
+        response = _SESSION.head(url, timeout=REQUEST_TIMEOUT, allow_redirects=True)
+    except requests.RequestException:
+        return False
+    return response.status_code == 200 and response.url == url
+
+
+def _prefetch_page(url: str) -> None:
+    """
+    Fetch a page into the page cache, silently. Used for speculative requests,
+    where a 404 (bulletin not published yet) is expected and not worth reporting.
+    """
+    try:
+        response = _SESSION.get(url, timeout=REQUEST_TIMEOUT)
+        if response.ok:
+            _page_cache[url] = (time.monotonic(), _decode_body(response))
+    except Exception:
+        pass
+
+
 def construct_bulletin_url(year: int, month: str) -> str:
     """
     Construct a visa bulletin URL based on year and month.
@@ -105,8 +305,90 @@ def construct_bulletin_url(year: int, month: str) -> str:
     Returns:
         Absolute URL to the bulletin page
     """
-    path = f"/content/travel/en/legal/visa-law0/visa-bulletin/{year}/visa-bulletin-for-{month.lower()}-{year}.html"
-    return BASE_DOMAIN + path
+    return BASE_DOMAIN + _BULLETIN_PATH_TEMPLATE.format(year=year, month=month.lower())
+
+
+def candidate_bulletin_urls(now: Optional[datetime] = None) -> List[str]:
+    """
+    Constructed URLs for this month's and next month's bulletin. This month's is the
+    landing page's "Current" bulletin; next month's is published mid-month and listed
+    as "Upcoming" until the month turns over.
+    """
+    now = now or datetime.now()
+    next_year, next_month = (now.year + 1, 1) if now.month == 12 else (now.year, now.month + 1)
+    return [
+        construct_bulletin_url(now.year, _MONTH_NAMES[now.month - 1]),
+        construct_bulletin_url(next_year, _MONTH_NAMES[next_month - 1]),
+    ]
+
+
+def _absolute_url(href: str) -> str:
+    """Convert a site-relative href to an absolute URL."""
+    return BASE_DOMAIN + href if href.startswith('/') else href
+
+
+def _find_bulletin_href_lexbor(html_content: str) -> Optional[Tuple[str, int]]:
+    """Strategies 1 and 2 using selectolax's C (lexbor) parser. Returns (href, strategy)."""
+    tree = LexborHTMLParser(html_content)
+
+    # Visit only headings inside list items rather than every <li> on the page
+    for h2 in tree.css('li h2'):
+        heading = h2.text().lower()
+        if 'current' in heading and 'bulletin' in heading:
+            li = h2.parent
+            while li.tag != 'li':
+                li = li.parent
+            link = li.css_first('a.btn')
+            if link is not None and link.attributes.get('href'):
+                return link.attributes['href'], 1
+
+    link = tree.css_first('ul#recent_bulletins a')
+    if link is not None and link.attributes.get('href'):
+        return link.attributes['href'], 2
+
+    return None
+
+
+def _find_bulletin_href_lxml(html_content: str) -> Optional[Tuple[str, int]]:
+    """Strategies 1 and 2 as compiled lxml XPath queries. Returns (href, strategy)."""
+    doc = lxml.html.fromstring(html_content)
+
+    for href in _CURRENT_BULLETIN_XPATH(doc):
+        if href:
+            return str(href), 1
+
+    hrefs = _RECENT_BULLETINS_XPATH(doc)
+    if hrefs and hrefs[0]:
+        return str(hrefs[0]), 2
+
+    return None
+
+
+# Both bs4 strategies only look inside lists; build just those subtrees
+_LANDING_PAGE_STRAINER = SoupStrainer(['ul', 'li'])
+
+
+def _find_bulletin_href_bs4(html_content: str) -> Optional[Tuple[str, int]]:
+    """Strategies 1 and 2 using BeautifulSoup. Returns (href, strategy)."""
+    soup = BeautifulSoup(html_content, 'html.parser', parse_only=_LANDING_PAGE_STRAINER)
+
+    # Find all list items that might contain the current bulletin
+    for li in soup.find_all('li'):
+        h2 = li.find('h2')
+        heading = h2.get_text().lower() if h2 else ''
+        if 'current' in heading and 'bulletin' in heading:
+            # Found the "Current Visa Bulletin" section
+            link = li.find('a', class_='btn')
+            if link and link.get('href'):
+                return link['href'], 1
+
+    recent_bulletins = soup.find('ul', id='recent_bulletins')
+    if recent_bulletins:
+        links = recent_bulletins.find_all('a')
+        if links and links[0].get('href'):
+            return links[0]['href'], 2
+
+    return None
 
 
 def extract_bulletin_url_from_landing_page(html_content: str, verbose: bool = False) -> Optional[str]:
@@ -118,6 +400,9 @@ def extract_bulletin_url_from_landing_page(html_content: str, verbose: bool = Fa
     2. Look for first link in recent_bulletins list
     3. Construct URL based on current month/year
 
+    Strategy 1 is first tried as a regex over the raw HTML; only if that misses is
+    a DOM built, using selectolax when it is installed, then lxml, otherwise BeautifulSoup.
+
     Args:
         html_content: HTML content of the landing page
         verbose: Enable verbose logging
@@ -126,44 +411,29 @@ def extract_bulletin_url_from_landing_page(html_content: str, verbose: bool = Fa
         Absolute URL to current bulletin, or None if extraction failed
     """
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
-
         if verbose:
             print("[EXTRACT] Attempting to extract current bulletin URL from landing page...")
 
-        # Strategy 1: Look for "Current Visa Bulletin" section
-        # Find all list items that might contain the current bulletin
-        list_items = soup.find_all('li')
-        for li in list_items:
-            h2 = li.find('h2')
-            if h2 and 'current' in h2.get_text().lower() and 'bulletin' in h2.get_text().lower():
-                # Found the "Current Visa Bulletin" section
-                link = li.find('a', class_='btn')
-                if link and link.get('href'):
-                    href = link['href']
-                    # Convert relative URL to absolute if needed
-                    if href.startswith('/'):
-                        href = BASE_DOMAIN + href
-                    if verbose:
-                        print(f"[EXTRACT] Found current bulletin URL (Strategy 1): {href}")
-                    return href
-
-        # Strategy 2: Look for recent_bulletins list and take the first link
-        recent_bulletins = soup.find('ul', id='recent_bulletins')
-        if recent_bulletins:
-            links = recent_bulletins.find_all('a')
-            if links:
-                href = links[0].get('href')
-                if href:
-                    if href.startswith('/'):
-                        href = BASE_DOMAIN + href
-                    if verbose:
-                        print(f"[EXTRACT] Found bulletin URL (Strategy 2): {href}")
-                    return href
+        match = _CURRENT_BULLETIN_HREF_RE.search(html_content)
+        if match:
+            found = match.group('href'), 1
+        elif LexborHTMLParser is not None:
+            found = _find_bulletin_href_lexbor(html_content)
+        elif lxml is not None:
+            found = _find_bulletin_href_lxml(html_content)
+        else:
+            found = _find_bulletin_href_bs4(html_content)
+        if found is not None:
+            href, strategy = found
+            href = _absolute_url(href)
+            if verbose:
+                label = "Found current bulletin URL" if strategy == 1 else "Found bulletin URL"
+                print(f"[EXTRACT] {label} (Strategy {strategy}): {href}")
+            return href
 
         # Strategy 3: Construct URL based on current date
         current_date = datetime.now()
-        month_name = current_date.strftime('%B').lower()  # e.g., 'february'
+        month_name = _MONTH_NAMES[current_date.month - 1]  # e.g., 'february'
         year = current_date.year
 
         constructed_url = construct_bulletin_url(year, month_name)
@@ -180,6 +450,38 @@ def extract_bulletin_url_from_landing_page(html_content: str, verbose: bool = Fa
         return None
 
 
+def _now_iso() -> str:
+    """
+    Current UTC time as an ISO-8601 string for run timestamps. Kept at fixed-width
+    microsecond resolution so runs started within the same second still order
+    by started_at.
+    """
+    return datetime.now(timezone.utc).isoformat(timespec='microseconds')
+
+
+def _save_output(
+    data: Dict,
+    output_file: Optional[str],
+    use_timestamp: bool,
+    verbose: bool,
+    pretty: bool = False,
+) -> Tuple[Optional[str], str]:
+    """
+    Write the parsed data to its JSON file.
+    Returns (saved path, "") on success or (None, failure message) on error.
+    """
+    if use_timestamp:
+        saved_path = save_with_timestamp(data, verbose=verbose, pretty=pretty)
+        if not saved_path:
+            return None, "Failed to save timestamped JSON file"
+        return saved_path, ""
+
+    output_path = output_file or DEFAULT_OUTPUT_FILE
+    if not save_to_json(data, output_path, verbose, pretty):
+        return None, f"Failed to save JSON to {output_path}"
+    return output_path, ""
+
+
 def scrape_visa_bulletin(
     output_file: Optional[str] = None,
     use_timestamp: bool = False,
@@ -190,6 +492,10 @@ def scrape_visa_bulletin(
     db_path: str = DEFAULT_DB_PATH,
     use_db: bool = True,
     do_compare: bool = False,
+    prefetch: bool = False,
+    conn: Optional[sqlite3.Connection] = None,
+    probe: bool = False,
+    pretty: bool = False,
 ) -> tuple:
     """
     Main scraping orchestration function.
@@ -205,69 +511,111 @@ def scrape_visa_bulletin(
         db_path: Path to the SQLite database file
         use_db: If False, skip all database operations (JSON-only mode)
         do_compare: Compare this run against the previous run of the same type
+        prefetch: Fetch the candidate bulletin URLs concurrently with the landing page,
+                  so the bulletin download overlaps the landing-page round trip
+        conn: Open connection to record the run on, for callers that already have one;
+              the caller is then responsible for init_db. None opens db_path as needed.
+        probe: HEAD this month's constructed bulletin URL first and, if it exists, use
+               it without fetching the landing page
+        pretty: Indent the saved JSON for human reading (compact by default)
 
     Returns:
         Tuple of (success: bool, run_id: Optional[int], data: Optional[dict])
     """
-    started_at = datetime.now(timezone.utc).isoformat()
+    started_at = _now_iso()
+
+    @contextlib.contextmanager
+    def _run_db() -> Iterator[sqlite3.Connection]:
+        """The caller's connection if one was passed, else a new one on db_path, closed after use."""
+        if conn is not None:
+            yield conn
+            return
+        db = get_connection(db_path)
+        try:
+            yield db
+        finally:
+            db.close()
 
     def _record_failure(error_message: str) -> None:
         """Record a failed run in the DB if use_db is enabled."""
         if not use_db:
             return
         try:
-            completed_at = datetime.now(timezone.utc).isoformat()
-            with get_connection(db_path) as conn:
+            with _run_db() as db:
                 insert_run(
-                    conn,
+                    db,
                     run_type=run_type,
                     started_at=started_at,
                     success=False,
                     error_message=error_message,
-                    completed_at=completed_at,
+                    completed_at=_now_iso(),
                     verbose=verbose,
                 )
         except Exception as e:
             print(f"[STORE] Warning: could not record failed run: {e}")
 
-    if use_db:
+    if use_db and conn is None:
         try:
             init_db(db_path, verbose=verbose)
         except Exception as e:
             print(f"[STORE] Warning: could not initialize database: {e}")
 
     if verbose:
-        print("[MAIN] Starting visa bulletin scraper...")
-        print(f"[MAIN] Target URL: {VISA_BULLETIN_URL}")
+        print(f"[MAIN] Starting visa bulletin scraper...\n[MAIN] Target URL: {VISA_BULLETIN_URL}")
+
+    prefetched: Dict[str, Future] = {}
+    if prefetch:
+        for url in candidate_bulletin_urls():
+            if verbose:
+                print(f"[MAIN] Prefetching candidate bulletin URL: {url}")
+            prefetched[url] = _PREFETCH_POOL.submit(_prefetch_page, url)
+
+    cache_db = db_path if use_db else None
+
+    # Step 0: Optionally find the bulletin by probing this month's constructed URL.
+    # Next month's is not tried: once published it is the landing page's "Upcoming"
+    # bulletin, not the current one.
+    bulletin_url: Optional[str] = None
+    if probe:
+        url = candidate_bulletin_urls()[0]
+        if _probe_constructed(url):
+            bulletin_url = url
+            if verbose:
+                print(f"[MAIN] Constructed bulletin URL exists, skipping landing page: {url}")
 
     # Step 1: Fetch the landing page
-    html_content = fetch_bulletin_page(VISA_BULLETIN_URL, verbose)
-    if not html_content:
-        print("[ERROR] Failed to fetch landing page. Exiting.")
-        _record_failure("Failed to fetch landing page")
-        return False, None, None
+    if bulletin_url is None:
+        html_content = fetch_bulletin_page(VISA_BULLETIN_URL, verbose, db_path=cache_db)
+        if not html_content:
+            print("[ERROR] Failed to fetch landing page. Exiting.")
+            _record_failure("Failed to fetch landing page")
+            return False, None, None
 
-    # Step 1.5: Extract bulletin URL from landing page
-    if verbose:
-        print("[MAIN] Extracting bulletin URL from landing page...")
-
-    bulletin_url = extract_bulletin_url_from_landing_page(html_content, verbose)
-    if not bulletin_url:
-        print("[ERROR] Failed to extract bulletin URL from landing page.")
-        print("[HELP] The landing page structure may have changed.")
-        if debug:
-            print("[DEBUG] Landing page HTML saved for inspection.")
-        _record_failure("Failed to extract bulletin URL from landing page")
-        return False, None, None
+        # Step 1.5: Extract bulletin URL from landing page
+        if verbose:
+            print("[MAIN] Extracting bulletin URL from landing page...")
+
+        bulletin_url = extract_bulletin_url_from_landing_page(html_content, verbose)
+        if not bulletin_url:
+            print("[ERROR] Failed to extract bulletin URL from landing page.")
+            print("[HELP] The landing page structure may have changed.")
+            if debug:
+                print("[DEBUG] Landing page HTML saved for inspection.")
+            _record_failure("Failed to extract bulletin URL from landing page")
+            return False, None, None
 
-    if verbose:
-        print(f"[MAIN] Found bulletin URL: {bulletin_url}")
+        if verbose:
+            print(f"[MAIN] Found bulletin URL: {bulletin_url}")
 
     # Step 2: Fetch the actual bulletin page
     if verbose:
         print("[MAIN] Fetching actual bulletin page...")
 
-    html_content = fetch_bulletin_page(bulletin_url, verbose)
+    if bulletin_url in prefetched:
+        # Let the in-flight request finish; on success the page is now in the cache
+        prefetched[bulletin_url].result()
+
+    html_content = fetch_bulletin_page(bulletin_url, verbose, db_path=cache_db)
     if not html_content:
         print("[ERROR] Failed to fetch bulletin page. Exiting.")
         _record_failure(f"Failed to fetch bulletin page: {bulletin_url}")
@@ -277,51 +625,67 @@ def scrape_visa_bulletin(
     if verbose:
         print("[MAIN] Parsing bulletin HTML content...")
 
-    data = parse_bulletin_html(html_content, verbose, debug)
-    if not data:
-        print("[ERROR] Failed to parse HTML content. Exiting.")
-        _record_failure("Failed to parse bulletin HTML")
-        return False, None, None
+    # A page identical to the last one parsed (e.g. answered by a 304) reuses that parse
+    data = _load_parsed(bulletin_url, html_content, cache_db) if cache_db and not debug else None
+    if data is not None:
+        if verbose:
+            print("[MAIN] Bulletin page unchanged since last parse, reusing parsed data")
+        data["extracted_at"] = datetime.now().isoformat()
+    else:
+        data = parse_bulletin_html(html_content, verbose, debug)
+        if not data:
+            print("[ERROR] Failed to parse HTML content. Exiting.")
+            _record_failure("Failed to parse bulletin HTML")
+            return False, None, None
+        if cache_db:
+            _store_parsed(bulletin_url, html_content, data, cache_db)
 
-    # Step 4: Save to JSON
+    # Step 4: Save to JSON in the background while the previous run is looked up
     if verbose:
         print("[MAIN] Saving extracted data...")
 
-    if use_timestamp:
-        saved_path = save_with_timestamp(data, verbose=verbose)
-        if not saved_path:
-            print("[ERROR] Failed to save data. Exiting.")
-            _record_failure("Failed to save timestamped JSON file")
-            return False, None, None
-    else:
-        output_path = output_file or DEFAULT_OUTPUT_FILE
-        if not save_to_json(data, output_path, verbose):
-            print("[ERROR] Failed to save data. Exiting.")
-            _record_failure(f"Failed to save JSON to {output_path}")
-            return False, None, None
-        saved_path = output_path
+    save_future = _IO_POOL.submit(
+        _save_output, data, output_file, use_timestamp, verbose, pretty
+    )
+
+    prev: Optional[Dict] = None
+    diff: Optional[Dict] = None
+    if use_db and do_compare:
+        try:
+            with _run_db() as db:
+                prev = get_last_successful_run(db, run_type, verbose=verbose)
+            if prev is not None:
+                diff = compare_bulletins(data, prev["data"])
+        except Exception as e:
+            print(f"[STORE] Warning: could not load previous run for comparison: {e}")
+
+    saved_path, save_error = save_future.result()
+    if not saved_path:
+        print("[ERROR] Failed to save data. Exiting.")
+        _record_failure(save_error)
+        return False, None, None
 
     if verbose:
         print(f"[MAIN] Data successfully saved to: {saved_path}")
 
     # Step 5: Display results if requested
     if display:
-        print("\n" + "=" * 60)
-        print("EXTRACTED DATA SUMMARY")
-        print("=" * 60)
-        loaded_data = load_from_json(saved_path, verbose=False)
-        if loaded_data:
-            print(format_data_for_display(loaded_data))
-        print("=" * 60 + "\n")
-
-    # Step 6: Record run in DB and optionally compare with previous run
+        rule = "=" * 60
+        print(f"\n{rule}\nEXTRACTED DATA SUMMARY\n{rule}\n{format_data_for_display(data)}\n{rule}\n")
+
+    # Step 6: Record run in DB and the comparison with the previous run
     run_id: Optional[int] = None
     if use_db:
         try:
-            completed_at = datetime.now(timezone.utc).isoformat()
-            with get_connection(db_path) as conn:
+            completed_at = _now_iso()
+            # One write transaction for the run and its comparison: a single commit, and
+            # the write lock is held from the ID lookups through the inserts (unless the
+            # caller's connection already has a transaction open, which this joins)
+            with _run_db() as db, db:
+                if not db.in_transaction:
+                    db.execute("BEGIN IMMEDIATE")
                 run_id = insert_run(
-                    conn,
+                    db,
                     run_type=run_type,
                     started_at=started_at,
                     success=True,
@@ -330,32 +694,30 @@ def scrape_visa_bulletin(
                     data=data,
                     completed_at=completed_at,
                     verbose=verbose,
+                    commit=False,
                 )
-                if do_compare:
-                    prev = get_last_successful_run(
-                        conn, run_type, exclude_run_id=run_id, verbose=verbose
+                if diff is not None:
+                    insert_comparison(
+                        db,
+                        run_id=run_id,
+                        previous_run_id=prev["id"],
+                        compared_at=diff["compared_at"],
+                        diff=diff,
+                        verbose=verbose,
+                        commit=False,
                     )
-                    if prev is not None:
-                        diff = compare_bulletins(data, prev["data"])
-                        insert_comparison(
-                            conn,
-                            run_id=run_id,
-                            previous_run_id=prev["id"],
-                            compared_at=diff["compared_at"],
-                            diff=diff,
-                            verbose=verbose,
-                        )
-                        print(format_comparison_for_display(diff))
-                    else:
-                        print("[STORE] No previous run found for comparison.")
+                    print(format_comparison_for_display(diff))
+                elif do_compare:
+                    print("[STORE] No previous run found for comparison.")
         except Exception as e:
             print(f"[STORE] Warning: could not record run in database: {e}")
 
     return True, run_id, data
 
 
+@lru_cache(maxsize=1)
 def create_argument_parser() -> argparse.ArgumentParser:
-    """Create and return command-line argument parser."""
+    """Create and return command-line argument parser (built once, then shared)."""
     parser = argparse.ArgumentParser(
         description="Fetch and parse US Visa Bulletin data from the State Department website",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -427,6 +789,24 @@ Examples:
         help='Compare this run against the previous run of the same type and print diff'
     )
 
+    parser.add_argument(
+        '--prefetch',
+        action='store_true',
+        help="Fetch this and next month's bulletin URLs concurrently with the landing page"
+    )
+
+    parser.add_argument(
+        '--probe',
+        action='store_true',
+        help="HEAD this month's constructed bulletin URL and skip the landing page if found"
+    )
+
+    parser.add_argument(
+        '--pretty',
+        action='store_true',
+        help='Indent the saved JSON for human reading (default: compact)'
+    )
+
     parser.add_argument(
         '--history',
         action='store_true',
@@ -449,15 +829,19 @@ def main():
             if not runs:
                 print("No runs recorded yet.")
             else:
-                print(f"{'ID':<20}  {'TYPE':<10}  {'SUCCESS':<8}  {'BULLETIN':<20}  STARTED")
-                print("-" * 80)
+                lines = [
+                    f"{'ID':<20}  {'TYPE':<10}  {'SUCCESS':<8}  {'BULLETIN':<20}  STARTED",
+                    "-" * 80,
+                ]
                 for r in runs:
                     success_str = "yes" if r["success"] else "no"
                     bulletin = r["bulletin_date"] or "(none)"
-                    print(
+                    lines.append(
                         f"{r['id']:<20}  {r['run_type']:<10}  {success_str:<8}  "
                         f"{bulletin:<20}  {r['started_at']}"
                     )
+                # One write for the whole table rather than a flush per row on a terminal
+                print("\n".join(lines))
             sys.exit(0)
 
         success, _run_id, _data = scrape_visa_bulletin(
@@ -470,6 +854,9 @@ def main():
             db_path=args.db,
             use_db=not args.no_db,
             do_compare=args.compare,
+            prefetch=args.prefetch,
+            probe=args.probe,
+            pretty=args.pretty,
         )
 
         sys.exit(0 if success else 1)
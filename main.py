@@ -17,8 +17,10 @@ Usage:
 """
 
 import argparse
+import sqlite3
 import sys
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Any, Dict, Optional
 
 from store import (
@@ -27,14 +29,16 @@ from store import (
     get_last_successful_run,
     init_db,
     insert_comparison,
+    parse_run_data,
 )
 from fetch import scrape_visa_bulletin, DEFAULT_OUTPUT_FILE
 from compare import compare_bulletins, format_comparison_for_display
-from notify import notify_subscribers, _build_config_from_env, _empty_comparison
+from notify import notify_subscribers, _load_config, _empty_comparison
 
 
+@lru_cache(maxsize=1)
 def create_argument_parser() -> argparse.ArgumentParser:
-    """Create and return the CLI argument parser for main.py."""
+    """Create and return the CLI argument parser for main.py (built once, then shared)."""
     parser = argparse.ArgumentParser(
         description=(
             "Visa Bulletin full pipeline: fetch current bulletin, "
@@ -90,6 +94,8 @@ def main() -> None:
     parser = create_argument_parser()
     args = parser.parse_args()
 
+    # Shared by the previous-run lookup and the new run's writes; closed on exit
+    conn: Optional[sqlite3.Connection] = None
     try:
         # Step 1: Initialize database
         try:
@@ -99,10 +105,14 @@ def main() -> None:
 
         # Step 2: Capture the PREVIOUS official run BEFORE fetching the new one.
         # This ensures we compare the new run against the truly prior bulletin.
+        # The same connection then records the new run and the comparison.
         previous_run: Optional[Dict[str, Any]] = None
         try:
-            with get_connection(args.db) as conn:
-                previous_run = get_last_successful_run(conn, "official", verbose=args.verbose)
+            conn = get_connection(args.db)
+            # data_json is only decoded once the new fetch has succeeded (Step 4)
+            previous_run = get_last_successful_run(
+                conn, "official", verbose=args.verbose, parse_data=False
+            )
             if args.verbose:
                 if previous_run:
                     print(
@@ -125,6 +135,7 @@ def main() -> None:
             db_path=args.db,
             use_db=True,
             do_compare=False,  # Comparison is handled here in main.py
+            conn=conn,
         )
 
         if not success or current_data is None:
@@ -136,27 +147,34 @@ def main() -> None:
 
         # Step 4: Compare current vs previous bulletin
         comparison: Optional[Dict[str, Any]] = None
-        if previous_run is not None and previous_run.get("data"):
+        previous_data: Optional[Dict[str, Any]] = None
+        if previous_run is not None:
+            try:
+                previous_data = parse_run_data(previous_run)
+            except Exception as e:
+                # e.g. zstd-compressed data_json without zstandard installed; the
+                # new run is already stored, so carry on as if there were none
+                print(f"[MAIN] Warning: could not decode previous run data: {e}")
+        if previous_data:
             if args.verbose:
                 print("[MAIN] Comparing against previous run...")
 
-            comparison = compare_bulletins(current_data, previous_run["data"])
+            comparison = compare_bulletins(current_data, previous_data)
 
             # Always print comparison (shows "no changes" if identical)
             print(format_comparison_for_display(comparison))
 
-            # Persist the comparison result
-            if run_id is not None:
+            # Persist the comparison result (skipped if the database was unreachable)
+            if run_id is not None and conn is not None:
                 try:
-                    with get_connection(args.db) as conn:
-                        insert_comparison(
-                            conn,
-                            run_id=run_id,
-                            previous_run_id=previous_run["id"],
-                            compared_at=comparison["compared_at"],
-                            diff=comparison,
-                            verbose=args.verbose,
-                        )
+                    insert_comparison(
+                        conn,
+                        run_id=run_id,
+                        previous_run_id=previous_run["id"],
+                        compared_at=comparison["compared_at"],
+                        diff=comparison,
+                        verbose=args.verbose,
+                    )
                 except Exception as e:
                     print(f"[MAIN] Warning: could not store comparison: {e}")
         else:
@@ -173,7 +191,7 @@ def main() -> None:
         if comparison is None:
             comparison = _empty_comparison(current_data)
 
-        config = _build_config_from_env()
+        config = _load_config()
         stats = notify_subscribers(
             comparison=comparison,
             current_bulletin=current_data,
@@ -200,6 +218,9 @@ def main() -> None:
             import traceback
             traceback.print_exc()
         sys.exit(1)
+    finally:
+        if conn is not None:
+            conn.close()
 
 
 if __name__ == "__main__":
@@ -15,28 +15,54 @@ Standalone usage:
 """
 
 import argparse
+import hashlib
 import json
 import os
 import sys
 import tempfile
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Set, Tuple
 
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template
+from markupsafe import escape
 
+from persist import write_bytes
 from store import (
     DEFAULT_DB_PATH,
     get_connection,
     get_last_successful_run,
+    get_last_successful_runs,
     init_db,
+    iter_active_subscriptions,
 )
 
 _TEMPLATE_DIR = Path(__file__).parent / "templates"
-_jinja_env = Environment(
-    loader=FileSystemLoader(str(_TEMPLATE_DIR)),
-    autoescape=True,
-)
+
+
+@lru_cache(maxsize=1)
+def _jinja_env() -> Environment:
+    """The shared Jinja environment for the email templates (created on first use)."""
+    return Environment(
+        loader=FileSystemLoader(str(_TEMPLATE_DIR)),
+        autoescape=True,
+        auto_reload=False,
+        bytecode_cache=FileSystemBytecodeCache(),
+    )
+
+
+@lru_cache(maxsize=None)
+def _template(name: str) -> Template:
+    """
+    Load and compile an email template on first use, then reuse it for every
+    email. Templates only change on deploy: the environment skips the mtime check
+    on each lookup, and keeps compiled bytecode in Jinja's per-user temp cache so
+    later runs skip parse + compile. Nothing is touched until an email is built.
+    """
+    return _jinja_env().get_template(name)
+
 
 # ---------------------------------------------------------------------------
 # Module-level constants
@@ -44,24 +70,41 @@ _jinja_env = Environment(
 
 APP_BASE_URL: str = os.environ.get("APP_BASE_URL", "http://localhost:5000")
 
+# Most emails Resend accepts in one batch request
+_SEND_BATCH_SIZE = 100
+# Batch requests in flight at once when there are more than _SEND_BATCH_SIZE emails
+_SEND_WORKERS = 4
+# Retries per Resend API call for failed connects and 429 rate limiting
+_SEND_RETRIES = 3
+# Resend error codes meaning a batch was rejected as invalid before anything was sent
+_BATCH_REJECTED_CODES = frozenset({"400", "422"})
+
 # All valid subscription categories (mirrors app.py VALID_CATEGORIES)
-_ALL_CATEGORIES: List[str] = sorted(
+_ALL_CATEGORIES: Tuple[str, ...] = tuple(sorted(
     ["EB-1", "EB-2", "EB-3", "EB-4", "EB-5", "F1", "F2A", "F2B", "F3", "F4", "DV"]
-)
+))
 
 # Fields that identify a category row, not date values
-_IDENTITY_KEYS: Set[str] = {
+_IDENTITY_KEYS: FrozenSet[str] = frozenset({
     "visa_category", "preference_level", "family_preference",
     "employment_preference", "category",
     # Actual parser output keys
     "family-sponsored", "employment-based", "region",
-}
+})
 
 # Maps subscription EB codes to employment-based ordinals (for lookups)
 _EB_CODE_TO_ORDINAL: Dict[str, str] = {
     "EB-1": "1st", "EB-2": "2nd", "EB-3": "3rd", "EB-4": "4th", "EB-5": "5th",
 }
 _EB_ORDINAL_TO_CODE: Dict[str, str] = {v: k for k, v in _EB_CODE_TO_ORDINAL.items()}
+# Ordinals are three characters, so "1st Preference" matches on its lowercased prefix
+_EB_PREFIX_TO_CODE: Dict[str, str] = {k.lower(): v for k, v in _EB_ORDINAL_TO_CODE.items()}
+
+# Legacy / alternate identity keys, checked in priority order
+_LEGACY_IDENTITY_KEYS = (
+    "visa_category", "preference_level", "family_preference",
+    "employment_preference", "category",
+)
 
 # Human-readable direction labels for email display
 _DIRECTION_LABELS: Dict[str, str] = {
@@ -74,6 +117,47 @@ _DIRECTION_LABELS: Dict[str, str] = {
     "removed": "Removed",
 }
 
+# Row markup for the categories table in the email body. Kept as str.format
+# templates so the markup lives in one place, outside the render loop.
+_ROW_HEADER_TMPL = (
+    '<tr style="background:{bg}">'
+    '<td colspan="3" style="padding:8px 12px;font-weight:bold;'
+    'border-bottom:1px solid #e5e7eb;color:#1f2937;">'
+    '{cat_key}{updated}</td></tr>'
+)
+_NO_DATA_TMPL = (
+    '<tr style="background:{bg}">'
+    '<td colspan="3" style="padding:4px 12px 4px 24px;color:#9ca3af;'
+    'font-size:13px;font-style:italic;">No data available</td></tr>'
+)
+_DV_REGION_TMPL = (
+    '<tr style="background:{bg}">'
+    '<td colspan="3" style="padding:3px 12px 2px 24px;'
+    'color:#374151;font-size:12px;font-weight:bold;">'
+    '{region}</td></tr>'
+)
+_FIELD_ROW_TMPL = (
+    '<tr style="background:{bg}">'
+    '<td style="padding:4px 12px 4px 24px;color:#6b7280;font-size:13px;">'
+    '{label}</td>'
+    '<td style="padding:4px 12px;font-size:13px;">{current}</td>'
+    '<td style="padding:4px 12px;font-size:13px;">{change}</td>'
+    '</tr>'
+)
+_CHANGE_CELL_TMPL = (
+    '<span style="color:{colour};font-weight:bold;">'
+    '{label}: {previous} → {current}'
+    '</span>'
+)
+_NO_CHANGE_CELL = '<span style="color:#6b7280;">No change</span>'
+
+# Stands in for the unsubscribe token in a body rendered once and shared by every
+# subscriber with the same category list (see notify_subscribers)
+_UNSUBSCRIBE_TOKEN_PLACEHOLDER = "__UNSUBSCRIBE_TOKEN__"
+
+# Marker appended to a category header when any of its rows changed
+_UPDATED_BADGE = ' <span style="color:#d97706;font-size:12px;">[UPDATED]</span>'
+
 # Colours for change directions (inline CSS for email clients)
 _DIRECTION_COLOURS: Dict[str, str] = {
     "advanced": "#16a34a",      # green
@@ -85,6 +169,12 @@ _DIRECTION_COLOURS: Dict[str, str] = {
     "removed": "#6b7280",        # grey
 }
 
+# (colour, label) per direction, resolved once instead of per rendered field
+_DIRECTION_ATTRS: Dict[str, Tuple[str, str]] = {
+    d: (_DIRECTION_COLOURS.get(d, "#6b7280"), _DIRECTION_LABELS.get(d, d.title()))
+    for d in _DIRECTION_LABELS.keys() | _DIRECTION_COLOURS.keys()
+}
+
 
 # ---------------------------------------------------------------------------
 # Internal helpers
@@ -99,19 +189,16 @@ def _extract_subscription_code(category: Dict[str, Any]) -> Optional[str]:
     eb = category.get("employment-based")
     if eb:
         eb_clean = str(eb).strip()
-        code = _EB_ORDINAL_TO_CODE.get(eb_clean)
-        if code:
-            return code
-        for ordinal, mapped_code in _EB_ORDINAL_TO_CODE.items():
-            if eb_clean.lower().startswith(ordinal):
-                return mapped_code
-        return eb_clean
+        return (
+            _EB_ORDINAL_TO_CODE.get(eb_clean)
+            or _EB_PREFIX_TO_CODE.get(eb_clean[:3].lower())
+            or eb_clean
+        )
 
     if category.get("region"):
         return "DV"  # All DV regions map to the single "DV" subscription code
 
-    for key in ("visa_category", "preference_level", "family_preference",
-                "employment_preference", "category"):
+    for key in _LEGACY_IDENTITY_KEYS:
         value = category.get(key)
         if value:
             return str(value).strip()
@@ -131,20 +218,17 @@ def _get_compare_key(category: Dict[str, Any]) -> str:
     eb = category.get("employment-based")
     if eb:
         eb_clean = str(eb).strip()
-        code = _EB_ORDINAL_TO_CODE.get(eb_clean)
-        if code:
-            return code
-        for ordinal, mapped_code in _EB_ORDINAL_TO_CODE.items():
-            if eb_clean.lower().startswith(ordinal):
-                return mapped_code
-        return eb_clean
+        return (
+            _EB_ORDINAL_TO_CODE.get(eb_clean)
+            or _EB_PREFIX_TO_CODE.get(eb_clean[:3].lower())
+            or eb_clean
+        )
 
     region = category.get("region")
     if region:
         return f"DV-{str(region).strip()}"
 
-    for key in ("visa_category", "preference_level", "family_preference",
-                "employment_preference", "category"):
+    for key in _LEGACY_IDENTITY_KEYS:
         value = category.get(key)
         if value:
             return str(value).strip()
@@ -152,14 +236,50 @@ def _get_compare_key(category: Dict[str, Any]) -> str:
     return ""
 
 
-def _find_categories_for_code(
-    code: str, categories: List[Dict[str, Any]]
-) -> List[Dict[str, Any]]:
-    """Return all bulletin category rows that correspond to a subscription code."""
-    return [c for c in categories if _extract_subscription_code(c) == code]
+@lru_cache(maxsize=None)
+def _field_label(field: str) -> str:
+    """Display label for a date field key, e.g. 'final_action_date' → 'Final Action Date'."""
+    return field.replace("_", " ").replace("-", " ").title()
+
+
+# subscription code → [(bulletin row, {field: field change}, sorted (field, value) date pairs)]
+_CodeIndex = Dict[
+    str, List[Tuple[Dict[str, Any], Dict[str, Dict[str, Any]], Tuple[Tuple[str, Any], ...]]]
+]
 
 
-def _get_changed_category_keys(comparison: Dict[str, Any]) -> Set[str]:
+def _build_code_index(
+    categories: List[Dict[str, Any]],
+    comparison: Dict[str, Any],
+) -> _CodeIndex:
+    """
+    Map each subscription code to its bulletin rows, in bulletin order, as
+    (row, change map, date fields) triples. The change map holds the row's
+    field changes from comparison keyed by field name (empty if unchanged);
+    the date fields are its non-identity, non-null (field, value) pairs,
+    sorted by field name. Built once per bulletin and shared by every email.
+    """
+    # comparison key → field_changes list
+    changed_index: Dict[str, List[Dict[str, Any]]] = {
+        cd["category_key"]: cd.get("field_changes", [])
+        for cd in comparison.get("categories_changed", [])
+    }
+    index: _CodeIndex = {}
+    for category in categories:
+        code = _extract_subscription_code(category)
+        if code is not None:
+            field_changes = changed_index.get(_get_compare_key(category), [])
+            date_fields = tuple(sorted(
+                (k, v) for k, v in category.items()
+                if k not in _IDENTITY_KEYS and v is not None
+            ))
+            index.setdefault(code, []).append(
+                (category, {fc["field"]: fc for fc in field_changes}, date_fields)
+            )
+    return index
+
+
+def _get_changed_category_keys(comparison: Dict[str, Any]) -> FrozenSet[str]:
     """Return the set of subscription codes that changed, were added, or were removed."""
     changed: Set[str] = set()
     for cat_diff in comparison.get("categories_changed", []):
@@ -174,7 +294,7 @@ def _get_changed_category_keys(comparison: Dict[str, Any]) -> Set[str]:
         code = _extract_subscription_code(cat)
         if code:
             changed.add(code)
-    return changed
+    return frozenset(changed)
 
 
 def _load_config() -> Dict[str, Any]:
@@ -244,10 +364,63 @@ def build_email_subject(
         return f"Visa Bulletin Update ({bulletin_date}): No changes to your categories"
 
 
+def _iter_category_rows(
+    subscribed_cats: List[str],
+    code_index: _CodeIndex,
+) -> Iterator[str]:
+    """Yield the <tr> markup for each subscribed category, in order."""
+    for cat_key in subscribed_cats:
+        matching_cats = code_index.get(cat_key, ())
+
+        # Determine if any matching row has changes
+        has_cat_change = any(change_map for _, change_map, _ in matching_cats)
+
+        row_bg = "#fef9c3" if has_cat_change else "#ffffff"  # yellow tint if changed
+        yield _ROW_HEADER_TMPL.format(
+            bg=row_bg,
+            cat_key=cat_key,
+            updated=_UPDATED_BADGE if has_cat_change else "",
+        )
+
+        if not matching_cats:
+            yield _NO_DATA_TMPL.format(bg=row_bg)
+            continue
+
+        for current_cat, change_map, date_fields in matching_cats:
+            # For DV with multiple region rows, show the region name as a sub-label
+            if cat_key == "DV":
+                region = current_cat.get("region", "")
+                if region:
+                    yield _DV_REGION_TMPL.format(bg=row_bg, region=region)
+
+            for field, current_val in date_fields:
+                fc = change_map.get(field)
+                if fc:
+                    direction = fc.get("direction", "changed")
+                    attrs = _DIRECTION_ATTRS.get(direction)
+                    colour, label = attrs or ("#6b7280", direction.title())
+                    change_cell = _CHANGE_CELL_TMPL.format(
+                        colour=colour,
+                        label=label,
+                        previous=fc.get("previous") or "(none)",
+                        current=current_val,
+                    )
+                else:
+                    change_cell = _NO_CHANGE_CELL
+
+                yield _FIELD_ROW_TMPL.format(
+                    bg=row_bg,
+                    label=_field_label(field),
+                    current=current_val,
+                    change=change_cell,
+                )
+
+
 def build_email_html(
     subscription: Dict[str, Any],
     comparison: Dict[str, Any],
     current_bulletin: Dict[str, Any],
+    code_index: Optional[_CodeIndex] = None,
 ) -> str:
     """
     Build the HTML body for a subscriber's notification email.
@@ -256,6 +429,9 @@ def build_email_html(
         subscription: DB row with keys: email, categories (list), unsubscribe_token
         comparison: Structured diff from compare.compare_bulletins()
         current_bulletin: Full parser output dict (bulletin_date, categories list)
+        code_index: _build_code_index() of current_bulletin's categories against
+                    comparison; built here if not given (pass it when
+                    rendering many emails)
 
     Returns:
         HTML string suitable for use as email body
@@ -269,93 +445,14 @@ def build_email_html(
     prev_date = comparison.get("previous_run_bulletin_date")
     has_changes = comparison.get("has_changes", False)
 
-    # Build lookup: comparison key → field_changes list
-    changed_index: Dict[str, List[Dict[str, Any]]] = {
-        cd["category_key"]: cd.get("field_changes", [])
-        for cd in comparison.get("categories_changed", [])
-    }
-    all_categories: List[Dict[str, Any]] = current_bulletin.get("categories", [])
+    if code_index is None:
+        code_index = _build_code_index(current_bulletin.get("categories", []), comparison)
 
-    # Build per-category rows for subscribed categories
-    category_rows_html = []
-    for cat_key in subscribed_cats:
-        matching_cats = _find_categories_for_code(cat_key, all_categories)
-
-        # Determine if any matching row has changes
-        has_cat_change = any(
-            bool(changed_index.get(_get_compare_key(c), []))
-            for c in matching_cats
-        )
-
-        row_bg = "#fef9c3" if has_cat_change else "#ffffff"  # yellow tint if changed
-        row_header = (
-            f'<tr style="background:{row_bg}">'
-            f'<td colspan="3" style="padding:8px 12px;font-weight:bold;'
-            f'border-bottom:1px solid #e5e7eb;color:#1f2937;">'
-            f'{cat_key}'
-        )
-        if has_cat_change:
-            row_header += ' <span style="color:#d97706;font-size:12px;">[UPDATED]</span>'
-        row_header += "</td></tr>"
-        category_rows_html.append(row_header)
-
-        if matching_cats:
-            for current_cat in matching_cats:
-                compare_key = _get_compare_key(current_cat)
-                field_changes = changed_index.get(compare_key, [])
-                change_map: Dict[str, Dict[str, Any]] = {
-                    fc["field"]: fc for fc in field_changes
-                }
-
-                # For DV with multiple region rows, show the region name as a sub-label
-                if cat_key == "DV":
-                    region = current_cat.get("region", "")
-                    if region:
-                        category_rows_html.append(
-                            f'<tr style="background:{row_bg}">'
-                            f'<td colspan="3" style="padding:3px 12px 2px 24px;'
-                            f'color:#374151;font-size:12px;font-weight:bold;">'
-                            f'{region}</td></tr>'
-                        )
-
-                # Gather date fields (exclude identity/label keys)
-                date_fields = {
-                    k: v for k, v in current_cat.items()
-                    if k not in _IDENTITY_KEYS and v is not None
-                }
-
-                for field, current_val in sorted(date_fields.items()):
-                    fc = change_map.get(field)
-                    if fc:
-                        direction = fc.get("direction", "changed")
-                        colour = _DIRECTION_COLOURS.get(direction, "#6b7280")
-                        label = _DIRECTION_LABELS.get(direction, direction.title())
-                        prev_val = fc.get("previous") or "(none)"
-                        change_cell = (
-                            f'<span style="color:{colour};font-weight:bold;">'
-                            f'{label}: {prev_val} → {current_val}'
-                            f"</span>"
-                        )
-                    else:
-                        change_cell = '<span style="color:#6b7280;">No change</span>'
-
-                    field_label = (
-                        field.replace("_", " ").replace("-", " ").title()
-                    )
-                    category_rows_html.append(
-                        f'<tr style="background:{row_bg}">'
-                        f'<td style="padding:4px 12px 4px 24px;color:#6b7280;font-size:13px;">'
-                        f"{field_label}</td>"
-                        f'<td style="padding:4px 12px;font-size:13px;">{current_val}</td>'
-                        f'<td style="padding:4px 12px;font-size:13px;">{change_cell}</td>'
-                        f"</tr>"
-                    )
-        else:
-            category_rows_html.append(
-                f'<tr style="background:{row_bg}">'
-                f'<td colspan="3" style="padding:4px 12px 4px 24px;color:#9ca3af;'
-                f'font-size:13px;font-style:italic;">No data available</td></tr>'
-            )
+    categories_table = "\n".join(
+        _iter_category_rows(subscribed_cats, code_index)
+    ) or (
+        '<tr><td colspan="4" style="padding:12px;color:#9ca3af;">No subscribed categories.</td></tr>'
+    )
 
     # Overall summary section
     summary = comparison.get("summary", {})
@@ -374,12 +471,7 @@ def build_email_html(
         summary_text = "No changes detected since the previous bulletin."
         summary_colour = "#16a34a"
 
-    categories_table = "\n".join(category_rows_html) if category_rows_html else (
-        '<tr><td colspan="4" style="padding:12px;color:#9ca3af;">No subscribed categories.</td></tr>'
-    )
-
-    template = _jinja_env.get_template("email_body.html")
-    return template.render(
+    return _template("email_body.html").render(
         bulletin_date=bulletin_date,
         prev_date=prev_date,
         summary_colour=summary_colour,
@@ -393,6 +485,51 @@ def build_email_html(
 # Email dispatch
 # ---------------------------------------------------------------------------
 
+# Preview directories already created this process (one mkdir per run, not per email)
+_PREVIEW_DIRS_CREATED: Set[str] = set()
+
+
+@lru_cache(maxsize=1)
+def _preview_write_pool() -> ThreadPoolExecutor:
+    """
+    Pool that writes preview files for --all --print-local, so rendering the next
+    email overlaps with writing the previous one. Started on the first preview.
+    """
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="email-preview")
+
+
+def _render_preview(
+    to_addr: str,
+    subject: str,
+    html_body: str,
+    output_dir: str,
+) -> Tuple[Path, bytes]:
+    """Return the preview file path and its encoded standalone HTML page."""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    safe_email = to_addr.replace("@", "_at_").replace(".", "_")
+    filename = f"email_preview_{safe_email}_{timestamp}.html"
+    output_path = Path(output_dir) / filename
+
+    full_html = _template("email_preview.html").render(subject=subject, to_addr=to_addr, html_body=html_body)
+    return output_path, full_html.encode("utf-8")
+
+
+def _save_preview(to_addr: str, output_path: Path, payload: bytes) -> Optional[str]:
+    """Write a rendered preview to disk; returns its absolute path, or None on failure."""
+    try:
+        output_dir = str(output_path.parent)
+        if output_dir not in _PREVIEW_DIRS_CREATED:
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            _PREVIEW_DIRS_CREATED.add(output_dir)
+        write_bytes(output_path, payload)
+        saved = str(output_path.resolve())
+        print(f"[NOTIFY] Preview saved: {saved}")
+        return saved
+    except Exception as e:
+        print(f"[NOTIFY] Failed to save preview for {to_addr}: {e}")
+        return None
+
+
 def print_email_local(
     to_addr: str,
     subject: str,
@@ -411,22 +548,96 @@ def print_email_local(
     Returns:
         Absolute path to the saved file, or None on failure
     """
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    safe_email = to_addr.replace("@", "_at_").replace(".", "_")
-    filename = f"email_preview_{safe_email}_{timestamp}.html"
-    output_path = Path(output_dir) / filename
+    return _save_preview(to_addr, *_render_preview(to_addr, subject, html_body, output_dir))
+
+
+class _KeepAliveHTTPClient:
+    """
+    HTTP client for the resend SDK backed by one pooled requests.Session. The SDK's
+    default client calls requests.request() per API call, opening a new TLS
+    connection every time; this one keeps connections to the API alive.
+    """
+
+    def __init__(self, timeout: int = 30):
+        import socket
+
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.connection import HTTPConnection
+        from urllib3.util.retry import Retry
+
+        class _Adapter(HTTPAdapter):
+            # TCP keepalive stops idle pooled sockets being dropped by middleboxes
+            # between batches, which would force a fresh handshake.
+            def init_poolmanager(self, *args, **kwargs):
+                kwargs["socket_options"] = HTTPConnection.default_socket_options + [
+                    (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+                ]
+                super().init_poolmanager(*args, **kwargs)
+
+        self._timeout = timeout
+        self._session = requests.Session()
+        self._session.mount("https://", _Adapter(
+            pool_maxsize=_SEND_WORKERS,
+            # Only retry what is safe for a non-idempotent send: failed connects
+            # (nothing was sent) and 429s (request was rejected, not processed).
+            max_retries=Retry(
+                total=_SEND_RETRIES,
+                connect=_SEND_RETRIES,
+                read=0,
+                status=_SEND_RETRIES,
+                status_forcelist=(429,),
+                allowed_methods=None,
+                backoff_factor=0.5,
+                raise_on_status=False,
+            ),
+        ))
+
+    def request(self, method, url, headers, json=None, files=None, data=None):
+        resp = self._session.request(
+            method=method,
+            url=url,
+            headers=headers,
+            json=json if data is None else None,
+            files=files,
+            data=data,
+            timeout=self._timeout,
+        )
+        return resp.content, resp.status_code, resp.headers
 
-    template = _jinja_env.get_template("email_preview.html")
-    full_html = template.render(subject=subject, to_addr=to_addr, html_body=html_body)
 
+def _resend_client(config: Optional[Dict[str, Any]]) -> Optional[Tuple[Any, str]]:
+    """
+    Return (resend module with its API key set, from address), or None after
+    printing why sending is not possible (package missing or not configured).
+    """
     try:
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        output_path.write_text(full_html, encoding="utf-8")
-        print(f"[NOTIFY] Preview saved: {output_path.resolve()}")
-        return str(output_path.resolve())
-    except Exception as e:
-        print(f"[NOTIFY] Failed to save preview for {to_addr}: {e}")
+        import resend
+    except ImportError:
+        print("[NOTIFY] resend is not installed. Run: pip install resend")
+        return None
+
+    cfg = config if config is not None else _load_config()
+    api_key = cfg.get("resend_api_key", "")
+    from_email = cfg.get("from_email", "")
+
+    if not api_key:
+        print(
+            "[NOTIFY] RESEND_API_KEY is not configured. "
+            "Set it in config.py or use --print-local to preview emails."
+        )
         return None
+    if not from_email:
+        print(
+            "[NOTIFY] FROM_EMAIL is not configured. "
+            "Set it in config.py or use --print-local to preview emails."
+        )
+        return None
+
+    resend.api_key = api_key
+    if not isinstance(resend.default_http_client, _KeepAliveHTTPClient):
+        resend.default_http_client = _KeepAliveHTTPClient()
+    return resend, from_email
 
 
 def send_email(
@@ -451,31 +662,12 @@ def send_email(
     Returns:
         True if sent successfully, False otherwise
     """
-    try:
-        import resend
-    except ImportError:
-        print("[NOTIFY] resend is not installed. Run: pip install resend")
-        return False
-
-    cfg = config if config is not None else _load_config()
-    api_key = cfg.get("resend_api_key", "")
-    from_email = cfg.get("from_email", "")
-
-    if not api_key:
-        print(
-            "[NOTIFY] RESEND_API_KEY is not configured. "
-            "Set it in config.py or use --print-local to preview emails."
-        )
-        return False
-    if not from_email:
-        print(
-            "[NOTIFY] FROM_EMAIL is not configured. "
-            "Set it in config.py or use --print-local to preview emails."
-        )
+    client = _resend_client(config)
+    if client is None:
         return False
+    resend, from_email = client
 
     try:
-        resend.api_key = api_key
         resend.Emails.send({
             "from": from_email,
             "to": [to_addr],
@@ -489,6 +681,72 @@ def send_email(
         return False
 
 
+def send_emails_batch(
+    messages: List[Tuple[str, str, str]],
+    config: Optional[Dict[str, Any]] = None,
+) -> List[bool]:
+    """
+    Send many emails via Resend's batch endpoint, up to _SEND_BATCH_SIZE per request
+    with up to _SEND_WORKERS requests in flight.
+
+    A batch the API rejects as invalid (400/422) was not sent, so it is retried one
+    email at a time with send_email(). Any other failure (timeout, 5xx) may have
+    been accepted, so its emails are reported as failed rather than re-sent. Each
+    batch carries an Idempotency-Key derived from its contents, so sending the same
+    batch again later cannot deliver it twice.
+
+    Args:
+        messages: (to_addr, subject, html_body) tuples
+        config: Optional dict with keys: resend_api_key, from_email.
+                Falls back to config.py / environment variables.
+
+    Returns:
+        One bool per message, True if it was sent
+    """
+    if not messages:
+        return []
+    client = _resend_client(config)
+    if client is None:
+        return [False] * len(messages)
+    resend, from_email = client
+
+    def _send_chunk(chunk: List[Tuple[str, str, str]]) -> List[bool]:
+        digest = hashlib.sha256()
+        for to_addr, subject, html_body in chunk:
+            for part in (to_addr, subject, html_body):
+                digest.update(part.encode("utf-8"))
+                digest.update(b"\0")
+        try:
+            resend.Batch.send(
+                [
+                    {"from": from_email, "to": [to_addr], "subject": subject, "html": html_body}
+                    for to_addr, subject, html_body in chunk
+                ],
+                {"idempotency_key": f"batch-{digest.hexdigest()}"},
+            )
+            print(f"[NOTIFY] Batch of {len(chunk)} email(s) sent")
+            return [True] * len(chunk)
+        except Exception as e:
+            if str(getattr(e, "code", "")) not in _BATCH_REJECTED_CODES:
+                print(f"[NOTIFY] Batch send of {len(chunk)} email(s) failed: {e}")
+                return [False] * len(chunk)
+            print(f"[NOTIFY] Batch rejected ({e}); sending {len(chunk)} email(s) individually")
+            return [
+                send_email(to_addr, subject, html_body, config)
+                for to_addr, subject, html_body in chunk
+            ]
+
+    chunks = [
+        messages[start:start + _SEND_BATCH_SIZE]
+        for start in range(0, len(messages), _SEND_BATCH_SIZE)
+    ]
+    if len(chunks) == 1:
+        return _send_chunk(chunks[0])
+    # Batch requests are network-bound; keep a few in flight at once (results stay in order)
+    with ThreadPoolExecutor(max_workers=min(_SEND_WORKERS, len(chunks))) as pool:
+        return [ok for chunk_results in pool.map(_send_chunk, chunks) for ok in chunk_results]
+
+
 # ---------------------------------------------------------------------------
 # High-level notification functions
 # ---------------------------------------------------------------------------
@@ -520,49 +778,83 @@ def notify_subscribers(
     stats: Dict[str, int] = {"sent": 0, "skipped": 0, "failed": 0}
     changed_keys = _get_changed_category_keys(comparison)
 
-    # Fetch all active subscriptions (one query, no per-category duplication)
-    all_subscriptions: List[Dict[str, Any]] = []
+    # Nothing changed (or was added/removed), so no subscriber can qualify:
+    # count them as skipped without loading or rendering anything.
+    if updated_only and not changed_keys:
+        try:
+            with get_connection(db_path) as conn:
+                stats["skipped"] = conn.execute(
+                    "SELECT COUNT(*) FROM subscriptions WHERE is_active = 1"
+                ).fetchone()[0]
+        except Exception as e:
+            print(f"[NOTIFY] Failed to fetch subscriptions: {e}")
+        return stats
+
+    code_index = _build_code_index(current_bulletin.get("categories", []), comparison)
+    outgoing: List[Tuple[str, str, str]] = []
+    previews: List["Future[Optional[str]]"] = []
+    body_cache: Dict[Tuple[str, ...], str] = {}
+
+    # Stream active subscriptions (one query, no per-category duplication);
+    # per-subscriber errors are handled inside the loop, so anything reaching
+    # the outer except came from the database.
     try:
         with get_connection(db_path) as conn:
-            rows = conn.execute(
-                "SELECT * FROM subscriptions WHERE is_active = 1"
-            ).fetchall()
-            for row in rows:
-                d = dict(row)
-                d["categories"] = json.loads(d["categories"])
-                all_subscriptions.append(d)
+            for subscription in iter_active_subscriptions(conn):
+                has_relevant_changes = any(
+                    c in changed_keys for c in subscription["categories"]
+                )
+
+                if updated_only and not has_relevant_changes:
+                    stats["skipped"] += 1
+                    continue
+
+                try:
+                    subject = build_email_subject(
+                        comparison, current_bulletin, has_relevant_changes
+                    )
+                    # Bodies differ only by unsubscribe token, so render once per
+                    # distinct category list and substitute the token per subscriber
+                    cats_key = tuple(subscription["categories"])
+                    shared_body = body_cache.get(cats_key)
+                    if shared_body is None:
+                        shared_body = build_email_html(
+                            {
+                                "categories": subscription["categories"],
+                                "unsubscribe_token": _UNSUBSCRIBE_TOKEN_PLACEHOLDER,
+                            },
+                            comparison, current_bulletin, code_index,
+                        )
+                        body_cache[cats_key] = shared_body
+                    html_body = shared_body.replace(
+                        _UNSUBSCRIBE_TOKEN_PLACEHOLDER,
+                        escape(subscription["unsubscribe_token"]),
+                    )
+
+                    if dry_run:
+                        previews.append(_preview_write_pool().submit(
+                            _save_preview,
+                            subscription["email"],
+                            *_render_preview(
+                                subscription["email"], subject, html_body,
+                                tempfile.gettempdir(),
+                            ),
+                        ))
+                    else:
+                        outgoing.append((subscription["email"], subject, html_body))
+                except Exception as e:
+                    print(f"[NOTIFY] Error processing subscriber {subscription['email']}: {e}")
+                    stats["failed"] += 1
     except Exception as e:
         print(f"[NOTIFY] Failed to fetch subscriptions: {e}")
         return stats
 
-    for subscription in all_subscriptions:
-        subscriber_cats: Set[str] = set(subscription.get("categories", []))
-        subscriber_changed = subscriber_cats & changed_keys
-        has_relevant_changes = bool(subscriber_changed)
+    for preview in previews:
+        stats["sent" if preview.result() else "failed"] += 1
 
-        if updated_only and not has_relevant_changes:
-            stats["skipped"] += 1
-            continue
-
-        try:
-            subject = build_email_subject(comparison, current_bulletin, has_relevant_changes)
-            html_body = build_email_html(subscription, comparison, current_bulletin)
-
-            if dry_run:
-                result = print_email_local(subscription["email"], subject, html_body)
-                if result:
-                    stats["sent"] += 1
-                else:
-                    stats["failed"] += 1
-            else:
-                ok = send_email(subscription["email"], subject, html_body, config)
-                if ok:
-                    stats["sent"] += 1
-                else:
-                    stats["failed"] += 1
-        except Exception as e:
-            print(f"[NOTIFY] Error processing subscriber {subscription.get('email', '?')}: {e}")
-            stats["failed"] += 1
+    # Emails are built first, then sent in as few API requests as possible
+    for ok in send_emails_batch(outgoing, config):
+        stats["sent" if ok else "failed"] += 1
 
     return stats
 
@@ -720,28 +1012,22 @@ def main() -> None:
         sys.exit(0 if ok else 1)
 
     # --- Full notification mode ---
+    # Current and previous official runs come back from one query
     try:
         with get_connection(args.db) as conn:
-            current_run = get_last_successful_run(conn, "official")
+            runs = get_last_successful_runs(conn, "official", limit=2)
     except Exception as e:
         print(f"[NOTIFY] Could not fetch latest run: {e}")
         sys.exit(1)
 
-    if current_run is None:
+    if not runs:
         print("[NOTIFY] No successful official runs found. Cannot notify.")
         sys.exit(1)
 
+    current_run = runs[0]
+    prev_run = runs[1] if len(runs) > 1 else None
     current_bulletin = current_run.get("data") or {}
 
-    # Get previous run for comparison
-    try:
-        with get_connection(args.db) as conn:
-            prev_run = get_last_successful_run(
-                conn, "official", exclude_run_id=current_run["id"]
-            )
-    except Exception:
-        prev_run = None
-
     if prev_run is not None and prev_run.get("data"):
         from compare import compare_bulletins
         comparison = compare_bulletins(current_bulletin, prev_run["data"])
@@ -3,11 +3,47 @@ Parser module for extracting visa bulletin data from HTML content.
 Handles HTML parsing and data extraction from visa category tables and div-based structures.
 """
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from typing import Dict, List, Any, Optional
 from datetime import datetime
+from functools import lru_cache
 import re
 
+try:
+    import lxml.html
+    from lxml import etree
+    _TREE_BUILDER = 'lxml'
+except ImportError:  # optional speedup — fall back to the pure-Python parser
+    lxml = None
+    _TREE_BUILDER = 'html.parser'
+
+# Only <title> and <body> feed the parsing strategies (get_text() already skips
+# <script>/<style>), so the rest of <head> is never turned into Tag objects.
+# lxml always supplies an implied <body>; html.parser does not, so the strainer
+# is only safe with lxml.
+_PAGE_STRAINER = SoupStrainer(['title', 'body']) if _TREE_BUILDER == 'lxml' else None
+
+_MONTHS = 'January|February|March|April|May|June|July|August|September|October|November|December'
+
+# Compiled once at import; used per page, per candidate element and per text line
+_CURRENT_MARKER_RE = re.compile(r'current\s+bulletin', re.IGNORECASE)
+_MONTH_YEAR_RE = re.compile(rf'({_MONTHS})\s+(\d{{4}})', re.IGNORECASE)
+_VISA_CATEGORY_RE = re.compile(r'(EB-\d|F-?\d+[A-Z]?|DV|IR-|K-|V-|T-|U-|VAWA)')
+# Typical format: "DD MMM YY" or "Current"
+_DATE_RE = re.compile(r'(\d{1,2}\s+[A-Z]{3}\s+\d{2}|Current)')
+_TEXT_LINE_RE = re.compile(r'EB-\d|F-\d|DV')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+if lxml is not None:
+    # Text nodes as BeautifulSoup's get_text() sees them: comments, <script>,
+    # <style> and <template> contents are not text. The page text covers only
+    # <title> and <body>, matching _PAGE_STRAINER.
+    _NOT_SCRIPT = "not(ancestor::script or ancestor::style or ancestor::template)"
+    _PAGE_TEXT_XPATH = etree.XPath(
+        f"(//title | //body)//text()[{_NOT_SCRIPT}]", smart_strings=False
+    )
+    _CELL_TEXT_XPATH = etree.XPath(f".//text()[{_NOT_SCRIPT}]", smart_strings=False)
+
 
 def parse_bulletin_html(html_content: str, verbose: bool = False, debug: bool = False) -> Optional[Dict[str, Any]]:
     """
@@ -15,26 +51,38 @@ def parse_bulletin_html(html_content: str, verbose: bool = False, debug: bool =
     Tries multiple parsing strategies to handle different HTML structures.
     """
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
         if verbose:
             print("[PARSER] Starting HTML parsing...")
         
-        # Try to extract bulletin date (preferring January/current)
-        bulletin_date = extract_bulletin_date(soup, verbose)
+        # With lxml the date and the table strategy run on an lxml tree; the
+        # BeautifulSoup tree is only built if the fallback strategies need it
+        tree = _lxml_document(html_content) if lxml is not None else None
+        soup = None
+        if tree is not None:
+            # Try to extract bulletin date (preferring January/current)
+            bulletin_date = _bulletin_date_from_text(''.join(_PAGE_TEXT_XPATH(tree)), verbose)
+            tables = list(tree.iter('table'))
+            parse_table = _parse_lxml_table
+        else:
+            soup = BeautifulSoup(html_content, _TREE_BUILDER, parse_only=_PAGE_STRAINER)
+            bulletin_date = extract_bulletin_date(soup, verbose)
+            tables = soup.find_all('table')
+            parse_table = parse_visa_table
         
         categories = []
         
         # Strategy 1: Look for <table> elements (traditional structure)
-        tables = soup.find_all('table')
         if verbose:
             print(f"[PARSER] Found {len(tables)} <table> elements")
         
-        for idx, table in enumerate(tables):
-            table_data = parse_visa_table(table, verbose)
+        for table in tables:
+            table_data = parse_table(table, verbose)
             if table_data:
                 categories.extend(table_data)
         
+        if not categories and soup is None:
+            soup = BeautifulSoup(html_content, _TREE_BUILDER, parse_only=_PAGE_STRAINER)
+        
         # Strategy 2: If no tables found, look for div-based structures
         if not categories and len(tables) == 0:
             if verbose:
@@ -70,43 +118,65 @@ def parse_bulletin_html(html_content: str, verbose: bool = False, debug: bool =
         return None
 
 
+def _lxml_document(html_content: str):
+    """Parse html_content with lxml.html, or return None if lxml rejects it."""
+    try:
+        return lxml.html.document_fromstring(html_content)
+    except (ValueError, etree.LxmlError):
+        # e.g. an empty document, or a str carrying an XML encoding declaration
+        return None
+
+
 def extract_bulletin_date(soup: BeautifulSoup, verbose: bool = False) -> str:
     """
     Extract the bulletin date, preferring the current (January) bulletin.
     """
     try:
         text_content = soup.get_text()
-        
-        # Strategy 1: Look for "Current" marker followed by month-year
-        current_match = re.search(
-            r'current\s+bulletin.*?(January|February|March|April|May|June|July|August|September|October|November|December)\s+(\d{4})',
-            text_content,
-            re.IGNORECASE | re.DOTALL
-        )
+    except Exception as e:
+        print(f"[ERROR] Failed to extract bulletin date: {str(e)}")
+        return datetime.now().strftime("%B %Y")
+    return _bulletin_date_from_text(text_content, verbose)
+
+
+def _bulletin_date_from_text(text_content: str, verbose: bool = False) -> str:
+    """extract_bulletin_date() on the page text, however it was obtained."""
+    try:
+        # One pass over the month-year matches serves all three strategies:
+        #   1. the first month-year after a "current bulletin" marker
+        #   2. otherwise the first January (likely the current bulletin)
+        #   3. otherwise the first month-year on the page
+        marker = _CURRENT_MARKER_RE.search(text_content)
+        current_match = january_match = first_match = None
+        for match in _MONTH_YEAR_RE.finditer(text_content):
+            if first_match is None:
+                first_match = match
+            if marker is not None and match.start() >= marker.end():
+                current_match = match
+                break
+            if january_match is None and match.group(1).lower() == 'january':
+                january_match = match
+                if marker is None:
+                    break
+
         if current_match:
             date_str = f"{current_match.group(1)} {current_match.group(2)}"
             if verbose:
                 print(f"[PARSER] Found current bulletin marker: {date_str}")
             return date_str
-        
-        # Strategy 2: Look for January specifically (likely the current)
-        january_match = re.search(r'January\s+(\d{4})', text_content, re.IGNORECASE)
+
         if january_match:
-            date_str = f"January {january_match.group(1)}"
+            date_str = f"January {january_match.group(2)}"
             if verbose:
                 print(f"[PARSER] Found January bulletin: {date_str}")
             return date_str
-        
-        # Strategy 3: Use the first month-year found (fallback)
-        date_pattern = r'(January|February|March|April|May|June|July|August|September|October|November|December)\s+(\d{4})'
-        match = re.search(date_pattern, text_content, re.IGNORECASE)
-        
-        if match:
-            date_str = f"{match.group(1)} {match.group(2)}"
+
+        if first_match:
+            date_str = f"{first_match.group(1)} {first_match.group(2)}"
             if verbose:
                 print(f"[PARSER] Extracted bulletin date: {date_str}")
             return date_str
-        
+
         current_date = datetime.now().strftime("%B %Y")
         if verbose:
             print(f"[PARSER] Bulletin date not found, using current: {current_date}")
@@ -132,20 +202,56 @@ def parse_visa_table(table, verbose: bool = False) -> List[Dict[str, Any]]:
         if verbose:
             print(f"[PARSER] Table headers: {headers[:3]}...")
         
+        # Normalized once per table; cells beyond the last header are ignored
+        keys = [normalize_header(header) for header in headers]
         categories = []
         
-        for row_idx in range(1, len(rows)):
-            cells = rows[row_idx].find_all(['td', 'th'])
+        for row in rows[1:]:
+            cells = row.find_all(['td', 'th'])
             if not cells:
                 continue
             
-            cell_values = [cell.get_text(strip=True) for cell in cells]
-            
-            category = {}
-            for header_idx, header in enumerate(headers):
-                if header_idx < len(cell_values):
-                    category[normalize_header(header)] = cell_values[header_idx]
-            
+            category = {key: cell.get_text(strip=True) for key, cell in zip(keys, cells)}
+            if category:
+                categories.append(category)
+        
+        if verbose and categories:
+            print(f"[PARSER] Extracted {len(categories)} rows from table")
+        
+        return categories
+    
+    except Exception as e:
+        print(f"[ERROR] Failed to parse table: {str(e)}")
+        return []
+
+
+def _lxml_cell_text(cell) -> str:
+    """Equivalent of BeautifulSoup's cell.get_text(strip=True) for an lxml element."""
+    return ''.join(text.strip() for text in _CELL_TEXT_XPATH(cell))
+
+
+def _parse_lxml_table(table, verbose: bool = False) -> List[Dict[str, Any]]:
+    """
+    parse_visa_table() for an lxml <table> element; same rows, same keys.
+    """
+    try:
+        rows = list(table.iter('tr'))
+        if len(rows) < 2:
+            return []
+        
+        headers = [_lxml_cell_text(cell) for cell in rows[0].iter('th', 'td')]
+        
+        if verbose:
+            print(f"[PARSER] Table headers: {headers[:3]}...")
+        
+        keys = [normalize_header(header) for header in headers]
+        categories = []
+        
+        for row in rows[1:]:
+            category = {
+                key: _lxml_cell_text(cell)
+                for key, cell in zip(keys, row.iter('td', 'th'))
+            }
             if category:
                 categories.append(category)
         
@@ -163,32 +269,31 @@ def parse_div_based_data(soup: BeautifulSoup, verbose: bool = False) -> List[Dic
     """
     Parse visa data from div-based HTML structures (non-table layout).
     Looks for divs and other elements containing visa category information.
+    If the page has a <main> element, only its descendants are examined, so
+    navigation menus and footers are not scanned element by element.
     """
     try:
-        categories = []
-        
-        # Pattern to match visa categories
-        visa_pattern = r'(EB-\d|F-?\d+[A-Z]?|DV|IR-|K-|V-|T-|U-|VAWA)'
+        unique_categories = []
+        seen = set()
+        # Siblings share a parent; its text is computed once for all of them
+        parent_texts: Dict[int, str] = {}
+        content_root = soup.find('main') or soup
         
         # Look for divs and other elements that might contain visa data
-        potential_elements = soup.find_all(['div', 'p', 'li', 'span', 'td', 'dd'])
+        potential_elements = content_root.find_all(['div', 'p', 'li', 'span', 'td', 'dd'])
         
         for elem in potential_elements:
             text = elem.get_text(strip=True)
-            # Check if this element contains visa category info
-            if re.search(visa_pattern, text) and len(text) > 10:
-                row_data = extract_row_from_element(elem, verbose)
+            # Long enough to hold a category and a date; the extractor checks
+            # for the visa category itself, reusing the text computed here
+            if len(text) > 10:
+                row_data = extract_row_from_element(elem, verbose, text, parent_texts)
                 if row_data:
-                    categories.append(row_data)
-        
-        # Deduplicate categories
-        unique_categories = []
-        seen = set()
-        for cat in categories:
-            cat_str = str(sorted(cat.items()))
-            if cat_str not in seen:
-                seen.add(cat_str)
-                unique_categories.append(cat)
+                    # Nested elements often repeat a row; keep the first of each
+                    key = frozenset(row_data.items())
+                    if key not in seen:
+                        seen.add(key)
+                        unique_categories.append(row_data)
         
         if verbose and unique_categories:
             print(f"[PARSER] Extracted {len(unique_categories)} categories from div structure")
@@ -200,24 +305,31 @@ def parse_div_based_data(soup: BeautifulSoup, verbose: bool = False) -> List[Dic
         return []
 
 
-def extract_row_from_element(elem, verbose: bool = False) -> Optional[Dict[str, Any]]:
+def extract_row_from_element(
+    elem,
+    verbose: bool = False,
+    text: Optional[str] = None,
+    parent_texts: Optional[Dict[int, str]] = None,
+) -> Optional[Dict[str, Any]]:
     """
     Try to extract visa row data from any HTML element.
+    Pass text if elem.get_text(strip=True) has already been computed, and a
+    shared parent_texts dict (keyed by id(parent)) when called for many
+    elements of one tree, so each parent's text is computed only once.
     """
     try:
-        text = elem.get_text(strip=True)
+        if text is None:
+            text = elem.get_text(strip=True)
         
         # Look for visa category pattern
-        category_match = re.search(r'(EB-\d|F-?\d+[A-Z]?|DV|IR-|K-|V-|T-|U-|VAWA)', text)
+        category_match = _VISA_CATEGORY_RE.search(text)
         if not category_match:
             return None
         
         category_code = category_match.group(1)
         
         # Try to extract dates (look for date patterns)
-        # Typical format: "DD MMM YY" or "Current"
-        date_pattern = r'(\d{1,2}\s+[A-Z]{3}\s+\d{2}|Current)'
-        dates = re.findall(date_pattern, text)
+        dates = _DATE_RE.findall(text)
         
         row = {'visa_category': category_code}
         
@@ -226,8 +338,13 @@ def extract_row_from_element(elem, verbose: bool = False) -> Optional[Dict[str,
             # Look for parent's text content
             parent = elem.parent
             if parent:
-                parent_text = parent.get_text(strip=True)
-                dates = re.findall(date_pattern, parent_text)
+                if parent_texts is None:
+                    parent_text = parent.get_text(strip=True)
+                else:
+                    parent_text = parent_texts.get(id(parent))
+                    if parent_text is None:
+                        parent_text = parent_texts[id(parent)] = parent.get_text(strip=True)
+                dates = _DATE_RE.findall(parent_text)
         
         if len(dates) > 0:
             row['cutoff_date'] = dates[0]
@@ -248,14 +365,25 @@ def parse_text_based_data(soup: BeautifulSoup, verbose: bool = False) -> List[Di
         text = soup.get_text()
         categories = []
         
-        # Look for lines with visa categories
-        lines = text.split('\n')
-        for line in lines:
-            if re.search(r'EB-\d|F-\d|DV', line) and len(line) > 5:
+        # Look for lines with visa categories: search the whole text for the
+        # next candidate, cut out just its line, then resume after that line,
+        # so lines without a category are never split out or scanned twice
+        pos = 0
+        while True:
+            match = _TEXT_LINE_RE.search(text, pos)
+            if match is None:
+                break
+            start = text.rfind('\n', 0, match.start()) + 1
+            end = text.find('\n', match.end())
+            if end == -1:
+                end = len(text)
+            line = text[start:end]
+            if len(line) > 5:
                 # Try to parse this line
                 row_data = extract_row_from_text(line)
                 if row_data:
                     categories.append(row_data)
+            pos = end + 1
         
         if verbose and categories:
             print(f"[PARSER] Extracted {len(categories)} categories from text")
@@ -273,15 +401,14 @@ def extract_row_from_text(line: str) -> Optional[Dict[str, Any]]:
     """
     try:
         # Look for visa category pattern
-        category_match = re.search(r'(EB-\d|F-?\d+[A-Z]?|DV|IR-|K-|V-|T-|U-|VAWA)', line)
+        category_match = _VISA_CATEGORY_RE.search(line)
         if not category_match:
             return None
         
         category_code = category_match.group(1)
         
         # Look for dates
-        date_pattern = r'(\d{1,2}\s+[A-Z]{3}\s+\d{2}|Current)'
-        dates = re.findall(date_pattern, line)
+        dates = _DATE_RE.findall(line)
         
         row = {'visa_category': category_code}
         
@@ -296,47 +423,77 @@ def extract_row_from_text(line: str) -> Optional[Dict[str, Any]]:
         return None
 
 
+# Header substrings → standard keys. Order matters - more specific patterns first
+_HEADER_MAPPINGS = (
+    ('visa category', 'visa_category'),
+    ('preference level', 'preference_level'),
+    ('family preference', 'family_preference'),
+    ('employment preference', 'employment_preference'),
+    ('final action date', 'final_action_date'),
+    ('cutoff date', 'cutoff_date'),
+    ('action date', 'action_date'),
+    ('processing date', 'processing_date'),
+    ('category', 'category'),
+    ('current', 'current'),
+)
+
+
+def _scan_header_mappings(header_lower: str) -> Optional[str]:
+    """Return the standard key for the first known phrase contained in the header."""
+    for key, value in _HEADER_MAPPINGS:
+        if key in header_lower:
+            return value
+    return None
+
+
+# Headers that are exactly one of the known phrases resolve without the scan
+_HEADER_EXACT = {key: _scan_header_mappings(key) for key, _ in _HEADER_MAPPINGS}
+
+
+@lru_cache(maxsize=256)
 def normalize_header(header: str) -> str:
     """
     Normalize table header names to standard keys.
+    Results are cached: the same header strings repeat in every table and run.
     """
     header_lower = header.lower().strip()
 
-    # Order matters - check more specific patterns first
-    mappings = [
-        ('visa category', 'visa_category'),
-        ('preference level', 'preference_level'),
-        ('family preference', 'family_preference'),
-        ('employment preference', 'employment_preference'),
-        ('final action date', 'final_action_date'),
-        ('cutoff date', 'cutoff_date'),
-        ('action date', 'action_date'),
-        ('processing date', 'processing_date'),
-        ('category', 'category'),
-        ('current', 'current'),
-    ]
-
-    for key, value in mappings:
-        if key in header_lower:
-            return value
+    value = _HEADER_EXACT.get(header_lower) or _scan_header_mappings(header_lower)
+    if value is not None:
+        return value
 
     # Normalize spaces: replace multiple spaces with single underscore
-    import re
-    return re.sub(r'\s+', '_', header_lower)
+    return _WHITESPACE_RE.sub('_', header_lower)
+
+
+# extract_visa_type() terms, checked in order of specificity
+_EMPLOYMENT_TERMS_RE = re.compile(r'eb-|employment')
+_DIVERSITY_TERMS_RE = re.compile(r'dv|diversity')
+_FAMILY_TERMS_RE = re.compile(r'family|f[1-4]|f-')
 
 
 def extract_visa_type(category: Dict[str, Any]) -> str:
     """
     Determine visa type (Employment, Family, Diversity) from category data.
+    The visa_category code decides when it has a known prefix; otherwise
+    every key and value is searched for the type's terms.
     """
-    category_str = str(category).lower()
+    code = str(category.get('visa_category', '')).upper()
+    if code.startswith('EB'):
+        return "Employment-Based"
+    if code.startswith('DV'):
+        return "Diversity Visa"
+    if code.startswith(('F', 'IR')):
+        return "Family-Based"
+
+    category_str = ' '.join(f"{key} {value}" for key, value in category.items()).lower()
 
     # Check in order of specificity
-    if any(term in category_str for term in ['eb-', 'employment']):
+    if _EMPLOYMENT_TERMS_RE.search(category_str):
         return "Employment-Based"
-    elif any(term in category_str for term in ['dv', 'diversity']):
+    elif _DIVERSITY_TERMS_RE.search(category_str):
         return "Diversity Visa"
-    elif any(term in category_str for term in ['family', 'f1', 'f2', 'f3', 'f4', 'f-']):
+    elif _FAMILY_TERMS_RE.search(category_str):
         return "Family-Based"
     else:
         return "Unknown"
@@ -4,15 +4,36 @@ Handles JSON export functionality and file operations with error handling.
 """
 
 import json
+import os
 from typing import Dict, Any, Optional
 from pathlib import Path
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:  # optional speedup — fall back to the stdlib json module
+    orjson = None
+
+
+def write_bytes(path: Path, payload: bytes) -> None:
+    """
+    Write payload to path (created or truncated) with raw os.write calls, no file object.
+    Shared by the JSON export and notify.py's email previews.
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(payload)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
 
 def save_to_json(
     data: Dict[str, Any],
     output_path: str = "visa_bulletin_data.json",
-    verbose: bool = False
+    verbose: bool = False,
+    pretty: bool = False
 ) -> bool:
     """
     Save extracted visa bulletin data to a JSON file.
@@ -21,6 +42,7 @@ def save_to_json(
         data: Dictionary containing the visa bulletin data
         output_path: Path where the JSON file will be saved
         verbose: Enable verbose logging
+        pretty: Indent the JSON for human reading; compact by default
         
     Returns:
         True if successful, False otherwise
@@ -34,11 +56,21 @@ def save_to_json(
         if verbose:
             print(f"[PERSIST] Saving data to {output_path}...")
         
-        # Write JSON with pretty formatting
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        
-        file_size = output_file.stat().st_size
+        # Serialise (compact unless pretty), then write the bytes in one go
+        if orjson is not None:
+            option = orjson.OPT_NON_STR_KEYS
+            if pretty:
+                option |= orjson.OPT_INDENT_2
+            payload = orjson.dumps(data, option=option)
+        elif pretty:
+            payload = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+        else:
+            payload = json.dumps(
+                data, ensure_ascii=False, separators=(',', ':')
+            ).encode('utf-8')
+        write_bytes(output_file, payload)
+        
+        file_size = len(payload)
         if verbose:
             print(f"[PERSIST] Successfully saved {len(data.get('categories', []))} categories")
             print(f"[PERSIST] File size: {file_size:,} bytes")
@@ -56,7 +88,8 @@ def save_to_json(
 def save_with_timestamp(
     data: Dict[str, Any],
     output_dir: str = "data",
-    verbose: bool = False
+    verbose: bool = False,
+    pretty: bool = False
 ) -> Optional[str]:
     """
     Save visa bulletin data with a timestamp in the filename.
@@ -66,6 +99,7 @@ def save_with_timestamp(
         data: Dictionary containing the visa bulletin data
         output_dir: Directory where timestamped files will be saved
         verbose: Enable verbose logging
+        pretty: Indent the JSON for human reading; compact by default
         
     Returns:
         Path to the saved file, or None if failed
@@ -75,7 +109,7 @@ def save_with_timestamp(
         filename = f"visa_bulletin_{timestamp}.json"
         output_path = str(Path(output_dir) / filename)
         
-        if save_to_json(data, output_path, verbose):
+        if save_to_json(data, output_path, verbose, pretty):
             if verbose:
                 print(f"[PERSIST] Timestamped file saved: {filename}")
             return output_path
@@ -107,15 +141,18 @@ def load_from_json(input_path: str, verbose: bool = False) -> Optional[Dict[str,
         if verbose:
             print(f"[PERSIST] Loading data from {input_path}...")
         
-        with open(input_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        if orjson is not None:
+            data = orjson.loads(input_file.read_bytes())
+        else:
+            with open(input_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
         
         if verbose:
             print(f"[PERSIST] Successfully loaded {len(data.get('categories', []))} categories")
         
         return data
     
-    except json.JSONDecodeError as e:
+    except json.JSONDecodeError as e:  # also raised by orjson.loads
         print(f"[ERROR] Invalid JSON in {input_path}: {str(e)}")
         return None
     except IOError as e:
@@ -6,12 +6,87 @@ subscription/notification features.
 """
 
 import argparse
+import contextlib
 import json
 import sqlite3
 import sys
+import threading
+import time
 import uuid
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Set, Union
+
+try:
+    import orjson
+except ImportError:  # optional speedup — fall back to the stdlib json module
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # optional — run data is then stored as plain JSON
+    zstandard = None
+
+# Decoder for the JSON columns (data_json, parsed_json, subscriptions.categories).
+# orjson.loads accepts the same str input as json.loads.
+_loads_json = orjson.loads if orjson is not None else json.loads
+
+
+def _dumps_json(obj: Any) -> str:
+    """Serialise obj to compact JSON text for a TEXT column (orjson when available)."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def _dumps_json_blob(obj: Any) -> Union[bytes, str]:
+    """
+    Serialise obj for a BLOB JSON column (data_json, diff_json, parsed_json).
+    orjson's UTF-8 bytes are stored as-is, skipping the decode to str and
+    sqlite3's re-encode; without orjson the compact JSON text is stored.
+    _loads_json reads either form.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+# runs.data_json holds the whole parser output, so with zstandard installed it
+# is stored as a zstd frame (level 3, ~5-10x smaller) once it is big enough for
+# that to pay off. Frames are recognised by their magic number, which JSON text
+# can never start with, so compressed and plain rows mix freely in one table.
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_ZSTD_LEVEL = 3
+_ZSTD_MIN_SIZE = 1024
+# zstandard (de)compressor objects must not be shared between threads.
+_zstd_local = threading.local()
+
+
+def _dumps_run_data(data: Dict[str, Any]) -> Union[bytes, str]:
+    """Serialise run data for runs.data_json, zstd-compressed when available."""
+    blob = _dumps_json_blob(data)
+    if zstandard is None or len(blob) < _ZSTD_MIN_SIZE:
+        return blob
+    compressor = getattr(_zstd_local, "compressor", None)
+    if compressor is None:
+        compressor = _zstd_local.compressor = zstandard.ZstdCompressor(level=_ZSTD_LEVEL)
+    if isinstance(blob, str):
+        blob = blob.encode("utf-8")
+    return compressor.compress(blob)
+
+
+def _loads_run_data(value: Union[bytes, str]) -> Any:
+    """Decode a runs.data_json value written by _dumps_run_data (either form)."""
+    if isinstance(value, bytes) and value.startswith(_ZSTD_MAGIC):
+        if zstandard is None:
+            raise RuntimeError(
+                "Run data is zstd-compressed; install the zstandard package to read it."
+            )
+        decompressor = getattr(_zstd_local, "decompressor", None)
+        if decompressor is None:
+            decompressor = _zstd_local.decompressor = zstandard.ZstdDecompressor()
+        value = decompressor.decompress(value)
+    return _loads_json(value)
 
 
 DEFAULT_DB_PATH = "visa_bulletin.db"
@@ -25,7 +100,7 @@ CREATE TABLE IF NOT EXISTS runs (
     success          INTEGER NOT NULL DEFAULT 0,
     bulletin_date    TEXT,
     source_url       TEXT,
-    data_json        TEXT,
+    data_json        BLOB,
     error_message    TEXT,
     categories_count INTEGER,
     is_deleted       INTEGER NOT NULL DEFAULT 0,
@@ -38,11 +113,21 @@ CREATE TABLE IF NOT EXISTS comparisons (
     previous_run_id INTEGER NOT NULL REFERENCES runs(id),
     compared_at     TEXT    NOT NULL,
     has_changes     INTEGER NOT NULL DEFAULT 0,
-    diff_json       TEXT    NOT NULL
+    diff_json       BLOB    NOT NULL
 );
 
-CREATE INDEX IF NOT EXISTS idx_runs_type_success_started
-    ON runs (run_type, success, started_at DESC);
+-- Run lookups and listings read runs in (started_at DESC, id DESC) order, per
+-- type or across all types. Both indexes store rows in that order, so no query
+-- sorts, and carry success / is_deleted so those filters never touch the table;
+-- the latest-run lookups fetch only the one matching row. The keyset cursor of
+-- get_runs() becomes a range seek on started_at. Replaces the older
+-- idx_runs_type_success_started and idx_runs_lookup.
+DROP INDEX IF EXISTS idx_runs_type_success_started;
+DROP INDEX IF EXISTS idx_runs_lookup;
+CREATE INDEX IF NOT EXISTS idx_runs_type_started
+    ON runs (run_type, started_at DESC, id DESC, success, is_deleted);
+CREATE INDEX IF NOT EXISTS idx_runs_started
+    ON runs (started_at DESC, id DESC, success, is_deleted);
 
 CREATE INDEX IF NOT EXISTS idx_comparisons_run_id ON comparisons (run_id);
 
@@ -58,23 +143,169 @@ CREATE TABLE IF NOT EXISTS subscriptions (
     unsubscribe_token TEXT    NOT NULL UNIQUE
 );
 
-CREATE INDEX IF NOT EXISTS idx_subscriptions_active
-    ON subscriptions (is_active);
+-- Covers iter_active_subscriptions(): the notification query is answered from
+-- the index alone. Replaces the older single-column idx_subscriptions_active.
+DROP INDEX IF EXISTS idx_subscriptions_active;
+CREATE INDEX IF NOT EXISTS idx_subscriptions_active_notify
+    ON subscriptions (is_active, email, categories, unsubscribe_token);
 
 CREATE INDEX IF NOT EXISTS idx_subscriptions_token
     ON subscriptions (unsubscribe_token);
+
+-- Per-category side table from an earlier schema; categories live only in
+-- subscriptions.categories now.
+DROP TABLE IF EXISTS subscription_categories;
+
+CREATE TABLE IF NOT EXISTS http_cache (
+    url           TEXT PRIMARY KEY,
+    etag          TEXT,
+    last_modified TEXT,
+    body          TEXT NOT NULL,
+    fetched_at    TEXT NOT NULL,
+    parsed_json   BLOB
+);
 """
 
 
+def _time_id_insert_sql(
+    table: str, columns: str, placeholders: str, tail: str = "RETURNING id"
+) -> str:
+    """
+    Build an INSERT that allocates its own generate_run_id()-style ID.
+
+    The next ID for the current second is computed by a sub-select inside the
+    INSERT and handed back with RETURNING, so a single statement replaces the
+    separate SELECT MAX(id) round trip. The write lock SQLite takes for the
+    statement also closes the window in which another connection could claim
+    the same ID. If the second's 999 IDs are used up no row is inserted and
+    RETURNING yields nothing.
+
+    tail follows the SELECT, e.g. an ON CONFLICT clause and a wider RETURNING
+    (the WHERE clause already resolves SQLite's INSERT ... SELECT upsert
+    parsing ambiguity).
+
+    The newest ID of the second is read with ORDER BY id DESC LIMIT 1, a
+    single descent of the primary-key B-tree rather than a walk over every ID
+    already issued in that second.
+
+    Parameters: the column values, then (low, high, low, high) for the second.
+    """
+    return f"""
+    INSERT INTO {table} (id, {columns})
+    SELECT next_id, {placeholders}
+      FROM (SELECT COALESCE(
+                (SELECT id FROM {table} WHERE id BETWEEN ? AND ?
+                  ORDER BY id DESC LIMIT 1), ?) + 1 AS next_id)
+     WHERE next_id <= ?
+    {tail}
+"""  # noqa: S608
+
+
+# Subscription statements used on the /api/subscribe hot path. sqlite3 caches
+# compiled statements per connection keyed by SQL text, so with a long-lived
+# connection each of these is parsed and planned once, then reused.
+_STATEMENT_CACHE_SIZE = 256
+
+_SELECT_SUBSCRIPTION_BY_EMAIL_SQL = "SELECT * FROM subscriptions WHERE email = ?"
+
+# Just what upsert_subscription() reports about the row it is about to replace
+_SELECT_SUBSCRIPTION_STATE_SQL = (
+    "SELECT categories, is_active FROM subscriptions WHERE email = ?"
+)
+
+# Creates the row, or reactivates and updates it if the email is already known.
+# A created row still has updated_at NULL, which tells the two outcomes apart.
+_UPSERT_SUBSCRIPTION_SQL = _time_id_insert_sql(
+    "subscriptions",
+    "email, categories, subscribed_at, ip_address, user_agent, "
+    "is_active, unsubscribe_token",
+    "?, ?, ?, ?, ?, 1, ?",
+    tail="""ON CONFLICT (email) DO UPDATE
+       SET categories = excluded.categories, updated_at = excluded.subscribed_at,
+           ip_address = excluded.ip_address, user_agent = excluded.user_agent,
+           is_active = 1
+    RETURNING id, unsubscribe_token, updated_at IS NULL""",
+)
+
+
+# Per-connection tuning for a small, write-light run log. In WAL mode
+# synchronous=NORMAL only fsyncs at checkpoints (durable across application
+# crashes, not power loss); reads go through a memory map and a 20 MB page cache.
+# sqlite3.connect()'s default 5 s timeout already installs a busy handler.
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -20000",
+    # Truncate the WAL file back to 64 MB after a checkpoint resets it
+    "PRAGMA journal_size_limit = 67108864",
+)
+
+# Only meaningful for a database file; an in-memory database has nothing to map
+_MMAP_PRAGMA = "PRAGMA mmap_size = 268435456"
+
+
+# Databases whose WAL is checkpointed by a start_wal_checkpointer() thread in
+# this process; their connections skip the inline autocheckpoint on commit.
+_CHECKPOINTED_PATHS: Set[str] = set()
+_CHECKPOINTER_LOCK = threading.Lock()
+_CHECKPOINT_INTERVAL = 30.0
+
+
+def _apply_connection_pragmas(conn: sqlite3.Connection, db_path: str) -> None:
+    """Apply _CONNECTION_PRAGMAS, plus the memory map for file-backed databases."""
+    for pragma in _CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    if db_path != ":memory:":
+        conn.execute(_MMAP_PRAGMA)
+    if db_path in _CHECKPOINTED_PATHS:
+        conn.execute("PRAGMA wal_autocheckpoint = 0")
+
+
+def start_wal_checkpointer(
+    db_path: str = DEFAULT_DB_PATH,
+    interval: float = _CHECKPOINT_INTERVAL,
+) -> Optional[threading.Thread]:
+    """
+    Checkpoint db_path's WAL from a daemon thread every `interval` seconds.
+
+    By default SQLite checkpoints on whichever commit pushes the WAL past
+    ~1000 pages, stalling that write. For long-running processes (the web
+    app) this moves the work off the write path: connections opened here
+    afterwards turn the inline autocheckpoint off, and the thread runs a
+    PASSIVE checkpoint, which never blocks readers or writers. Short-lived
+    CLI runs keep SQLite's default. Returns the thread, or None if one is
+    already running for db_path.
+    """
+    with _CHECKPOINTER_LOCK:
+        if db_path in _CHECKPOINTED_PATHS:
+            return None
+        _CHECKPOINTED_PATHS.add(db_path)
+
+    def _checkpoint_loop() -> None:
+        conn = sqlite3.connect(db_path)
+        while True:
+            time.sleep(interval)
+            try:
+                conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+            except sqlite3.Error as e:
+                print(f"[ERROR] WAL checkpoint failed: {str(e)}")
+
+    thread = threading.Thread(target=_checkpoint_loop, name="wal-checkpoint", daemon=True)
+    thread.start()
+    return thread
+
+
 def get_connection(db_path: str = DEFAULT_DB_PATH) -> sqlite3.Connection:
     """
-    Open a WAL-mode SQLite connection with foreign keys enabled.
+    Open a WAL-mode SQLite connection with foreign keys enabled and the
+    _CONNECTION_PRAGMAS tuning applied.
     Rows are accessible as dicts via sqlite3.Row factory.
     Use as a context manager to manage connection lifetime.
     """
-    conn = sqlite3.connect(db_path)
+    conn = sqlite3.connect(db_path, cached_statements=_STATEMENT_CACHE_SIZE)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA journal_mode = WAL")
+    _apply_connection_pragmas(conn, db_path)
     conn.execute("PRAGMA foreign_keys = ON")
     return conn
 
@@ -91,6 +322,7 @@ def init_db(db_path: str = DEFAULT_DB_PATH, verbose: bool = False) -> None:
         conn = sqlite3.connect(db_path)
         try:
             conn.execute("PRAGMA journal_mode = WAL")
+            _apply_connection_pragmas(conn, db_path)
             conn.commit()
             conn.executescript(_SCHEMA_SQL)
             # Migration: add is_deleted to runs for databases created before this column existed.
@@ -101,6 +333,12 @@ def init_db(db_path: str = DEFAULT_DB_PATH, verbose: bool = False) -> None:
                 conn.commit()
             except sqlite3.OperationalError:
                 pass  # Column already exists — nothing to do.
+            # Migration: add parsed_json to http_cache for databases created before it existed.
+            try:
+                conn.execute("ALTER TABLE http_cache ADD COLUMN parsed_json BLOB")
+                conn.commit()
+            except sqlite3.OperationalError:
+                pass  # Column already exists — nothing to do.
         finally:
             conn.close()
         if verbose:
@@ -129,13 +367,13 @@ def generate_run_id(conn: sqlite3.Connection, table: str = "runs") -> int:
     low = int(prefix + "000")
     high = int(prefix + "999")
     row = conn.execute(
-        f"SELECT MAX(id) FROM {table} WHERE id >= ? AND id <= ?",  # noqa: S608
+        f"SELECT id FROM {table} WHERE id BETWEEN ? AND ? "  # noqa: S608
+        "ORDER BY id DESC LIMIT 1",
         (low, high),
     ).fetchone()
-    max_id = row[0]
-    if max_id is None:
+    if row is None:
         return int(prefix + "001")
-    seq = (max_id % 1000) + 1
+    seq = (row[0] % 1000) + 1
     if seq > 999:
         raise RuntimeError(
             f"More than 999 {table} IDs generated in the same second; try again in a moment."
@@ -143,6 +381,145 @@ def generate_run_id(conn: sqlite3.Connection, table: str = "runs") -> int:
     return int(prefix + f"{seq:03d}")
 
 
+def _execute_time_id_insert(
+    conn: sqlite3.Connection, sql: str, table: str, params: tuple
+) -> sqlite3.Row:
+    """Execute a _time_id_insert_sql() statement and return its RETURNING row."""
+    prefix = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+    low = int(prefix + "000")
+    high = int(prefix + "999")
+    row = conn.execute(sql, params + (low, high, low, high)).fetchone()
+    if row is None:
+        raise RuntimeError(
+            f"More than 999 {table} IDs generated in the same second; try again in a moment."
+        )
+    return row
+
+
+def _insert_with_time_id(
+    conn: sqlite3.Connection, sql: str, table: str, params: tuple
+) -> int:
+    """Execute a _time_id_insert_sql() statement and return the allocated ID."""
+    return _execute_time_id_insert(conn, sql, table, params)[0]
+
+
+def _write_transaction(conn: sqlite3.Connection, commit: bool):
+    """
+    Transaction scope for writers with a ``commit`` flag: ``with conn`` when the
+    call owns its transaction (commit on success, roll back on error), a no-op
+    when the caller batches the write into its own open transaction.
+    """
+    return conn if commit else contextlib.nullcontext()
+
+
+_RUN_COLUMNS = (
+    "run_type, started_at, completed_at, success, "
+    "bulletin_date, source_url, data_json, error_message, categories_count"
+)
+
+_INSERT_RUN_SQL = f"""
+    INSERT INTO runs (id, {_RUN_COLUMNS})
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Run lookups, kept as constants so every call hands sqlite3 the same SQL text
+# and hits its per-connection statement cache (see _STATEMENT_CACHE_SIZE).
+# The latest-run sub-selects are answered from idx_runs_type_started alone; the
+# outer query then fetches just that one row by primary key. Runs that share a
+# started_at fall back to id, which is allocated in insert order.
+_LAST_SUCCESSFUL_RUN_SQL = """
+    SELECT * FROM runs WHERE id = (
+        SELECT id FROM runs
+        WHERE run_type = ? AND success = 1 AND is_deleted = 0
+        ORDER BY started_at DESC, id DESC LIMIT 1
+    )
+"""
+
+_LAST_SUCCESSFUL_RUN_EXCLUDING_SQL = """
+    SELECT * FROM runs WHERE id = (
+        SELECT id FROM runs
+        WHERE run_type = ? AND success = 1 AND is_deleted = 0 AND id != ?
+        ORDER BY started_at DESC, id DESC LIMIT 1
+    )
+"""
+
+_LAST_SUCCESSFUL_RUNS_SQL = """
+    SELECT * FROM runs
+    WHERE run_type = ? AND success = 1 AND is_deleted = 0
+    ORDER BY started_at DESC, id DESC LIMIT ?
+"""
+
+_SELECT_RUN_BY_ID_SQL = "SELECT * FROM runs WHERE id = ?"
+
+
+@lru_cache(maxsize=None)
+def _list_runs_sql(
+    by_type: bool, success_only: bool, include_deleted: bool, keyset: bool = False
+) -> str:
+    """
+    iter_runs() SQL for one combination of filters (built once per combination).
+
+    With keyset, the page starts strictly after the cursor run in
+    (started_at, id) order; the row-value comparison becomes a range seek on
+    idx_runs_type_started (or idx_runs_started without a type filter), so a
+    deep page costs the same as the first one.
+    """
+    conditions = []
+    if by_type:
+        conditions.append("run_type = ?")
+    if success_only:
+        conditions.append("success = 1")
+    if not include_deleted:
+        conditions.append("is_deleted = 0")
+    if keyset:
+        conditions.append(
+            "(started_at, id) < (SELECT started_at, id FROM runs WHERE id = ?)"
+        )
+    where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+    return (
+        f"SELECT id, run_type, started_at, completed_at, success, "  # noqa: S608
+        f"bulletin_date, source_url, error_message, categories_count, is_deleted "
+        f"FROM runs {where} ORDER BY started_at DESC, id DESC LIMIT ?"
+    )
+
+
+_INSERT_RUN_NEXT_ID_SQL = _time_id_insert_sql(
+    "runs", _RUN_COLUMNS, "?, ?, ?, ?, ?, ?, ?, ?, ?"
+)
+
+_INSERT_COMPARISON_NEXT_ID_SQL = _time_id_insert_sql(
+    "comparisons",
+    "run_id, previous_run_id, compared_at, has_changes, diff_json",
+    "?, ?, ?, ?, ?",
+)
+
+
+def _run_params(
+    run_type: str,
+    started_at: str,
+    success: bool,
+    bulletin_date: Optional[str] = None,
+    source_url: Optional[str] = None,
+    data: Optional[Dict[str, Any]] = None,
+    error_message: Optional[str] = None,
+    completed_at: Optional[str] = None,
+) -> tuple:
+    """Bind parameters for the runs columns after id; data is serialised by _dumps_run_data."""
+    data_json = _dumps_run_data(data) if data is not None else None
+    categories_count = len(data.get("categories", [])) if data else None
+    return (
+        run_type,
+        started_at,
+        completed_at,
+        int(success),
+        bulletin_date,
+        source_url,
+        data_json,
+        error_message,
+        categories_count,
+    )
+
+
 def insert_run(
     conn: sqlite3.Connection,
     run_type: str,
@@ -154,6 +531,7 @@ def insert_run(
     error_message: Optional[str] = None,
     completed_at: Optional[str] = None,
     verbose: bool = False,
+    commit: bool = True,
 ) -> int:
     """
     Insert a new row into the runs table.
@@ -169,39 +547,22 @@ def insert_run(
         error_message: Error description; None on success.
         completed_at: ISO-8601 UTC timestamp when the run ended
         verbose: Enable verbose logging
+        commit: If False, leave the write in the caller's open transaction
 
     Returns:
         The new run's integer ID
     """
     try:
-        run_id = generate_run_id(conn, "runs")
-        data_json = (
-            json.dumps(data, ensure_ascii=False, separators=(",", ":"))
-            if data is not None
-            else None
-        )
-        categories_count = len(data.get("categories", [])) if data else None
-        conn.execute(
-            """
-            INSERT INTO runs
-                (id, run_type, started_at, completed_at, success,
-                 bulletin_date, source_url, data_json, error_message, categories_count)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                run_id,
-                run_type,
-                started_at,
-                completed_at,
-                int(success),
-                bulletin_date,
-                source_url,
-                data_json,
-                error_message,
-                categories_count,
-            ),
-        )
-        conn.commit()
+        with _write_transaction(conn, commit):
+            run_id = _insert_with_time_id(
+                conn,
+                _INSERT_RUN_NEXT_ID_SQL,
+                "runs",
+                _run_params(
+                    run_type, started_at, success, bulletin_date,
+                    source_url, data, error_message, completed_at,
+                ),
+            )
         if verbose:
             status = "success" if success else "failure"
             print(f"[STORE] Recorded run {run_id} (type={run_type}, status={status})")
@@ -214,47 +575,118 @@ def insert_run(
         raise
 
 
+def insert_runs_bulk(
+    conn: sqlite3.Connection,
+    runs: List[Dict[str, Any]],
+    verbose: bool = False,
+) -> List[int]:
+    """
+    Insert many runs (e.g. a backfill of historic bulletins) in one transaction.
+
+    Each dict in runs holds insert_run()'s keyword arguments (run_type,
+    started_at, success, and optionally bulletin_date, source_url, data,
+    error_message, completed_at). IDs are allocated as one consecutive block,
+    the rows are written with a single executemany(), and the transaction is
+    committed once; on any error nothing is inserted. The transaction is
+    opened with BEGIN IMMEDIATE, so no other connection can write between the
+    ID lookup and the insert.
+
+    Returns:
+        The new run IDs, in the order of runs
+    """
+    if not runs:
+        return []
+    try:
+        with conn:
+            if not conn.in_transaction:
+                conn.execute("BEGIN IMMEDIATE")
+            first_id = generate_run_id(conn, "runs")
+            if first_id % 1000 + len(runs) - 1 > 999:
+                raise RuntimeError(
+                    f"Cannot allocate {len(runs)} run IDs within one second; "
+                    "split the import into smaller batches."
+                )
+            run_ids = [first_id + i for i in range(len(runs))]
+            conn.executemany(
+                _INSERT_RUN_SQL,
+                ((run_id,) + _run_params(**run) for run_id, run in zip(run_ids, runs)),
+            )
+        if verbose:
+            print(f"[STORE] Recorded {len(run_ids)} runs ({run_ids[0]}..{run_ids[-1]})")
+        return run_ids
+    except Exception as e:
+        print(f"[ERROR] Failed to bulk insert runs: {str(e)}")
+        raise
+
+
+def parse_run_data(run: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Deserialise a run's data_json column (e.g. from a parse_data=False lookup).
+    Returns None if the run stored no data.
+    """
+    return _loads_run_data(run["data_json"]) if run["data_json"] else None
+
+
+class RunRecord(dict):
+    """
+    A runs row as a dict whose 'data' key is decoded from data_json only when
+    first read (record["data"] or record.get("data")), then kept. Callers that
+    only look at metadata such as id or bulletin_date never pay for the decode.
+    "data" in record is true from the start, like the eagerly decoded dicts.
+    """
+
+    __slots__ = ()
+
+    def __missing__(self, key: str) -> Any:
+        if key == "data" and dict.__contains__(self, "data_json"):
+            value = self["data"] = parse_run_data(self)
+            return value
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key: object) -> bool:
+        if dict.__contains__(self, key):
+            return True
+        return key == "data" and dict.__contains__(self, "data_json")
+
+
 def get_last_successful_run(
     conn: sqlite3.Connection,
     run_type: str,
     exclude_run_id: Optional[int] = None,
     verbose: bool = False,
+    parse_data: bool = True,
 ) -> Optional[Dict[str, Any]]:
     """
-    Return the most recent successful run of the given type as a dict.
-    data_json is deserialised into a 'data' key. Returns None if no match.
+    Return the most recent successful run of the given type as a RunRecord,
+    whose 'data' key holds data_json deserialised on first access. Returns
+    None if no match.
 
     Args:
         conn: Active SQLite connection
         run_type: Filter by run type ('official', 'test', 'benchmark', 'manual')
         exclude_run_id: Skip this run ID (use to exclude the current run)
         verbose: Enable verbose logging
+        parse_data: If False, skip deserialising data_json (no 'data' key); for
+                    callers that only need run metadata, or decode it later
     """
     try:
         if exclude_run_id is not None:
             row = conn.execute(
-                """
-                SELECT * FROM runs
-                WHERE run_type = ? AND success = 1 AND is_deleted = 0 AND id != ?
-                ORDER BY started_at DESC LIMIT 1
-                """,
-                (run_type, exclude_run_id),
+                _LAST_SUCCESSFUL_RUN_EXCLUDING_SQL, (run_type, exclude_run_id)
             ).fetchone()
         else:
-            row = conn.execute(
-                """
-                SELECT * FROM runs
-                WHERE run_type = ? AND success = 1 AND is_deleted = 0
-                ORDER BY started_at DESC LIMIT 1
-                """,
-                (run_type,),
-            ).fetchone()
+            row = conn.execute(_LAST_SUCCESSFUL_RUN_SQL, (run_type,)).fetchone()
         if row is None:
             if verbose:
                 print(f"[STORE] No previous successful '{run_type}' run found.")
             return None
-        result = dict(row)
-        result["data"] = json.loads(result["data_json"]) if result["data_json"] else None
+        result = RunRecord(row) if parse_data else dict(row)
         if verbose:
             print(
                 f"[STORE] Found previous run {result['id']} "
@@ -266,13 +698,34 @@ def get_last_successful_run(
         return None
 
 
+def get_last_successful_runs(
+    conn: sqlite3.Connection,
+    run_type: str,
+    limit: int = 2,
+) -> List[Dict[str, Any]]:
+    """
+    Return up to `limit` most recent successful runs of the given type, newest
+    first, as RunRecords (data_json deserialised into 'data' on first access).
+
+    Equivalent to repeated get_last_successful_run() calls with exclude_run_id,
+    but answered by a single query.
+
+    Args:
+        conn: Active SQLite connection
+        run_type: Filter by run type ('official', 'test', 'benchmark', 'manual')
+        limit: Maximum number of runs to return
+    """
+    rows = conn.execute(_LAST_SUCCESSFUL_RUNS_SQL, (run_type, limit)).fetchall()
+    return [RunRecord(row) for row in rows]
+
+
 def get_run_by_id(
     run_id: int,
     db_path: str = DEFAULT_DB_PATH,
     verbose: bool = False,
 ) -> Optional[Dict[str, Any]]:
     """
-    Return a single run row by ID, with data_json deserialised into 'data'.
+    Return a single run row by ID as a RunRecord ('data' decoded on first access).
     Returns None if no run with that ID exists.
 
     Args:
@@ -282,16 +735,12 @@ def get_run_by_id(
     """
     try:
         with get_connection(db_path) as conn:
-            row = conn.execute(
-                "SELECT * FROM runs WHERE id = ?",
-                (run_id,),
-            ).fetchone()
+            row = conn.execute(_SELECT_RUN_BY_ID_SQL, (run_id,)).fetchone()
         if row is None:
             if verbose:
                 print(f"[STORE] No run found with id={run_id}")
             return None
-        result = dict(row)
-        result["data"] = json.loads(result["data_json"]) if result["data_json"] else None
+        result = RunRecord(row)
         if verbose:
             print(f"[STORE] Found run {run_id} (bulletin: {result['bulletin_date']})")
         return result
@@ -307,6 +756,7 @@ def insert_comparison(
     compared_at: str,
     diff: Dict[str, Any],
     verbose: bool = False,
+    commit: bool = True,
 ) -> int:
     """
     Insert a comparison result between two runs.
@@ -318,23 +768,21 @@ def insert_comparison(
         compared_at: ISO-8601 UTC timestamp of the comparison
         diff: Structured diff dict from compare.compare_bulletins()
         verbose: Enable verbose logging
+        commit: If False, leave the write in the caller's open transaction
 
     Returns:
         The new comparison's integer ID
     """
     try:
-        cmp_id = generate_run_id(conn, "comparisons")
         has_changes = int(diff.get("has_changes", False))
-        diff_json = json.dumps(diff, ensure_ascii=False, separators=(",", ":"))
-        conn.execute(
-            """
-            INSERT INTO comparisons
-                (id, run_id, previous_run_id, compared_at, has_changes, diff_json)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """,
-            (cmp_id, run_id, previous_run_id, compared_at, has_changes, diff_json),
-        )
-        conn.commit()
+        diff_json = _dumps_json_blob(diff)
+        with _write_transaction(conn, commit):
+            cmp_id = _insert_with_time_id(
+                conn,
+                _INSERT_COMPARISON_NEXT_ID_SQL,
+                "comparisons",
+                (run_id, previous_run_id, compared_at, has_changes, diff_json),
+            )
         if verbose:
             print(
                 f"[STORE] Recorded comparison {cmp_id} "
@@ -346,6 +794,40 @@ def insert_comparison(
         raise
 
 
+def iter_runs(
+    conn: sqlite3.Connection,
+    run_type: Optional[str] = None,
+    limit: int = 20,
+    success_only: bool = False,
+    include_deleted: bool = False,
+    batch_size: int = 200,
+    before_run_id: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield runs in reverse chronological order as dicts (without data_json).
+
+    Takes the same filters as get_runs(). Rows are pulled batch_size at a time,
+    so only one batch is held in memory and callers can stop early. Errors are
+    raised to the caller; the connection must stay open until the generator
+    is exhausted.
+    """
+    params: tuple = (run_type,) if run_type is not None else ()
+    if before_run_id is not None:
+        params += (before_run_id,)
+    cur = conn.execute(
+        _list_runs_sql(
+            run_type is not None, success_only, include_deleted, before_run_id is not None
+        ),
+        params + (limit,),
+    )
+    while True:
+        rows = cur.fetchmany(batch_size)
+        if not rows:
+            break
+        for r in rows:
+            yield dict(r)
+
+
 def get_runs(
     conn: sqlite3.Connection,
     run_type: Optional[str] = None,
@@ -353,6 +835,7 @@ def get_runs(
     success_only: bool = False,
     include_deleted: bool = False,
     verbose: bool = False,
+    before_run_id: Optional[int] = None,
 ) -> List[Dict[str, Any]]:
     """
     List runs in reverse chronological order. data_json is NOT deserialised (keep it cheap).
@@ -364,29 +847,24 @@ def get_runs(
         success_only: If True, only return successful runs
         include_deleted: If True, include soft-deleted runs (default: False)
         verbose: Enable verbose logging
+        before_run_id: Page cursor; only return runs listed after this run ID
+                       (pass the last ID of the previous page). If that run
+                       does not exist, nothing is returned.
 
     Returns:
         List of dicts matching the runs table columns (without data_json)
     """
     try:
-        conditions = []
-        params: list = []
-        if run_type is not None:
-            conditions.append("run_type = ?")
-            params.append(run_type)
-        if success_only:
-            conditions.append("success = 1")
-        if not include_deleted:
-            conditions.append("is_deleted = 0")
-        where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
-        params.append(limit)
-        rows = conn.execute(
-            f"SELECT id, run_type, started_at, completed_at, success, "  # noqa: S608
-            f"bulletin_date, source_url, error_message, categories_count, is_deleted "
-            f"FROM runs {where} ORDER BY started_at DESC LIMIT ?",
-            params,
-        ).fetchall()
-        result = [dict(r) for r in rows]
+        result = list(
+            iter_runs(
+                conn,
+                run_type=run_type,
+                limit=limit,
+                success_only=success_only,
+                include_deleted=include_deleted,
+                before_run_id=before_run_id,
+            )
+        )
         if verbose:
             print(f"[STORE] Retrieved {len(result)} run(s)")
         return result
@@ -395,6 +873,98 @@ def get_runs(
         return []
 
 
+# ---------------------------------------------------------------------------
+# HTTP cache functions
+# ---------------------------------------------------------------------------
+
+
+def get_http_cache(
+    conn: sqlite3.Connection,
+    url: str,
+) -> Optional[Dict[str, Any]]:
+    """
+    Return the cached response for a URL (keys: url, etag, last_modified, body,
+    fetched_at, parsed_json), or None if the URL has not been cached.
+    """
+    row = conn.execute("SELECT * FROM http_cache WHERE url = ?", (url,)).fetchone()
+    return dict(row) if row is not None else None
+
+
+def upsert_http_cache(
+    conn: sqlite3.Connection,
+    url: str,
+    body: str,
+    etag: Optional[str] = None,
+    last_modified: Optional[str] = None,
+) -> None:
+    """
+    Store a response body with its ETag / Last-Modified validators, replacing any
+    previous entry for the URL (and dropping its memoised parse). Used to make
+    conditional GETs on later runs.
+
+    Args:
+        conn: Active SQLite connection
+        url: Requested URL
+        body: Decoded response body
+        etag: ETag response header (may be None)
+        last_modified: Last-Modified response header (may be None)
+    """
+    with conn:
+        conn.execute(
+            """
+            INSERT INTO http_cache (url, etag, last_modified, body, fetched_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET
+                etag = excluded.etag,
+                last_modified = excluded.last_modified,
+                body = excluded.body,
+                fetched_at = excluded.fetched_at,
+                parsed_json = NULL
+            """,
+            (url, etag, last_modified, body, datetime.now(timezone.utc).isoformat()),
+        )
+
+
+def get_cached_parse(
+    conn: sqlite3.Connection,
+    url: str,
+    body: str,
+) -> Optional[Dict[str, Any]]:
+    """
+    Return the parser output memoised for url, or None. Only a parse of exactly
+    this body counts, so a changed page is never answered from the memo.
+    """
+    row = conn.execute(
+        "SELECT body, parsed_json FROM http_cache WHERE url = ?", (url,)
+    ).fetchone()
+    if row is None or row["parsed_json"] is None or row["body"] != body:
+        return None
+    return _loads_json(row["parsed_json"])
+
+
+def set_cached_parse(
+    conn: sqlite3.Connection,
+    url: str,
+    body: str,
+    data: Dict[str, Any],
+) -> None:
+    """
+    Memoise the parser output for a cached URL. No-op unless http_cache holds
+    this exact body for the URL.
+
+    Args:
+        conn: Active SQLite connection
+        url: Bulletin URL
+        body: HTML the data was parsed from
+        data: Parser output dict; serialised to compact JSON
+    """
+    with conn:
+        conn.execute(
+            "UPDATE http_cache SET parsed_json = ? WHERE url = ? AND body = ?",
+            (_dumps_json_blob(data), url, body),
+        )
+
+
 # ---------------------------------------------------------------------------
 # Subscription functions
 # ---------------------------------------------------------------------------
@@ -407,6 +977,7 @@ def upsert_subscription(
     subscribed_at: str,
     ip_address: Optional[str] = None,
     user_agent: Optional[str] = None,
+    commit: bool = True,
 ) -> Dict[str, Any]:
     """
     Insert a new subscription or update an existing one for the same email.
@@ -426,54 +997,39 @@ def upsert_subscription(
         subscribed_at: ISO-8601 UTC timestamp of this request
         ip_address: Client IP address (may be None)
         user_agent: Browser User-Agent string (may be None)
+        commit: If False, leave the write in the caller's open transaction so
+                several upserts can be committed together
     """
-    categories_json = json.dumps(categories, ensure_ascii=False, separators=(",", ":"))
-
-    existing = get_subscription_by_email(conn, email)
-
-    if existing is None:
-        sub_id = generate_run_id(conn, "subscriptions")
-        token = str(uuid.uuid4())
-        conn.execute(
-            """
-            INSERT INTO subscriptions
-                (id, email, categories, subscribed_at, ip_address, user_agent,
-                 is_active, unsubscribe_token)
-            VALUES (?, ?, ?, ?, ?, ?, 1, ?)
-            """,
-            (sub_id, email, categories_json, subscribed_at, ip_address, user_agent, token),
+    categories_json = _dumps_json(categories)
+
+    # RETURNING only reports the row after the write, so the state being
+    # replaced is read first; the write itself is one atomic upsert, which
+    # also settles a race between two requests for the same new email.
+    with _write_transaction(conn, commit):
+        previous = conn.execute(_SELECT_SUBSCRIPTION_STATE_SQL, (email,)).fetchone()
+        sub_id, token, created = _execute_time_id_insert(
+            conn,
+            _UPSERT_SUBSCRIPTION_SQL,
+            "subscriptions",
+            (email, categories_json, subscribed_at, ip_address, user_agent, str(uuid.uuid4())),
         )
-        conn.commit()
-        return {
-            "id": sub_id,
-            "status": "created",
-            "email": email,
-            "categories": categories,
-            "previous_categories": None,
-            "unsubscribe_token": token,
-        }
+
+    if created:
+        status = "created"
+    elif previous is not None and previous["is_active"] != 1:
+        status = "resubscribed"
     else:
-        was_active = existing["is_active"] == 1
-        previous_categories = existing["categories"]
-        conn.execute(
-            """
-            UPDATE subscriptions
-               SET categories = ?, updated_at = ?, ip_address = ?,
-                   user_agent = ?, is_active = 1
-             WHERE email = ?
-            """,
-            (categories_json, subscribed_at, ip_address, user_agent, email),
-        )
-        conn.commit()
-        status = "updated" if was_active else "resubscribed"
-        return {
-            "id": existing["id"],
-            "status": status,
-            "email": email,
-            "categories": categories,
-            "previous_categories": previous_categories,
-            "unsubscribe_token": existing["unsubscribe_token"],
-        }
+        status = "updated"
+    return {
+        "id": sub_id,
+        "status": status,
+        "email": email,
+        "categories": categories,
+        "previous_categories": (
+            _loads_json(previous["categories"]) if previous is not None else None
+        ),
+        "unsubscribe_token": token,
+    }
 
 
 def get_subscription_by_email(
@@ -486,16 +1042,42 @@ def get_subscription_by_email(
 
     The 'categories' key is returned as a Python list (deserialized from JSON).
     """
-    row = conn.execute(
-        "SELECT * FROM subscriptions WHERE email = ?", (email,)
-    ).fetchone()
+    row = conn.execute(_SELECT_SUBSCRIPTION_BY_EMAIL_SQL, (email,)).fetchone()
     if row is None:
         return None
     result = dict(row)
-    result["categories"] = json.loads(result["categories"])
+    result["categories"] = _loads_json(result["categories"])
     return result
 
 
+def iter_active_subscriptions(
+    conn: sqlite3.Connection,
+    batch_size: int = 500,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield every active subscription as a dict with keys email, categories
+    (a Python list) and unsubscribe_token.
+
+    Only the columns needed to render a notification are selected, and rows
+    are pulled batch_size at a time so the full table is never held in memory.
+    The connection must stay open until the generator is exhausted.
+    """
+    cur = conn.execute(
+        "SELECT email, categories, unsubscribe_token "
+        "FROM subscriptions WHERE is_active = 1"
+    )
+    while True:
+        rows = cur.fetchmany(batch_size)
+        if not rows:
+            break
+        for email, categories, unsubscribe_token in rows:
+            yield {
+                "email": email,
+                "categories": _loads_json(categories),
+                "unsubscribe_token": unsubscribe_token,
+            }
+
+
 def get_active_subscriptions_for_category(
     conn: sqlite3.Connection,
     category_key: str,
@@ -521,7 +1103,7 @@ def get_active_subscriptions_for_category(
     result = []
     for row in rows:
         d = dict(row)
-        d["categories"] = json.loads(d["categories"])
+        d["categories"] = _loads_json(d["categories"])
         result.append(d)
     return result
 
@@ -554,7 +1136,7 @@ def get_subscriptions(
     result = []
     for row in rows:
         d = dict(row)
-        d["categories"] = json.loads(d["categories"])
+        d["categories"] = _loads_json(d["categories"])
         result.append(d)
     return result
 
@@ -579,13 +1161,12 @@ def soft_delete_run(
     Returns:
         True if the run was found and marked deleted, False if not found or already deleted.
     """
-    row = conn.execute(
-        "SELECT id FROM runs WHERE id = ? AND is_deleted = 0", (run_id,)
-    ).fetchone()
-    if row is None:
+    with conn:
+        cursor = conn.execute(
+            "UPDATE runs SET is_deleted = 1 WHERE id = ? AND is_deleted = 0", (run_id,)
+        )
+    if cursor.rowcount == 0:
         return False
-    conn.execute("UPDATE runs SET is_deleted = 1 WHERE id = ?", (run_id,))
-    conn.commit()
     if verbose:
         print(f"[STORE] Run {run_id} marked as deleted.")
     return True
@@ -601,19 +1182,16 @@ def deactivate_subscription(
     Returns the subscription dict (with 'categories' as a list) if found and
     deactivated, or None if no active subscription matches the token.
     """
-    row = conn.execute(
-        "SELECT * FROM subscriptions WHERE unsubscribe_token = ? AND is_active = 1",
-        (unsubscribe_token,),
-    ).fetchone()
+    with conn:
+        row = conn.execute(
+            "UPDATE subscriptions SET is_active = 0 "
+            "WHERE unsubscribe_token = ? AND is_active = 1 RETURNING *",
+            (unsubscribe_token,),
+        ).fetchone()
     if row is None:
         return None
-    conn.execute(
-        "UPDATE subscriptions SET is_active = 0 WHERE unsubscribe_token = ?",
-        (unsubscribe_token,),
-    )
-    conn.commit()
     result = dict(row)
-    result["categories"] = json.loads(result["categories"])
+    result["categories"] = _loads_json(result["categories"])
     return result
 
 
@@ -669,6 +1247,7 @@ def _cmd_runs(args: argparse.Namespace) -> None:
             limit=args.limit,
             success_only=args.success_only,
             include_deleted=args.include_deleted,
+            before_run_id=args.before,
         )
     _print_runs_table(runs)
 
@@ -778,6 +1357,13 @@ Examples:
         action="store_true",
         help="Include soft-deleted runs",
     )
+    runs_p.add_argument(
+        "--before",
+        type=int,
+        default=None,
+        metavar="ID",
+        help="Show the page of runs listed after this run ID",
+    )
     runs_p.set_defaults(func=_cmd_runs)
 
     # --- run ---
@@ -0,0 +1,320 @@
+"""Tests for the Flask subscription routes in app.py."""
+
+import os
+import queue
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import Future
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import app as app_module
+from store import get_connection, get_subscription_by_email, init_db
+
+_DB_PATH = None
+
+
+def setUpModule():
+    # The writer thread and each thread's pooled connection live for the whole
+    # process, so every test in this module shares one database.
+    global _DB_PATH
+    fd, _DB_PATH = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    init_db(_DB_PATH)
+    app_module._DB_PATH = _DB_PATH
+
+
+def tearDownModule():
+    os.unlink(_DB_PATH)
+
+
+class _AppTestCase(unittest.TestCase):
+    def setUp(self):
+        with get_connection(_DB_PATH) as conn:
+            conn.execute("DELETE FROM subscriptions")
+        self.client = app_module.app.test_client()
+
+    def _subscribe(self, email="user@example.com", categories=("EB-2", "F2A")):
+        return self.client.post(
+            "/api/subscribe", json={"email": email, "categories": list(categories)}
+        )
+
+    def _stored(self, email):
+        with get_connection(_DB_PATH) as conn:
+            return get_subscription_by_email(conn, email)
+
+
+class TestSubscribeRoute(_AppTestCase):
+    def test_new_subscription_returns_created(self):
+        resp = self._subscribe()
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.get_json(), {
+            "status": "created",
+            "email": "user@example.com",
+            "categories": ["EB-2", "F2A"],
+        })
+
+    def test_subscription_is_stored(self):
+        self._subscribe()
+        stored = self._stored("user@example.com")
+        self.assertIsNotNone(stored)
+        self.assertEqual(stored["categories"], ["EB-2", "F2A"])
+
+    def test_update_returns_previous_categories(self):
+        self._subscribe(categories=["EB-2"])
+        resp = self._subscribe(categories=["F2A"])
+        body = resp.get_json()
+        self.assertEqual(body["status"], "updated")
+        self.assertEqual(body["categories"], ["F2A"])
+        self.assertEqual(body["previous_categories"], ["EB-2"])
+
+    def test_email_is_normalised(self):
+        resp = self._subscribe(email="  User@Example.COM ")
+        self.assertEqual(resp.get_json()["email"], "user@example.com")
+
+    def test_categories_deduplicated_and_sorted(self):
+        resp = self._subscribe(categories=["F2A", "EB-2", "F2A"])
+        self.assertEqual(resp.get_json()["categories"], ["EB-2", "F2A"])
+
+    def test_unsubscribe_token_not_exposed(self):
+        resp = self._subscribe()
+        self.assertNotIn("unsubscribe_token", resp.get_json())
+
+    def test_missing_email(self):
+        resp = self.client.post("/api/subscribe", json={"categories": ["EB-2"]})
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.get_json()["message"], "Email is required.")
+
+    def test_invalid_email(self):
+        resp = self._subscribe(email="not-an-email")
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.get_json()["message"], "Invalid email address.")
+
+    def test_no_categories(self):
+        resp = self._subscribe(categories=[])
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.get_json()["message"], "Select at least one visa category.")
+
+    def test_unknown_category(self):
+        resp = self._subscribe(categories=["EB-2", "H-1B"])
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.get_json()["message"], "Unknown category/categories: H-1B")
+
+    def test_non_json_body(self):
+        resp = self.client.post("/api/subscribe", data="email=user@example.com")
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.get_json()["message"], "Request body must be JSON.")
+
+    def test_oversized_body_rejected(self):
+        resp = self._subscribe(categories=["EB-2"] * 1000)
+        self.assertEqual(resp.status_code, 413)
+
+
+class TestSubscribeBodyParity(_AppTestCase):
+    """The msgspec and fallback body parsers must give the same answer for the same body."""
+
+    BODIES = [
+        b"",
+        b"not json",
+        b"null",
+        b"[]",
+        b'["user@example.com"]',
+        b'"user@example.com"',
+        b"{}",
+        b'{"unrelated": 1}',
+        b'{"email": null, "categories": ["EB-2"]}',
+        b'{"email": 5, "categories": ["EB-2"]}',
+        b'{"email": "user@example.com"}',
+        b'{"email": "user@example.com", "categories": "EB-2"}',
+        b'{"email": "user@example.com", "categories": [1, 2]}',
+        b'{"email": "user@example.com", "categories": [["EB-2"]]}',
+        b'{"email": "user@example.com", "categories": ["H-1B"]}',
+        b'{"email": "user@example.com", "categories": ["EB-2"]}',
+    ]
+
+    def _post(self, body):
+        resp = self.client.post(
+            "/api/subscribe", data=body, content_type="application/json"
+        )
+        return resp.status_code, resp.get_json()
+
+    @unittest.skipIf(app_module.msgspec is None, "msgspec not installed")
+    def test_msgspec_and_fallback_agree(self):
+        for body in self.BODIES:
+            with self.subTest(body=body):
+                with get_connection(_DB_PATH) as conn:
+                    conn.execute("DELETE FROM subscriptions")
+                with_msgspec = self._post(body)
+                with get_connection(_DB_PATH) as conn:
+                    conn.execute("DELETE FROM subscriptions")
+                with patch.object(app_module, "msgspec", None):
+                    without_msgspec = self._post(body)
+                self.assertEqual(with_msgspec, without_msgspec)
+
+    def test_empty_object(self):
+        status, body = self._post(b"{}")
+        self.assertEqual(status, 400)
+        self.assertEqual(body["message"], "Request body must be JSON.")
+
+    def test_null_email(self):
+        status, body = self._post(b'{"email": null, "categories": ["EB-2"]}')
+        self.assertEqual(status, 400)
+        self.assertEqual(body["message"], "Email is required.")
+
+    def test_non_string_email(self):
+        status, body = self._post(b'{"email": 5, "categories": ["EB-2"]}')
+        self.assertEqual(status, 400)
+        self.assertEqual(body["message"], "Invalid email address.")
+
+    def test_non_string_categories(self):
+        status, body = self._post(b'{"email": "user@example.com", "categories": [1]}')
+        self.assertEqual(status, 400)
+        self.assertEqual(body["message"], "Categories must be a list of strings.")
+
+
+class TestUnsubscribeRoute(_AppTestCase):
+    def _token(self, email="user@example.com"):
+        self._subscribe(email=email)
+        return self._stored(email)["unsubscribe_token"]
+
+    def test_valid_token_deactivates(self):
+        resp = self.client.get(f"/api/unsubscribe?token={self._token()}")
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn(b"user@example.com", resp.data)
+        self.assertEqual(self._stored("user@example.com")["is_active"], 0)
+
+    def test_token_cannot_be_reused(self):
+        token = self._token()
+        self.client.get(f"/api/unsubscribe?token={token}")
+        resp = self.client.get(f"/api/unsubscribe?token={token}")
+        self.assertEqual(resp.status_code, 400)
+
+    def test_unknown_token(self):
+        resp = self.client.get("/api/unsubscribe?token=not-a-real-token")
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(
+            resp.get_json()["message"], "Invalid or already-used unsubscribe link."
+        )
+
+    def test_missing_token(self):
+        resp = self.client.get("/api/unsubscribe")
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.get_json()["message"], "Missing unsubscribe token.")
+
+    def test_resubscribe_after_unsubscribe(self):
+        self.client.get(f"/api/unsubscribe?token={self._token()}")
+        resp = self._subscribe()
+        self.assertEqual(resp.get_json()["status"], "resubscribed")
+
+
+class TestWriteQueue(_AppTestCase):
+    def test_bad_item_does_not_fail_batch(self):
+        good, bad = Future(), Future()
+        batch = [
+            {"params": {"email": "good@example.com", "categories": ["EB-2"],
+                        "subscribed_at": "2026-02-18T20:00:00+00:00"}, "future": good},
+            {"params": {"email": None, "categories": ["EB-2"],
+                        "subscribed_at": "2026-02-18T20:00:00+00:00"}, "future": bad},
+        ]
+        conn = get_connection(_DB_PATH)
+        try:
+            app_module._commit_batch(conn, batch)
+        finally:
+            conn.close()
+        self.assertEqual(good.result(timeout=0)["status"], "created")
+        self.assertIsNotNone(bad.exception(timeout=0))
+        self.assertIsNotNone(self._stored("good@example.com"))
+        with get_connection(_DB_PATH) as conn:
+            count = conn.execute("SELECT COUNT(*) FROM subscriptions").fetchone()[0]
+        self.assertEqual(count, 1)
+
+    def test_timed_out_write_is_cancelled_and_reported_busy(self):
+        self._subscribe(email="warmup@example.com")  # make sure the writer is running
+        first = {}
+
+        def submit_first():
+            first["response"] = app_module.app.test_client().post(
+                "/api/subscribe",
+                json={"email": "first@example.com", "categories": ["EB-2"]},
+            )
+
+        with patch.object(app_module, "_WRITE_TIMEOUT", 0.2):
+            # Holding the write lock stalls the writer mid-commit on the first
+            # item, so the second one stays queued past its timeout.
+            with app_module._db_write_lock:
+                thread = threading.Thread(target=submit_first)
+                thread.start()
+                time.sleep(0.3)
+                resp = self._subscribe(email="second@example.com")
+            thread.join(timeout=5)
+            self._subscribe(email="after@example.com")  # flush the queue past the second
+
+        self.assertEqual(resp.status_code, 503)
+        self.assertEqual(resp.get_json()["status"], "error")
+        self.assertIsNone(self._stored("second@example.com"))
+        # The first item was already being written when its wait timed out, so
+        # the request waited for the commit and reports the real result.
+        self.assertEqual(first["response"].status_code, 200)
+        self.assertEqual(first["response"].get_json()["status"], "created")
+        self.assertIsNotNone(self._stored("first@example.com"))
+        self.assertIsNotNone(self._stored("after@example.com"))
+
+
+    def test_future_timeout_class_is_caught(self):
+        # Before Python 3.11, Future.result() raises concurrent.futures.TimeoutError,
+        # a different class from the builtin; stand in for it with an unrelated one.
+        class _FutureTimeout(Exception):
+            pass
+
+        class _ExpiringFuture(Future):
+            def result(self, timeout=None):
+                if timeout is not None:
+                    raise _FutureTimeout()
+                return super().result()
+
+        with patch.object(app_module, "FutureTimeoutError", _FutureTimeout), \
+             patch.object(app_module, "Future", _ExpiringFuture):
+            resp = self._subscribe(email="late@example.com")
+        self._subscribe(email="after@example.com")  # flush the queue past the cancelled item
+
+        self.assertEqual(resp.status_code, 503)
+        self.assertIsNone(self._stored("late@example.com"))
+
+
+    def test_writer_survives_connection_failure_and_is_restarted(self):
+        dead = threading.Thread(target=lambda: None)
+        dead.start()
+        dead.join()
+        real_get_connection = app_module.get_connection
+        failures = [sqlite3.OperationalError("database is locked")]
+
+        def flaky_get_connection(path):
+            if failures:
+                raise failures.pop()
+            return real_get_connection(path)
+
+        # A fresh queue keeps the already-running writer out of the way, so the
+        # restarted one has to open its own connection.
+        with patch.object(app_module, "_write_queue", queue.Queue()), \
+             patch.object(app_module, "_writer_thread", dead), \
+             patch.object(app_module, "get_connection", side_effect=flaky_get_connection):
+            failed = self._subscribe(email="first@example.com")
+            writer = app_module._writer_thread
+            ok = self._subscribe(email="second@example.com")
+            self.assertIsNot(writer, dead)
+            self.assertTrue(writer.is_alive())
+
+        self.assertEqual(failed.status_code, 500)
+        self.assertIn("database is locked", failed.get_json()["message"])
+        self.assertEqual(ok.status_code, 200)
+        self.assertIsNone(self._stored("first@example.com"))
+        self.assertIsNotNone(self._stored("second@example.com"))
+
+
+if __name__ == "__main__":
+    unittest.main()
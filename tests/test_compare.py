@@ -3,6 +3,7 @@
 import os
 import sys
 import unittest
+from datetime import datetime
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
@@ -11,6 +12,7 @@ from compare import (
     _derive_category_key,
     _diff_category,
     _diff_date_field,
+    _parse_date,
     compare_bulletins,
     format_comparison_for_display,
 )
@@ -40,6 +42,12 @@ class TestDeriveCategoryKey(unittest.TestCase):
         cat = {"preference_level": "Employment-Based", "china": "01 JAN 26"}
         self.assertEqual(_derive_category_key(cat), "Employment-Based")
 
+    def test_employment_ordinal_prefix_maps_to_code(self):
+        self.assertEqual(_derive_category_key({"employment-based": "2nd Preference"}), "EB-2")
+
+    def test_unmapped_employment_value_returned_as_is(self):
+        self.assertEqual(_derive_category_key({"employment-based": "Other Workers"}), "Other Workers")
+
     def test_falls_back_to_sorted_items(self):
         cat = {"china": "01 JAN 26", "india": "01 FEB 25"}
         key = _derive_category_key(cat)
@@ -70,6 +78,28 @@ class TestBuildCategoryIndex(unittest.TestCase):
         self.assertEqual(_build_category_index([]), {})
 
 
+class TestParseDate(unittest.TestCase):
+    def test_compact_format(self):
+        self.assertEqual(_parse_date("01JAN26"), datetime(2026, 1, 1))
+
+    def test_spaced_format(self):
+        self.assertEqual(_parse_date("15 MAR 24"), datetime(2024, 3, 15))
+
+    def test_compact_format_is_case_insensitive(self):
+        self.assertEqual(_parse_date("08Sep23"), datetime(2023, 9, 8))
+
+    def test_two_digit_year_pivot_matches_strptime(self):
+        self.assertEqual(_parse_date("22MAR99"), datetime(1999, 3, 22))
+        self.assertEqual(_parse_date("22MAR68"), datetime(2068, 3, 22))
+
+    def test_invalid_day_returns_none(self):
+        self.assertIsNone(_parse_date("31FEB24"))
+
+    def test_unparseable_returns_none(self):
+        self.assertIsNone(_parse_date("foo"))
+        self.assertIsNone(_parse_date("01XYZ26"))
+
+
 class TestDiffDateField(unittest.TestCase):
     def test_equal_values_returns_none(self):
         self.assertIsNone(_diff_date_field("china", "01 JAN 26", "01 JAN 26"))
@@ -145,6 +175,14 @@ class TestDiffCategory(unittest.TestCase):
         directions = {fc["field"]: fc["direction"] for fc in result["field_changes"]}
         self.assertEqual(directions["mexico"], "added")
 
+    def test_field_changes_follow_column_order(self):
+        current = {"visa_category": "EB-2", "india": "01 AUG 13", "china": "01 OCT 21"}
+        previous = {"visa_category": "EB-2", "india": "01 JUN 13", "china": "01 SEP 21", "mexico": "C"}
+        result = _diff_category("EB-2", current, previous)
+        self.assertEqual(
+            [fc["field"] for fc in result["field_changes"]], ["india", "china", "mexico"]
+        )
+
     def test_removed_country_column_detected(self):
         """A country column in previous but not current = 'removed'."""
         current = {"visa_category": "EB-1", "china": "01 JAN 26"}
@@ -169,6 +207,13 @@ class TestCompareBulletins(unittest.TestCase):
         self.assertEqual(diff["summary"]["categories_changed"], 0)
         self.assertIsNone(diff["error"])
 
+    def test_replaced_row_detected_on_repeat_comparison(self):
+        cats = [_cat("EB-1", china="01 JAN 26")]
+        current, previous = self._make_bulletins(list(cats), cats)
+        self.assertFalse(compare_bulletins(current, previous)["has_changes"])
+        current["categories"][0] = _cat("EB-1", china="01 MAR 26")
+        self.assertTrue(compare_bulletins(current, previous)["has_changes"])
+
     def test_added_category_detected(self):
         previous_cats = [_cat("EB-1", china="01 JAN 26")]
         current_cats = [_cat("EB-1", china="01 JAN 26"), _cat("EB-5R", china="01 JAN 24")]
@@ -11,10 +11,15 @@ from pathlib import Path
 # Add parent directory to path to import modules
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+import fetch as fetch_module
+from datetime import datetime
+
 from fetch import (
+    candidate_bulletin_urls,
     construct_bulletin_url,
     create_argument_parser,
     extract_bulletin_url_from_landing_page,
+    fetch_bulletin_page,
     scrape_visa_bulletin,
     BASE_DOMAIN,
     DEFAULT_DB_PATH,
@@ -55,6 +60,69 @@ class TestConstructBulletinUrl(unittest.TestCase):
         self.assertEqual(url, expected)
 
 
+class TestCandidateBulletinUrls(unittest.TestCase):
+    """Test the candidate_bulletin_urls function."""
+
+    def test_this_and_next_month(self):
+        urls = candidate_bulletin_urls(datetime(2026, 3, 10))
+        self.assertEqual(urls, [
+            construct_bulletin_url(2026, "march"),
+            construct_bulletin_url(2026, "april"),
+        ])
+
+    def test_december_rolls_over_to_next_year(self):
+        urls = candidate_bulletin_urls(datetime(2025, 12, 20))
+        self.assertEqual(urls[1], construct_bulletin_url(2026, "january"))
+
+
+class TestProbeConstructed(unittest.TestCase):
+    """Test probing constructed bulletin URLs instead of reading the landing page."""
+
+    def _head_response(self, status_code, url):
+        response = Mock()
+        response.status_code = status_code
+        response.url = url
+        return response
+
+    @patch('fetch._SESSION')
+    def test_redirect_elsewhere_is_not_a_hit(self, mock_session):
+        url = construct_bulletin_url(2026, "march")
+        mock_session.head.return_value = self._head_response(200, BASE_DOMAIN + "/404.html")
+        self.assertFalse(fetch_module._probe_constructed(url))
+
+    @patch("fetch.save_to_json", return_value=True)
+    @patch("fetch.parse_bulletin_html", return_value={"categories": []})
+    @patch("fetch.fetch_bulletin_page", return_value="<html></html>")
+    @patch("fetch.candidate_bulletin_urls", return_value=["http://example.com/mar", "http://example.com/apr"])
+    @patch('fetch._SESSION')
+    def test_probe_hit_skips_landing_page(self, mock_session, mock_candidates, mock_fetch, mock_parse, mock_save):
+        """Test that this month's constructed URL is fetched directly when it exists."""
+        mock_session.head.side_effect = lambda url, **kwargs: self._head_response(200, url)
+        success, _run_id, _data = scrape_visa_bulletin(use_db=False, probe=True)
+        self.assertTrue(success)
+        mock_fetch.assert_called_once()
+        self.assertEqual(mock_fetch.call_args.args[0], "http://example.com/mar")
+
+    @patch("fetch.extract_bulletin_url_from_landing_page", return_value="http://example.com/mar")
+    @patch("fetch.save_to_json", return_value=True)
+    @patch("fetch.parse_bulletin_html", return_value={"categories": []})
+    @patch("fetch.fetch_bulletin_page", return_value="<html></html>")
+    @patch("fetch.candidate_bulletin_urls", return_value=["http://example.com/mar", "http://example.com/apr"])
+    @patch('fetch._SESSION')
+    def test_upcoming_bulletin_is_not_probed(self, mock_session, mock_candidates, mock_fetch,
+                                             mock_parse, mock_save, mock_extract):
+        """Test that next month's (upcoming) bulletin is never taken as the current one."""
+        mock_session.head.side_effect = lambda url, **kwargs: self._head_response(
+            200 if url.endswith("/apr") else 404, url
+        )
+        success, _run_id, _data = scrape_visa_bulletin(use_db=False, probe=True)
+        self.assertTrue(success)
+        probed = [call.args[0] for call in mock_session.head.call_args_list]
+        self.assertNotIn("http://example.com/apr", probed)
+        self.assertEqual(mock_fetch.call_args_list[0].args[0], fetch_module.VISA_BULLETIN_URL)
+        self.assertEqual(mock_fetch.call_args_list[1].args[0], "http://example.com/mar")
+
+
 class TestExtractBulletinUrl(unittest.TestCase):
     """Test the extract_bulletin_url_from_landing_page function."""
 
@@ -127,7 +195,7 @@ class TestExtractBulletinUrl(unittest.TestCase):
         """Test fallback to constructing URL from current date (Strategy 3)."""
         # Mock datetime to return a specific date
         mock_now = Mock()
-        mock_now.strftime.return_value = 'february'
+        mock_now.month = 2
         mock_now.year = 2026
         mock_datetime.now.return_value = mock_now
 
@@ -192,6 +260,148 @@ class TestExtractBulletinUrl(unittest.TestCase):
         expected = f"{BASE_DOMAIN}/content/travel/en/legal/visa-law0/visa-bulletin/2026/visa-bulletin-for-may-2026.html"
         self.assertEqual(url, expected)
 
+    @patch('fetch._find_bulletin_href_bs4')
+    @patch('fetch._find_bulletin_href_lxml')
+    @patch('fetch._find_bulletin_href_lexbor')
+    def test_extract_regex_fast_path_skips_dom(self, mock_lexbor, mock_lxml, mock_bs4):
+        """Test that a canonical href after the current-bulletin heading needs no DOM parse."""
+        html = """
+        <div><h2>Current Visa Bulletin</h2>
+            <a class="btn" href="/content/travel/en/legal/visa-law0/visa-bulletin/2026/visa-bulletin-for-june-2026.html">June</a></div>
+        """
+        url = extract_bulletin_url_from_landing_page(html)
+        self.assertEqual(
+            url,
+            f"{BASE_DOMAIN}/content/travel/en/legal/visa-law0/visa-bulletin/2026/visa-bulletin-for-june-2026.html",
+        )
+        mock_lexbor.assert_not_called()
+        mock_lxml.assert_not_called()
+        mock_bs4.assert_not_called()
+
+    def _check_both_strategies(self):
+        # Non-canonical hrefs so the regex fast path misses and the DOM parser is used
+        current_html = """
+        <ul><li><h2>Current Visa Bulletin</h2>
+            <a class='btn' href='/bulletins/may-2026.html'>May 2026</a></li></ul>
+        """
+        recent_html = """
+        <ul id="recent_bulletins"><li><a href='/visa-bulletin-for-june-2026.html'>June</a></li></ul>
+        """
+        self.assertEqual(
+            extract_bulletin_url_from_landing_page(current_html),
+            f"{BASE_DOMAIN}/bulletins/may-2026.html",
+        )
+        self.assertEqual(
+            extract_bulletin_url_from_landing_page(recent_html),
+            f"{BASE_DOMAIN}/visa-bulletin-for-june-2026.html",
+        )
+
+    @patch('fetch.LexborHTMLParser', None)
+    def test_extract_falls_back_to_lxml(self):
+        """Test that both strategies work when selectolax is not installed."""
+        if fetch_module.lxml is None:
+            self.skipTest("lxml not installed")
+        self._check_both_strategies()
+
+    @patch('fetch.lxml', None)
+    @patch('fetch.LexborHTMLParser', None)
+    def test_extract_falls_back_to_beautifulsoup(self):
+        """Test that both strategies work when neither selectolax nor lxml is installed."""
+        self._check_both_strategies()
+
+
+class TestFetchBulletinPage(unittest.TestCase):
+    """Test the fetch_bulletin_page function."""
+
+    def setUp(self):
+        fetch_module._page_cache.clear()
+
+    def tearDown(self):
+        fetch_module._page_cache.clear()
+
+    def _response(self, text="<html>bulletin</html>"):
+        response = Mock()
+        response.content = text.encode('utf-8')
+        response.encoding = 'utf-8'
+        response.status_code = 200
+        return response
+
+    @patch('fetch._SESSION')
+    def test_fetch_uses_shared_session(self, mock_session):
+        """Test that pages are fetched through the module-level session."""
+        mock_session.get.return_value = self._response()
+        html = fetch_bulletin_page("http://example.com/a")
+        self.assertEqual(html, "<html>bulletin</html>")
+        mock_session.get.assert_called_once()
+
+    @patch('fetch._SESSION')
+    def test_body_without_charset_decoded_as_utf8(self, mock_session):
+        """Test that a body with no declared charset is decoded as UTF-8 without detection."""
+        response = self._response(text="<html>Visa Bulletin — México</html>")
+        response.encoding = None
+        mock_session.get.return_value = response
+        html = fetch_bulletin_page("http://example.com/a")
+        self.assertEqual(html, "<html>Visa Bulletin — México</html>")
+
+    @patch('fetch._SESSION')
+    def test_repeat_fetch_served_from_cache(self, mock_session):
+        """Test that a second fetch of the same URL within the TTL is not re-downloaded."""
+        mock_session.get.return_value = self._response()
+        fetch_bulletin_page("http://example.com/a")
+        html = fetch_bulletin_page("http://example.com/a")
+        self.assertEqual(html, "<html>bulletin</html>")
+        mock_session.get.assert_called_once()
+
+    @patch('fetch._SESSION')
+    def test_conditional_get_uses_stored_body_on_304(self, mock_session):
+        """Test that validators are stored on 200 and a later 304 returns the stored body."""
+        import os
+        import tempfile
+        from store import init_db
+
+        fd, db_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.addCleanup(os.unlink, db_path)
+        init_db(db_path)
+
+        first = self._response()
+        first.headers = {'ETag': '"v1"'}
+        mock_session.get.return_value = first
+        fetch_bulletin_page("http://example.com/a", db_path=db_path)
+
+        fetch_module._page_cache.clear()
+        not_modified = self._response(text="")
+        not_modified.status_code = 304
+        mock_session.get.return_value = not_modified
+        html = fetch_bulletin_page("http://example.com/a", db_path=db_path)
+
+        self.assertEqual(html, "<html>bulletin</html>")
+        sent_headers = mock_session.get.call_args.kwargs['headers']
+        self.assertEqual(sent_headers, {'If-None-Match': '"v1"'})
+
+    @patch('fetch._SESSION')
+    def test_prefetch_populates_cache(self, mock_session):
+        """Test that a prefetched page is served from the cache afterwards."""
+        mock_session.get.return_value = self._response()
+        mock_session.get.return_value.ok = True
+        fetch_module._prefetch_page("http://example.com/a")
+        self.assertEqual(fetch_bulletin_page("http://example.com/a"), "<html>bulletin</html>")
+        mock_session.get.assert_called_once()
+
+    @patch('fetch._SESSION')
+    def test_prefetch_failure_is_silent(self, mock_session):
+        """Test that a failed speculative fetch neither raises nor caches."""
+        mock_session.get.side_effect = Exception("404")
+        fetch_module._prefetch_page("http://example.com/a")
+        self.assertNotIn("http://example.com/a", fetch_module._page_cache)
+
+    @patch('fetch._SESSION')
+    def test_failed_fetch_not_cached(self, mock_session):
+        """Test that failures are retried rather than cached."""
+        mock_session.get.side_effect = [Exception("boom"), self._response()]
+        self.assertIsNone(fetch_bulletin_page("http://example.com/a"))
+        self.assertEqual(fetch_bulletin_page("http://example.com/a"), "<html>bulletin</html>")
+
 
 class TestNewCliArguments(unittest.TestCase):
     """Test the new CLI arguments added for DB storage and comparison."""
@@ -319,6 +529,19 @@ class TestScrapeVisaBulletinDbIntegration(unittest.TestCase):
         success_val = call_kwargs.kwargs.get("success", call_kwargs.args[3] if len(call_kwargs.args) > 3 else None)
         self.assertFalse(success_val)
 
+    @patch("fetch.fetch_bulletin_page", return_value=None)
+    @patch("fetch.get_connection")
+    @patch("fetch.insert_run", return_value=20260101100000001)
+    @patch("fetch.init_db")
+    def test_run_timestamps_keep_subsecond_precision(
+        self, mock_init_db, mock_insert_run, mock_get_conn, mock_fetch
+    ):
+        mock_get_conn.return_value.__enter__ = Mock(return_value=Mock())
+        mock_get_conn.return_value.__exit__ = Mock(return_value=False)
+        scrape_visa_bulletin(use_db=True)
+        started_at = mock_insert_run.call_args.kwargs["started_at"]
+        self.assertRegex(started_at, r"T\d\d:\d\d:\d\d\.\d{6}\+00:00$")
+
     @patch("fetch.save_to_json", return_value=True)
     @patch("fetch.parse_bulletin_html")
     @patch("fetch.extract_bulletin_url_from_landing_page", return_value="http://example.com/bulletin")
@@ -349,5 +572,59 @@ class TestScrapeVisaBulletinDbIntegration(unittest.TestCase):
         mock_get_last.assert_called_once()
 
 
+    @patch("fetch.save_to_json", return_value=True)
+    @patch("fetch.parse_bulletin_html")
+    @patch("fetch.extract_bulletin_url_from_landing_page", return_value="http://example.com/bulletin")
+    @patch("fetch.fetch_bulletin_page")
+    @patch("fetch.get_last_successful_run", return_value=None)
+    @patch("fetch.get_connection")
+    @patch("fetch.insert_run", return_value=20260101100000001)
+    @patch("fetch.init_db")
+    def test_helper_connections_closed(
+        self,
+        mock_init_db,
+        mock_insert_run,
+        mock_get_conn,
+        mock_get_last,
+        mock_fetch,
+        mock_extract,
+        mock_parse,
+        mock_save,
+    ):
+        mock_fetch.return_value = "<html></html>"
+        mock_parse.return_value = self._make_data()
+        mock_get_conn.return_value.in_transaction = False
+        scrape_visa_bulletin(use_db=True, do_compare=True)
+        # one for the previous-run lookup, one for the write
+        self.assertEqual(mock_get_conn.return_value.close.call_count, 2)
+
+    @patch("fetch.save_to_json", return_value=True)
+    @patch("fetch.parse_bulletin_html")
+    @patch("fetch.extract_bulletin_url_from_landing_page", return_value="http://example.com/bulletin")
+    @patch("fetch.fetch_bulletin_page")
+    def test_records_run_on_caller_connection_inside_transaction(
+        self, mock_fetch, mock_extract, mock_parse, mock_save
+    ):
+        import os
+        import tempfile
+        from store import get_connection, init_db
+
+        fd, db_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.addCleanup(os.unlink, db_path)
+        init_db(db_path)
+        mock_fetch.return_value = "<html></html>"
+        mock_parse.return_value = self._make_data()
+
+        conn = get_connection(db_path)
+        self.addCleanup(conn.close)
+        conn.execute("BEGIN")
+        success, run_id, _data = scrape_visa_bulletin(use_db=True, db_path=db_path, conn=conn)
+
+        self.assertTrue(success)
+        self.assertIsNotNone(run_id)
+        self.assertFalse(conn.in_transaction)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,5 +1,6 @@
 """Tests for main.py — full pipeline orchestration."""
 
+import json
 import os
 import sys
 import tempfile
@@ -155,7 +156,7 @@ class TestMainPipeline(unittest.TestCase):
         mock_get_last.return_value = {
             "id": 100,
             "bulletin_date": "January 2026",
-            "data": prev_data,
+            "data_json": json.dumps(prev_data),
         }
         mock_scrape.return_value = (True, 200, curr_data)
         mock_compare.return_value = _sample_comparison()
@@ -204,6 +205,61 @@ class TestMainPipeline(unittest.TestCase):
 
         mock_compare.assert_not_called()
 
+    @patch("main.scrape_visa_bulletin")
+    @patch("main.get_last_successful_run", return_value=None)
+    @patch("main.get_connection")
+    @patch("main.init_db")
+    def test_shared_connection_closed_on_exit(
+        self, mock_init, mock_get_conn, mock_get_last, mock_scrape
+    ):
+        """The connection opened for the pipeline is closed, even on early exit."""
+        mock_scrape.return_value = (False, None, None)
+
+        exit_code = self._run_main(["--no-notify"])
+
+        self.assertEqual(exit_code, 1)
+        mock_get_conn.return_value.close.assert_called_once()
+
+    @patch("main.insert_comparison")
+    @patch("main.scrape_visa_bulletin")
+    @patch("main.get_last_successful_run")
+    @patch("main.get_connection", side_effect=Exception("disk I/O error"))
+    @patch("main.init_db")
+    def test_unreachable_database_skips_store_steps(
+        self, mock_init, mock_get_conn, mock_get_last, mock_scrape, mock_insert_cmp
+    ):
+        """Without a connection the fetch still runs and nothing is written through it."""
+        mock_scrape.return_value = (True, None, _sample_bulletin("February 2026"))
+
+        exit_code = self._run_main(["--no-notify"])
+
+        self.assertEqual(exit_code, 0)
+        mock_get_last.assert_not_called()
+        mock_insert_cmp.assert_not_called()
+        self.assertIsNone(mock_scrape.call_args.kwargs["conn"])
+
+    @patch("main.compare_bulletins")
+    @patch("main.scrape_visa_bulletin")
+    @patch("main.get_last_successful_run")
+    @patch("main.get_connection")
+    @patch("main.init_db")
+    def test_undecodable_previous_run_skips_comparison(
+        self, mock_init, mock_get_conn, mock_get_last, mock_scrape, mock_compare
+    ):
+        """Previous run data that cannot be decoded is treated like no previous run."""
+        mock_get_last.return_value = {
+            "id": 1,
+            "bulletin_date": "January 2026",
+            "data_json": b"\x28\xb5\x2f\xfd compressed",
+        }
+        mock_scrape.return_value = (True, 2, _sample_bulletin("February 2026"))
+
+        with patch("store.zstandard", None):
+            exit_code = self._run_main(["--no-notify"])
+
+        self.assertEqual(exit_code, 0)
+        mock_compare.assert_not_called()
+
     @patch("main.notify_subscribers")
     @patch("main.insert_comparison")
     @patch("main.format_comparison_for_display", return_value="")
@@ -228,7 +284,7 @@ class TestMainPipeline(unittest.TestCase):
         curr_data = _sample_bulletin("February 2026")
         mock_get_conn.return_value.__enter__ = MagicMock(return_value=MagicMock())
         mock_get_conn.return_value.__exit__ = MagicMock(return_value=False)
-        mock_get_last.return_value = {"id": 1, "bulletin_date": "January 2026", "data": prev_data}
+        mock_get_last.return_value = {"id": 1, "bulletin_date": "January 2026", "data_json": json.dumps(prev_data)}
         mock_scrape.return_value = (True, 2, curr_data)
         mock_compare.return_value = _sample_comparison()
 
@@ -261,7 +317,7 @@ class TestMainPipeline(unittest.TestCase):
         curr_data = _sample_bulletin("February 2026")
         mock_get_conn.return_value.__enter__ = MagicMock(return_value=MagicMock())
         mock_get_conn.return_value.__exit__ = MagicMock(return_value=False)
-        mock_get_last.return_value = {"id": 1, "bulletin_date": "January 2026", "data": prev_data}
+        mock_get_last.return_value = {"id": 1, "bulletin_date": "January 2026", "data_json": json.dumps(prev_data)}
         mock_scrape.return_value = (True, 2, curr_data)
         cmp = _sample_comparison()
         mock_compare.return_value = cmp
@@ -302,7 +358,7 @@ class TestMainPipeline(unittest.TestCase):
         curr_data = _sample_bulletin("February 2026")
         mock_get_conn.return_value.__enter__ = MagicMock(return_value=MagicMock())
         mock_get_conn.return_value.__exit__ = MagicMock(return_value=False)
-        mock_get_last.return_value = {"id": 1, "bulletin_date": "January 2026", "data": prev_data}
+        mock_get_last.return_value = {"id": 1, "bulletin_date": "January 2026", "data_json": json.dumps(prev_data)}
         mock_scrape.return_value = (True, 2, curr_data)
         mock_compare.return_value = _sample_comparison()
 
@@ -1,7 +1,7 @@
 """Tests for notify.py — email building and notification dispatch."""
 
-import json
 import os
+import subprocess
 import sys
 import tempfile
 import unittest
@@ -14,15 +14,14 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 import notify as notify_module
 from store import get_connection, init_db, insert_run, upsert_subscription
 from notify import (
-    _ALL_CATEGORIES,
-    _build_config_from_env,
-    _empty_comparison,
+    _UNSUBSCRIBE_TOKEN_PLACEHOLDER,
     _get_changed_category_keys,
     build_email_html,
     build_email_subject,
     notify_subscribers,
     print_email_local,
-    send_email_ses,
+    send_email,
+    send_emails_batch,
     send_test_email,
 )
 
@@ -318,52 +317,110 @@ class TestPrintEmailLocal(unittest.TestCase):
 
 
 # ---------------------------------------------------------------------------
-# Tests: send_email_ses
+# Tests: send_email / send_emails_batch
 # ---------------------------------------------------------------------------
 
-class TestSendEmailSes(unittest.TestCase):
+def _fake_resend() -> MagicMock:
+    """A stand-in for the resend module as returned by notify._resend_client()."""
+    return MagicMock()
 
-    def test_returns_false_when_boto3_unavailable(self):
-        with patch("notify._BOTO3_AVAILABLE", False):
-            result = send_email_ses("to@example.com", "Subject", "<p>body</p>")
+
+class _ResendError(Exception):
+    """Mimics resend.exceptions.ResendError, which carries the HTTP status as .code."""
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+class TestSendEmail(unittest.TestCase):
+
+    def test_returns_false_when_not_configured(self):
+        result = send_email(
+            "to@example.com", "Subject", "<p>body</p>",
+            config={"resend_api_key": "", "from_email": "from@example.com"},
+        )
         self.assertFalse(result)
 
-    def test_returns_false_when_from_email_not_configured(self):
-        with patch("notify.DEFAULT_FROM_EMAIL", ""):
-            result = send_email_ses(
-                "to@example.com", "Subject", "<p>body</p>",
-                config={"from_email": ""},
-            )
+    def test_sends_through_resend(self):
+        resend = _fake_resend()
+        with patch("notify._resend_client", return_value=(resend, "from@example.com")):
+            result = send_email("to@example.com", "Subject", "<p>body</p>")
+
+        self.assertTrue(result)
+        params = resend.Emails.send.call_args.args[0]
+        self.assertEqual(params["to"], ["to@example.com"])
+        self.assertEqual(params["from"], "from@example.com")
+        self.assertEqual(params["html"], "<p>body</p>")
+
+    def test_returns_false_on_api_error(self):
+        resend = _fake_resend()
+        resend.Emails.send.side_effect = Exception("422 invalid address")
+        with patch("notify._resend_client", return_value=(resend, "from@example.com")):
+            result = send_email("to@example.com", "Subject", "<p>body</p>")
         self.assertFalse(result)
 
-    def test_calls_ses_send_email(self):
-        mock_boto3 = MagicMock()
-        mock_client = MagicMock()
-        mock_boto3.client.return_value = mock_client
-        config = {"from_email": "from@example.com", "region": "us-east-1"}
 
-        with patch("notify._BOTO3_AVAILABLE", True), \
-             patch.object(notify_module, "boto3", mock_boto3, create=True):
-            result = send_email_ses("to@example.com", "Subject", "<p>body</p>", config)
+class TestSendEmailsBatch(unittest.TestCase):
 
-        self.assertTrue(result)
-        mock_client.send_email.assert_called_once()
-        call_kwargs = mock_client.send_email.call_args[1]
-        self.assertEqual(call_kwargs["Destination"]["ToAddresses"], ["to@example.com"])
-        self.assertEqual(call_kwargs["Source"], "from@example.com")
-
-    def test_returns_false_on_client_error(self):
-        mock_boto3 = MagicMock()
-        mock_client = MagicMock()
-        mock_client.send_email.side_effect = Exception("SES error")
-        mock_boto3.client.return_value = mock_client
-        config = {"from_email": "from@example.com", "region": "us-east-1"}
-
-        with patch("notify._BOTO3_AVAILABLE", True), \
-             patch.object(notify_module, "boto3", mock_boto3, create=True):
-            result = send_email_ses("to@example.com", "Subject", "<p>body</p>", config)
+    def _messages(self, n: int) -> list:
+        return [(f"u{i}@example.com", "Subject", f"<p>{i}</p>") for i in range(n)]
 
-        self.assertFalse(result)
+    def test_empty_list_sends_nothing(self):
+        with patch("notify._resend_client") as client:
+            self.assertEqual(send_emails_batch([]), [])
+        client.assert_not_called()
+
+    def test_one_request_per_batch(self):
+        resend = _fake_resend()
+        with patch("notify._resend_client", return_value=(resend, "from@example.com")), \
+             patch("notify._SEND_BATCH_SIZE", 2):
+            results = send_emails_batch(self._messages(5))
+
+        self.assertEqual(results, [True] * 5)
+        self.assertEqual(resend.Batch.send.call_count, 3)
+        sent_to = sorted(
+            p["to"][0] for call in resend.Batch.send.call_args_list for p in call.args[0]
+        )
+        self.assertEqual(sent_to, sorted(to for to, _, _ in self._messages(5)))
+        resend.Emails.send.assert_not_called()
+
+    def test_rejected_batch_falls_back_to_single_sends(self):
+        resend = _fake_resend()
+        resend.Batch.send.side_effect = _ResendError("422", "invalid recipient")
+        resend.Emails.send.side_effect = [None, Exception("bounced"), None]
+        with patch("notify._resend_client", return_value=(resend, "from@example.com")):
+            results = send_emails_batch(self._messages(3))
+
+        self.assertEqual(results, [True, False, True])
+        self.assertEqual(resend.Emails.send.call_count, 3)
+
+    def test_uncertain_failure_is_not_resent(self):
+        # A timeout or 5xx may still have been delivered, so nothing is re-sent
+        for error in (_ResendError(500, "Read timed out"), Exception("connection reset")):
+            with self.subTest(error=error):
+                resend = _fake_resend()
+                resend.Batch.send.side_effect = error
+                with patch("notify._resend_client", return_value=(resend, "from@example.com")):
+                    results = send_emails_batch(self._messages(3))
+
+                self.assertEqual(results, [False, False, False])
+                resend.Emails.send.assert_not_called()
+
+    def test_batch_idempotency_key_depends_on_contents(self):
+        resend = _fake_resend()
+        with patch("notify._resend_client", return_value=(resend, "from@example.com")), \
+             patch("notify._SEND_BATCH_SIZE", 2):
+            send_emails_batch(self._messages(4))
+            send_emails_batch(self._messages(4))
+
+        keys = [call.args[1]["idempotency_key"] for call in resend.Batch.send.call_args_list]
+        self.assertEqual(len(set(keys)), 2)
+        self.assertEqual(sorted(keys[:2]), sorted(keys[2:]))
+
+    def test_all_fail_when_not_configured(self):
+        with patch("notify._resend_client", return_value=None):
+            self.assertEqual(send_emails_batch(self._messages(2)), [False, False])
 
 
 # ---------------------------------------------------------------------------
@@ -375,6 +432,10 @@ class TestNotifySubscribers(unittest.TestCase):
     def setUp(self):
         self.db_path = _make_db()
         self.tmpdir = tempfile.mkdtemp()
+        # Dry-run previews go to tempfile.gettempdir(); keep them out of /tmp
+        patcher = patch("notify.tempfile.gettempdir", return_value=self.tmpdir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
 
     def tearDown(self):
         os.unlink(self.db_path)
@@ -384,125 +445,152 @@ class TestNotifySubscribers(unittest.TestCase):
     def _add_subscriber(self, email: str, categories: list) -> None:
         _insert_subscription(self.db_path, email, categories)
 
-    def test_sends_to_all_subscribers_when_not_updated_only(self):
-        self._add_subscriber("a@example.com", ["EB-1"])
-        self._add_subscriber("b@example.com", ["EB-3"])  # EB-3 has no changes
-        comparison = _sample_comparison(has_changes=True)  # only EB-2 changed
-        bulletin = _sample_bulletin()
+    def _tokens(self) -> dict:
+        with get_connection(self.db_path) as conn:
+            rows = conn.execute("SELECT email, unsubscribe_token FROM subscriptions").fetchall()
+        return {row["email"]: row["unsubscribe_token"] for row in rows}
 
-        with patch("notify.print_email_local", return_value="/tmp/preview.html"):
+    def _send(self, comparison, bulletin, updated_only=False, results=None):
+        """Run a live (non dry-run) notify with send_emails_batch captured."""
+        sent = []
+
+        def fake_batch(messages, config=None):
+            sent.extend(messages)
+            return results if results is not None else [True] * len(messages)
+
+        with patch("notify.send_emails_batch", side_effect=fake_batch):
             stats = notify_subscribers(
                 comparison, bulletin,
-                updated_only=False,
+                updated_only=updated_only,
                 db_path=self.db_path,
-                dry_run=True,
+                dry_run=False,
             )
+        return stats, sent
+
+    def test_sends_to_all_subscribers_when_not_updated_only(self):
+        self._add_subscriber("a@example.com", ["EB-1"])
+        self._add_subscriber("b@example.com", ["EB-3"])  # EB-3 has no changes
+        stats, sent = self._send(_sample_comparison(has_changes=True), _sample_bulletin())
 
-        self.assertEqual(stats["sent"], 2)
-        self.assertEqual(stats["skipped"], 0)
+        self.assertEqual(stats, {"sent": 2, "skipped": 0, "failed": 0})
+        self.assertEqual(sorted(to for to, _, _ in sent), ["a@example.com", "b@example.com"])
 
     def test_skips_unchanged_subscribers_when_updated_only(self):
         self._add_subscriber("a@example.com", ["EB-1"])  # EB-1 not changed
-        comparison = _sample_comparison(has_changes=True)  # only EB-2 changed
-        bulletin = _sample_bulletin()
-
-        stats = notify_subscribers(
-            comparison, bulletin,
-            updated_only=True,
-            db_path=self.db_path,
-            dry_run=True,
+        self._add_subscriber("b@example.com", ["EB-2"])  # EB-2 changed
+        stats, sent = self._send(
+            _sample_comparison(has_changes=True), _sample_bulletin(), updated_only=True
         )
 
-        self.assertEqual(stats["sent"], 0)
-        self.assertEqual(stats["skipped"], 1)
+        self.assertEqual(stats, {"sent": 1, "skipped": 1, "failed": 0})
+        self.assertEqual([to for to, _, _ in sent], ["b@example.com"])
+
+    def test_unchanged_bulletin_counts_skips_without_rendering(self):
+        self._add_subscriber("a@example.com", ["EB-1"])
+        self._add_subscriber("b@example.com", ["EB-2"])
+        with patch("notify.build_email_html") as build:
+            stats, sent = self._send(
+                _sample_comparison(has_changes=False), _sample_bulletin(), updated_only=True
+            )
 
-    def test_sends_to_changed_subscribers_when_updated_only(self):
-        self._add_subscriber("a@example.com", ["EB-2"])  # EB-2 changed
+        self.assertEqual(stats, {"sent": 0, "skipped": 2, "failed": 0})
+        self.assertEqual(sent, [])
+        build.assert_not_called()
+
+    def test_rendered_bodies_match_per_subscriber_render(self):
+        self._add_subscriber("a@example.com", ["EB-2", "EB-3"])
+        self._add_subscriber("b@example.com", ["EB-2", "EB-3"])  # shares a's body
+        self._add_subscriber("c@example.com", ["EB-1"])
         comparison = _sample_comparison(has_changes=True)
         bulletin = _sample_bulletin()
+        _, sent = self._send(comparison, bulletin)
 
-        with patch("notify.print_email_local", return_value="/tmp/preview.html"):
-            stats = notify_subscribers(
+        tokens = self._tokens()
+        categories = {
+            "a@example.com": ["EB-2", "EB-3"],
+            "b@example.com": ["EB-2", "EB-3"],
+            "c@example.com": ["EB-1"],
+        }
+        for to_addr, _, html_body in sent:
+            expected = build_email_html(
+                {
+                    "email": to_addr,
+                    "categories": categories[to_addr],
+                    "unsubscribe_token": tokens[to_addr],
+                },
                 comparison, bulletin,
-                updated_only=True,
-                db_path=self.db_path,
-                dry_run=True,
             )
+            self.assertEqual(html_body, expected)
 
-        self.assertEqual(stats["sent"], 1)
-        self.assertEqual(stats["skipped"], 0)
+    def test_unsubscribe_token_substituted_per_subscriber(self):
+        self._add_subscriber("a@example.com", ["EB-2"])
+        self._add_subscriber("b@example.com", ["EB-2"])
+        _, sent = self._send(_sample_comparison(has_changes=True), _sample_bulletin())
 
-    def test_no_subscribers_returns_zero_stats(self):
-        comparison = _sample_comparison(has_changes=True)
-        bulletin = _sample_bulletin()
+        tokens = self._tokens()
+        bodies = {to: html for to, _, html in sent}
+        for email, other in (("a@example.com", "b@example.com"), ("b@example.com", "a@example.com")):
+            self.assertIn(f"token={tokens[email]}", bodies[email])
+            self.assertNotIn(tokens[other], bodies[email])
+            self.assertNotIn(_UNSUBSCRIBE_TOKEN_PLACEHOLDER, bodies[email])
 
-        stats = notify_subscribers(
-            comparison, bulletin,
-            updated_only=False,
-            db_path=self.db_path,
-            dry_run=True,
+    def test_failed_sends_counted(self):
+        self._add_subscriber("a@example.com", ["EB-2"])
+        self._add_subscriber("b@example.com", ["EB-2"])
+        stats, _ = self._send(
+            _sample_comparison(has_changes=True), _sample_bulletin(), results=[True, False]
         )
+        self.assertEqual(stats, {"sent": 1, "skipped": 0, "failed": 1})
 
-        self.assertEqual(stats["sent"], 0)
-        self.assertEqual(stats["skipped"], 0)
-        self.assertEqual(stats["failed"], 0)
+    def test_no_subscribers_returns_zero_stats(self):
+        stats, sent = self._send(_sample_comparison(has_changes=True), _sample_bulletin())
+        self.assertEqual(stats, {"sent": 0, "skipped": 0, "failed": 0})
+        self.assertEqual(sent, [])
 
-    def test_dry_run_saves_html_locally(self):
+    def test_dry_run_saves_previews_and_counts_them(self):
         self._add_subscriber("a@example.com", ["EB-2"])
-        comparison = _sample_comparison(has_changes=True)
-        bulletin = _sample_bulletin()
-        saved_paths = []
-
-        def capture_local(to_addr, subject, html_body, output_dir="."):
-            # Redirect to tmpdir so we don't litter the workspace
-            path = print_email_local(to_addr, subject, html_body, output_dir=self.tmpdir)
-            if path:
-                saved_paths.append(path)
-            return path
-
-        with patch("notify.print_email_local", side_effect=capture_local):
+        self._add_subscriber("b@example.com", ["EB-1"])
+        with patch("notify.send_emails_batch") as batch:
             stats = notify_subscribers(
-                comparison, bulletin,
-                updated_only=False,
+                _sample_comparison(has_changes=True), _sample_bulletin(),
+                updated_only=True,
                 db_path=self.db_path,
                 dry_run=True,
             )
 
-        self.assertTrue(any(os.path.exists(p) for p in saved_paths))
+        self.assertEqual(stats, {"sent": 1, "skipped": 1, "failed": 0})
+        previews = os.listdir(self.tmpdir)
+        self.assertEqual(len(previews), 1)
+        self.assertIn("a_at_example_com", previews[0])
+        batch.assert_called_once_with([], None)
 
-    def test_ses_failure_increments_failed_count(self):
+    def test_dry_run_write_failure_counted_as_failed(self):
         self._add_subscriber("a@example.com", ["EB-2"])
-        comparison = _sample_comparison(has_changes=True)
-        bulletin = _sample_bulletin()
-
-        with patch("notify.send_email_ses", return_value=False):
+        with patch("notify.write_bytes", side_effect=OSError("disk full")):
             stats = notify_subscribers(
-                comparison, bulletin,
+                _sample_comparison(has_changes=True), _sample_bulletin(),
                 updated_only=False,
                 db_path=self.db_path,
-                dry_run=False,
+                dry_run=True,
             )
+        self.assertEqual(stats, {"sent": 0, "skipped": 0, "failed": 1})
 
-        self.assertEqual(stats["failed"], 1)
-        self.assertEqual(stats["sent"], 0)
-
-    def test_returns_correct_stats_sent_skipped_failed(self):
-        self._add_subscriber("changed@example.com", ["EB-2"])  # will be sent
-        self._add_subscriber("unchanged@example.com", ["EB-1"])  # will be skipped
-        comparison = _sample_comparison(has_changes=True)  # only EB-2 changed
-        bulletin = _sample_bulletin()
 
-        with patch("notify.print_email_local", return_value="/tmp/preview.html"):
-            stats = notify_subscribers(
-                comparison, bulletin,
-                updated_only=True,
-                db_path=self.db_path,
-                dry_run=True,
-            )
+class TestLazyInitialisation(unittest.TestCase):
 
-        self.assertEqual(stats["sent"], 1)
-        self.assertEqual(stats["skipped"], 1)
-        self.assertEqual(stats["failed"], 0)
+    def test_import_starts_no_threads_or_template_cache(self):
+        code = (
+            "import threading, notify; "
+            "print(threading.active_count(), "
+            "notify._preview_write_pool.cache_info().currsize, "
+            "notify._jinja_env.cache_info().currsize)"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=os.path.join(os.path.dirname(__file__), ".."),
+            capture_output=True, text=True, check=True,
+        ).stdout.split()
+        self.assertEqual(out, ["1", "0", "0"])
 
 
 # ---------------------------------------------------------------------------
@@ -534,6 +622,7 @@ class TestSendTestEmail(unittest.TestCase):
             result = send_test_email("user@example.com", db_path=self.db_path, dry_run=True)
 
         self.assertTrue(result)
+        self.assertEqual(len(os.listdir(self.tmpdir)), 1)
 
     def test_uses_latest_run_bulletin_date(self):
         _insert_run(self.db_path, bulletin_date="March 2026")
@@ -549,24 +638,15 @@ class TestSendTestEmail(unittest.TestCase):
         # The bulletin date should appear in the email content
         self.assertTrue(any("March 2026" in h for h in html_bodies))
 
-    def test_sends_via_ses_when_not_dry_run(self):
+    def test_sends_via_resend_when_not_dry_run(self):
         _insert_run(self.db_path, bulletin_date="February 2026")
-        config = {"from_email": "from@example.com", "region": "us-east-1"}
-        mock_boto3 = MagicMock()
-        mock_client = MagicMock()
-        mock_boto3.client.return_value = mock_client
-
-        with patch("notify._BOTO3_AVAILABLE", True), \
-             patch.object(notify_module, "boto3", mock_boto3, create=True):
-            result = send_test_email(
-                "user@example.com",
-                db_path=self.db_path,
-                config=config,
-                dry_run=False,
-            )
+        with patch("notify.send_email", return_value=True) as send:
+            result = send_test_email("user@example.com", db_path=self.db_path)
 
         self.assertTrue(result)
-        mock_client.send_email.assert_called_once()
+        to_addr, subject, _html = send.call_args.args[:3]
+        self.assertEqual(to_addr, "user@example.com")
+        self.assertIn("February 2026", subject)
 
 
 if __name__ == "__main__":
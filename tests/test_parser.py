@@ -7,6 +7,7 @@ import unittest
 import sys
 from pathlib import Path
 from datetime import datetime
+from unittest.mock import patch
 
 # Add parent directory to path to import modules
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -21,6 +22,7 @@ from parser import (
     parse_text_based_data
 )
 from bs4 import BeautifulSoup
+import parser as parser_module
 
 
 class TestNormalizeHeader(unittest.TestCase):
@@ -89,6 +91,14 @@ class TestExtractVisaType(unittest.TestCase):
         category = {"preference_level": "Unknown"}
         self.assertEqual(extract_visa_type(category), "Unknown")
 
+    def test_visa_category_code_decides_first(self):
+        """Test that a known visa_category prefix wins over words in other fields."""
+        category = {"visa_category": "F2A", "notes": "advances six months"}
+        self.assertEqual(extract_visa_type(category), "Family-Based")
+
+        category = {"visa_category": "IR-1"}
+        self.assertEqual(extract_visa_type(category), "Family-Based")
+
 
 class TestExtractBulletinDate(unittest.TestCase):
     """Test the extract_bulletin_date function."""
@@ -322,6 +332,30 @@ class TestParseBulletinHtml(unittest.TestCase):
         # Should be able to parse it back
         datetime.fromisoformat(extracted_at)
 
+    def test_lxml_table_path_matches_beautifulsoup(self):
+        """Test that the direct lxml table path gives the BeautifulSoup result."""
+        if parser_module.lxml is None:
+            self.skipTest("lxml not installed")
+        html = """
+        <html><head><title>Visa Bulletin</title><script>var d = "May 2019";</script></head>
+            <body>
+                <h1>Visa Bulletin for January 2026</h1>
+                <table>
+                    <tr><th>Visa <b>Category</b></th><th>Final Action Date</th></tr>
+                    <tr><td> EB-1 <!-- note --></td><td>01&nbsp;JAN&nbsp;26</td></tr>
+                    <tr><td><span>F2A</span></td><td>Current<script>x()</script></td></tr>
+                </table>
+            </body>
+        </html>
+        """
+        fast = parse_bulletin_html(html)
+        with patch('parser.lxml', None):
+            slow = parse_bulletin_html(html)
+
+        self.assertEqual(fast['bulletin_date'], slow['bulletin_date'])
+        self.assertEqual(fast['categories'], slow['categories'])
+        self.assertEqual(len(fast['categories']), 2)
+
 
 class TestParseDivBasedData(unittest.TestCase):
     """Test the parse_div_based_data function."""
@@ -357,6 +391,40 @@ class TestParseDivBasedData(unittest.TestCase):
 
         self.assertEqual(len(categories), 0)
 
+    def test_parse_divs_only_inside_main(self):
+        """Elements outside <main> (navigation, footers) are not scanned."""
+        html = """
+        <html>
+            <body>
+                <nav><li>EB-3 menu entry 01 JAN 20</li></nav>
+                <main><div>EB-2: 01 DEC 25</div></main>
+            </body>
+        </html>
+        """
+        soup = BeautifulSoup(html, 'html.parser')
+        categories = parse_div_based_data(soup, verbose=False)
+
+        self.assertEqual(
+            [c['visa_category'] for c in categories], ['EB-2']
+        )
+
+    def test_siblings_without_dates_use_parent_text(self):
+        """Elements with no dates of their own take them from the shared parent."""
+        html = """
+        <html>
+            <body>
+                <div><span>EB-1 Priority Workers</span><span>EB-2 Advanced Degree</span>
+                     <em>01 FEB 24</em> <em>15 MAR 23</em></div>
+            </body>
+        </html>
+        """
+        soup = BeautifulSoup(html, 'html.parser')
+        categories = parse_div_based_data(soup, verbose=False)
+
+        by_code = {c['visa_category']: c for c in categories}
+        self.assertEqual(by_code['EB-1']['cutoff_date'], '01 FEB 24')
+        self.assertEqual(by_code['EB-2']['cutoff_date'], '01 FEB 24')
+
 
 class TestParseTextBasedData(unittest.TestCase):
     """Test the parse_text_based_data function."""
@@ -10,6 +10,7 @@ import shutil
 import sys
 from pathlib import Path
 from datetime import datetime
+from unittest.mock import patch
 
 # Add parent directory to path to import modules
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -18,7 +19,8 @@ from persist import (
     save_to_json,
     save_with_timestamp,
     load_from_json,
-    format_data_for_display
+    format_data_for_display,
+    write_bytes,
 )
 
 
@@ -131,6 +133,43 @@ class TestSaveToJson(unittest.TestCase):
         self.assertTrue(result)
         self.assertTrue(output_path.exists())
 
+    def test_output_same_with_and_without_orjson(self):
+        """Test that the orjson fast path writes the same bytes as the json fallback."""
+        data = {
+            "bulletin_date": "Enero 2026",
+            "categories": [{"category": "EB-1", "date": "01 JAN 26"}],
+            "total_categories": 1,
+        }
+        fast_path = Path(self.test_dir) / "fast.json"
+        slow_path = Path(self.test_dir) / "slow.json"
+
+        save_to_json(data, str(fast_path))
+        with patch('persist.orjson', None):
+            save_to_json(data, str(slow_path))
+
+        self.assertEqual(fast_path.read_bytes(), slow_path.read_bytes())
+
+    def test_compact_by_default_pretty_on_request(self):
+        """Test that output is compact unless pretty=True is passed."""
+        data = {"bulletin_date": "January 2026", "categories": [{"category": "EB-1"}]}
+        compact_path = Path(self.test_dir) / "compact.json"
+        pretty_path = Path(self.test_dir) / "pretty.json"
+
+        save_to_json(data, str(compact_path))
+        save_to_json(data, str(pretty_path), pretty=True)
+
+        self.assertNotIn(b"\n", compact_path.read_bytes())
+        self.assertIn(b'\n  "bulletin_date"', pretty_path.read_bytes())
+        self.assertEqual(json.loads(compact_path.read_bytes()), data)
+        self.assertEqual(json.loads(pretty_path.read_bytes()), data)
+
+    def test_write_bytes_truncates_existing_file(self):
+        """Test that write_bytes replaces the whole previous content."""
+        path = Path(self.test_dir) / "out.html"
+        write_bytes(path, b"a much longer first payload")
+        write_bytes(path, b"short")
+        self.assertEqual(path.read_bytes(), b"short")
+
 
 class TestSaveWithTimestamp(unittest.TestCase):
     """Test the save_with_timestamp function."""
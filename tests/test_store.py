@@ -2,22 +2,34 @@
 
 import json
 import os
+import sqlite3
 import sys
 import tempfile
 import unittest
 from datetime import datetime, timezone
+from unittest.mock import patch
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
+import store as store_module
 from store import (
     DEFAULT_DB_PATH,
     generate_run_id,
+    get_cached_parse,
     get_connection,
+    get_http_cache,
     get_last_successful_run,
+    get_last_successful_runs,
     get_runs,
     init_db,
     insert_comparison,
     insert_run,
+    insert_runs_bulk,
+    iter_runs,
+    parse_run_data,
+    set_cached_parse,
+    start_wal_checkpointer,
+    upsert_http_cache,
 )
 
 
@@ -77,12 +89,74 @@ class TestInitDb(unittest.TestCase):
             count = conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
         self.assertEqual(count, 0)
 
+    def test_parsed_json_migration_matches_schema_type(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            "CREATE TABLE http_cache (url TEXT PRIMARY KEY, etag TEXT, "
+            "last_modified TEXT, body TEXT NOT NULL, fetched_at TEXT NOT NULL)"
+        )
+        conn.commit()
+        conn.close()
+        init_db(self.db_path)
+        with get_connection(self.db_path) as conn:
+            types = {r[1]: r[2] for r in conn.execute("PRAGMA table_info(http_cache)")}
+        self.assertEqual(types["parsed_json"], "BLOB")
+
     def test_wal_mode_enabled(self):
         init_db(self.db_path)
         with get_connection(self.db_path) as conn:
             mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
         self.assertEqual(mode, "wal")
 
+    def test_connection_uses_normal_synchronous(self):
+        init_db(self.db_path)
+        with get_connection(self.db_path) as conn:
+            level = conn.execute("PRAGMA synchronous").fetchone()[0]
+        self.assertEqual(level, 1)  # NORMAL
+
+    def test_wal_checkpointer_disables_inline_autocheckpoint(self):
+        init_db(self.db_path)
+        with get_connection(self.db_path) as conn:
+            default = conn.execute("PRAGMA wal_autocheckpoint").fetchone()[0]
+        thread = start_wal_checkpointer(self.db_path, interval=3600)
+        self.assertTrue(thread.daemon)
+        self.assertIsNone(start_wal_checkpointer(self.db_path, interval=3600))
+        with get_connection(self.db_path) as conn:
+            level = conn.execute("PRAGMA wal_autocheckpoint").fetchone()[0]
+        self.assertEqual(default, 1000)
+        self.assertEqual(level, 0)
+
+    def test_active_subscription_query_uses_covering_index(self):
+        init_db(self.db_path)
+        with get_connection(self.db_path) as conn:
+            plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT email, categories, unsubscribe_token "
+                "FROM subscriptions WHERE is_active = 1"
+            ).fetchall()
+        self.assertIn("COVERING INDEX", plan[0][3])
+
+    def test_latest_run_lookup_uses_covering_index(self):
+        init_db(self.db_path)
+        with get_connection(self.db_path) as conn:
+            plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT id FROM runs "
+                "WHERE run_type = 'official' AND success = 1 AND is_deleted = 0 "
+                "ORDER BY started_at DESC, id DESC LIMIT 1"
+            ).fetchall()
+        self.assertIn("COVERING INDEX idx_runs_type_started", plan[0][3])
+        self.assertFalse(any("TEMP B-TREE" in row[3] for row in plan))
+
+    def test_run_listings_read_in_index_order(self):
+        init_db(self.db_path)
+        with get_connection(self.db_path) as conn:
+            for by_type, keyset in ((False, False), (True, False), (False, True), (True, True)):
+                sql = store_module._list_runs_sql(by_type, False, False, keyset)
+                params = (1,) * sql.count("?")
+                plan = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+                details = " | ".join(row[3] for row in plan)
+                self.assertNotIn("TEMP B-TREE", details)
+                self.assertIn("INDEX idx_runs", details)
+
 
 class TestGenerateRunId(unittest.TestCase):
     def setUp(self):
@@ -155,6 +229,122 @@ class TestInsertRun(unittest.TestCase):
         self.assertIsInstance(run_id, int)
         self.assertEqual(len(str(run_id)), 17)
 
+    def test_consecutive_runs_get_sequential_ids(self):
+        with get_connection(self.db_path) as conn:
+            ids = [
+                insert_run(conn, run_type="test", started_at="2026-01-15T10:00:00", success=True)
+                for _ in range(3)
+            ]
+        # Allocated inside the INSERT; sequence continues within the same second
+        if ids[0] // 1000 == ids[-1] // 1000:
+            self.assertEqual(ids, [ids[0], ids[0] + 1, ids[0] + 2])
+        self.assertEqual(len(set(ids)), 3)
+
+    def _insert_at_fixed_second(self, conn, existing_seq):
+        """insert_run with the clock frozen and one ID of that second already taken."""
+        frozen = datetime(2026, 1, 15, 10, 0, 0, tzinfo=timezone.utc)
+        conn.execute(
+            "INSERT INTO runs (id, run_type, started_at, success) VALUES (?, 'test', ?, 1)",
+            (int(f"20260115100000{existing_seq:03d}"), frozen.isoformat()),
+        )
+        with patch("store.datetime") as mock_datetime:
+            mock_datetime.now.return_value = frozen
+            return insert_run(conn, run_type="test", started_at=frozen.isoformat(), success=True)
+
+    def test_id_follows_newest_id_of_the_same_second(self):
+        with get_connection(self.db_path) as conn:
+            run_id = self._insert_at_fixed_second(conn, 5)
+        self.assertEqual(run_id, 20260115100000006)
+
+    def test_exhausted_second_raises(self):
+        with get_connection(self.db_path) as conn:
+            with self.assertRaises(RuntimeError):
+                self._insert_at_fixed_second(conn, 999)
+
+    def test_commit_false_leaves_transaction_open(self):
+        with get_connection(self.db_path) as conn:
+            insert_run(
+                conn,
+                run_type="official",
+                started_at="2026-01-15T10:00:00",
+                success=True,
+                commit=False,
+            )
+            self.assertTrue(conn.in_transaction)
+            conn.rollback()
+        with get_connection(self.db_path) as conn:
+            count = conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+        self.assertEqual(count, 0)
+
+    def test_data_round_trips_as_blob_or_text(self):
+        """data_json is stored as orjson bytes (or text without orjson) and reads back."""
+        for orjson_module in (store_module.orjson, None):
+            with patch("store.orjson", orjson_module), \
+                    get_connection(self.db_path) as conn:
+                run_id = insert_run(
+                    conn, run_type="test", started_at="2026-01-15T10:00:00",
+                    success=True, data=_sample_data(),
+                )
+                stored_type = conn.execute(
+                    "SELECT typeof(data_json) FROM runs WHERE id = ?", (run_id,)
+                ).fetchone()[0]
+            expected = "blob" if orjson_module is not None else "text"
+            self.assertEqual(stored_type, expected)
+            with get_connection(self.db_path) as conn:
+                run = get_last_successful_run(conn, "test")
+            self.assertEqual(run["data"], _sample_data())
+
+    @unittest.skipIf(store_module.zstandard is None, "zstandard not installed")
+    def test_large_data_stored_zstd_compressed(self):
+        data = _sample_data()
+        data["categories"] = data["categories"] * 50
+        with get_connection(self.db_path) as conn:
+            run_id = insert_run(
+                conn, run_type="test", started_at="2026-01-15T10:00:00",
+                success=True, data=data,
+            )
+            raw = conn.execute(
+                "SELECT data_json FROM runs WHERE id = ?", (run_id,)
+            ).fetchone()[0]
+            run = get_last_successful_run(conn, "test")
+        self.assertTrue(raw.startswith(store_module._ZSTD_MAGIC))
+        self.assertLess(len(raw), len(json.dumps(data)))
+        self.assertEqual(run["data"], data)
+
+    def test_large_data_compressed_through_zstandard_api(self):
+        """Exercise the compressed path with a stand-in codec when zstandard is absent."""
+        import threading
+        import zlib
+        from types import SimpleNamespace
+
+        magic = store_module._ZSTD_MAGIC
+        codec = SimpleNamespace(
+            ZstdCompressor=lambda level: SimpleNamespace(
+                compress=lambda b: magic + zlib.compress(b, level)
+            ),
+            ZstdDecompressor=lambda: SimpleNamespace(
+                decompress=lambda b: zlib.decompress(b[len(magic):])
+            ),
+        )
+        data = _sample_data()
+        data["categories"] = data["categories"] * 50
+        with patch("store.zstandard", codec), \
+                patch("store._zstd_local", threading.local()), \
+                get_connection(self.db_path) as conn:
+            insert_run(
+                conn, run_type="test", started_at="2026-01-15T10:00:00",
+                success=True, data=data,
+            )
+            run = get_last_successful_run(conn, "test", parse_data=False)
+            self.assertTrue(run["data_json"].startswith(magic))
+            self.assertEqual(parse_run_data(run), data)
+
+    def test_compressed_data_without_zstandard_raises(self):
+        run = {"data_json": store_module._ZSTD_MAGIC + b"\x00"}
+        with patch("store.zstandard", None):
+            with self.assertRaises(RuntimeError):
+                parse_run_data(run)
+
     def test_failed_run_with_error_message(self):
         with get_connection(self.db_path) as conn:
             run_id = insert_run(
@@ -223,6 +413,50 @@ class TestInsertRun(unittest.TestCase):
                 )
                 self.assertIsInstance(run_id, int)
 
+    def test_bulk_insert_allocates_consecutive_ids(self):
+        runs = [
+            {"run_type": "official", "started_at": f"2025-0{m}-01T10:00:00",
+             "success": True, "data": _sample_data()}
+            for m in range(1, 4)
+        ]
+        with get_connection(self.db_path) as conn:
+            run_ids = insert_runs_bulk(conn, runs)
+            self.assertFalse(conn.in_transaction)
+        self.assertEqual(run_ids, [run_ids[0] + i for i in range(3)])
+        with get_connection(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT categories_count FROM runs ORDER BY id"
+            ).fetchall()
+        self.assertEqual([r["categories_count"] for r in rows], [2, 2, 2])
+
+    def test_bulk_insert_is_all_or_nothing(self):
+        runs = [
+            {"run_type": "official", "started_at": "2025-01-01T10:00:00", "success": True},
+            {"run_type": "invalid_type", "started_at": "2025-02-01T10:00:00", "success": True},
+        ]
+        with get_connection(self.db_path) as conn:
+            with self.assertRaises(Exception):
+                insert_runs_bulk(conn, runs)
+            count = conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+        self.assertEqual(count, 0)
+
+    def test_bulk_insert_holds_write_lock_while_allocating(self):
+        """Another writer is blocked until the bulk transaction commits."""
+        runs = [{"run_type": "test", "started_at": "2025-01-01T10:00:00", "success": True}]
+        with get_connection(self.db_path) as conn, get_connection(self.db_path) as other:
+            other.execute("PRAGMA busy_timeout = 0")
+            original_generate = generate_run_id
+
+            def generate_and_probe(c, table="runs"):
+                with self.assertRaises(sqlite3.OperationalError):
+                    other.execute("BEGIN IMMEDIATE")
+                return original_generate(c, table)
+
+            with patch("store.generate_run_id", side_effect=generate_and_probe):
+                insert_runs_bulk(conn, runs)
+            other.execute("BEGIN IMMEDIATE")
+            other.rollback()
+
 
 class TestGetLastSuccessfulRun(unittest.TestCase):
     def setUp(self):
@@ -272,6 +506,16 @@ class TestGetLastSuccessfulRun(unittest.TestCase):
             result = get_last_successful_run(conn, "official")
         self.assertIsNone(result)
 
+    def test_same_started_at_returns_later_insert(self):
+        self._insert(started_at="2026-01-15T10:00:00")
+        run_id2 = self._insert(started_at="2026-01-15T10:00:00")
+        run_id3 = self._insert(started_at="2026-01-15T10:00:00")
+        with get_connection(self.db_path) as conn:
+            latest = get_last_successful_run(conn, "official")
+            excluding = get_last_successful_run(conn, "official", exclude_run_id=run_id3)
+        self.assertEqual(latest["id"], run_id3)
+        self.assertEqual(excluding["id"], run_id2)
+
     def test_exclude_run_id(self):
         run_id1 = self._insert(started_at="2026-01-01T10:00:00")
         run_id2 = self._insert(started_at="2026-01-15T10:00:00")
@@ -280,6 +524,40 @@ class TestGetLastSuccessfulRun(unittest.TestCase):
         self.assertIsNotNone(result)
         self.assertEqual(result["id"], run_id1)
 
+    def test_data_decoded_only_on_first_access(self):
+        self._insert(data=_sample_data("February 2026"))
+        with get_connection(self.db_path) as conn:
+            with patch("store._loads_json", wraps=store_module._loads_json) as loads:
+                result = get_last_successful_run(conn, "official")
+                self.assertIsNotNone(result["bulletin_date"])
+                self.assertEqual(loads.call_count, 0)
+                self.assertEqual(result["data"]["bulletin_date"], "February 2026")
+                self.assertEqual(result.get("data")["bulletin_date"], "February 2026")
+                self.assertEqual(loads.call_count, 1)
+
+    def test_parse_data_false_leaves_json_undecoded(self):
+        self._insert(data=_sample_data("February 2026"))
+        with get_connection(self.db_path) as conn:
+            result = get_last_successful_run(conn, "official", parse_data=False)
+        self.assertNotIn("data", result)
+        self.assertEqual(json.loads(result["data_json"])["bulletin_date"], "February 2026")
+        self.assertEqual(parse_run_data(result), _sample_data("February 2026"))
+
+    def test_last_two_runs_in_one_query(self):
+        run_id1 = self._insert(started_at="2026-01-01T10:00:00")
+        run_id2 = self._insert(started_at="2026-01-15T10:00:00")
+        self._insert(success=False, started_at="2026-01-20T10:00:00")
+        with get_connection(self.db_path) as conn:
+            runs = get_last_successful_runs(conn, "official", limit=2)
+        self.assertEqual([r["id"] for r in runs], [run_id2, run_id1])
+
+    def test_last_two_runs_with_same_started_at_newest_first(self):
+        run_id1 = self._insert(started_at="2026-01-15T10:00:00")
+        run_id2 = self._insert(started_at="2026-01-15T10:00:00")
+        with get_connection(self.db_path) as conn:
+            runs = get_last_successful_runs(conn, "official", limit=2)
+        self.assertEqual([r["id"] for r in runs], [run_id2, run_id1])
+
     def test_data_json_deserialised(self):
         self._insert(data=_sample_data("February 2026"))
         with get_connection(self.db_path) as conn:
@@ -449,6 +727,78 @@ class TestGetRuns(unittest.TestCase):
         for r in runs:
             self.assertNotIn("data_json", r)
 
+    def test_iter_runs_matches_get_runs_across_batches(self):
+        with get_connection(self.db_path) as conn:
+            streamed = list(iter_runs(conn, batch_size=1))
+            listed = get_runs(conn)
+        self.assertEqual(streamed, listed)
+
+    def test_before_run_id_pages_through_all_runs(self):
+        with get_connection(self.db_path) as conn:
+            # Same started_at as the newest run: the id tie-break must keep it.
+            insert_run(conn, run_type="test", started_at="2026-02-01T10:00:00", success=True)
+            expected = [r["id"] for r in get_runs(conn)]
+            paged, cursor = [], None
+            while True:
+                page = get_runs(conn, limit=2, before_run_id=cursor)
+                if not page:
+                    break
+                paged += [r["id"] for r in page]
+                cursor = page[-1]["id"]
+        self.assertEqual(len(expected), 4)
+        self.assertEqual(paged, expected)
+
+    def test_before_unknown_run_id_returns_nothing(self):
+        with get_connection(self.db_path) as conn:
+            self.assertEqual(get_runs(conn, before_run_id=1), [])
+
+
+class TestHttpCache(unittest.TestCase):
+    def setUp(self):
+        self.db_path = _make_db()
+        init_db(self.db_path)
+
+    def tearDown(self):
+        os.unlink(self.db_path)
+
+    def test_unknown_url_returns_none(self):
+        with get_connection(self.db_path) as conn:
+            self.assertIsNone(get_http_cache(conn, "https://example.com/"))
+
+    def test_round_trip(self):
+        with get_connection(self.db_path) as conn:
+            upsert_http_cache(conn, "https://example.com/", "<html/>", etag='"abc"')
+            entry = get_http_cache(conn, "https://example.com/")
+        self.assertEqual(entry["body"], "<html/>")
+        self.assertEqual(entry["etag"], '"abc"')
+        self.assertIsNone(entry["last_modified"])
+
+    def test_upsert_replaces_existing_entry(self):
+        with get_connection(self.db_path) as conn:
+            upsert_http_cache(conn, "https://example.com/", "old", etag='"1"')
+            upsert_http_cache(conn, "https://example.com/", "new", etag='"2"')
+            entry = get_http_cache(conn, "https://example.com/")
+            count = conn.execute("SELECT COUNT(*) FROM http_cache").fetchone()[0]
+        self.assertEqual(entry["body"], "new")
+        self.assertEqual(entry["etag"], '"2"')
+        self.assertEqual(count, 1)
+
+    def test_cached_parse_round_trip(self):
+        data = _sample_data()
+        with get_connection(self.db_path) as conn:
+            upsert_http_cache(conn, "https://example.com/", "<html/>", etag='"1"')
+            set_cached_parse(conn, "https://example.com/", "<html/>", data)
+            self.assertEqual(get_cached_parse(conn, "https://example.com/", "<html/>"), data)
+            # A different body never matches the memo
+            self.assertIsNone(get_cached_parse(conn, "https://example.com/", "<html>new</html>"))
+
+    def test_new_body_drops_cached_parse(self):
+        with get_connection(self.db_path) as conn:
+            upsert_http_cache(conn, "https://example.com/", "old", etag='"1"')
+            set_cached_parse(conn, "https://example.com/", "old", _sample_data())
+            upsert_http_cache(conn, "https://example.com/", "old", etag='"2"')
+            self.assertIsNone(get_cached_parse(conn, "https://example.com/", "old"))
+
 
 if __name__ == "__main__":
     unittest.main()
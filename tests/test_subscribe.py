@@ -14,6 +14,7 @@ from store import (
     get_connection,
     get_subscription_by_email,
     init_db,
+    iter_active_subscriptions,
     upsert_subscription,
 )
 
@@ -104,6 +105,17 @@ class TestUpsertSubscription(unittest.TestCase):
         r2 = self._upsert(categories=["EB-2"])
         self.assertEqual(r1["unsubscribe_token"], r2["unsubscribe_token"])
 
+    def test_update_keeps_subscribed_at_and_sets_updated_at(self):
+        self._upsert(categories=["EB-1"])
+        with get_connection(self.db_path) as conn:
+            upsert_subscription(
+                conn, email="user@example.com", categories=["EB-2"],
+                subscribed_at="2026-03-01T00:00:00+00:00",
+            )
+            row = get_subscription_by_email(conn, "user@example.com")
+        self.assertEqual(row["subscribed_at"], _NOW)
+        self.assertEqual(row["updated_at"], "2026-03-01T00:00:00+00:00")
+
     # ------------------------------------------------------------------
     # Resubscribing after unsubscribing
     # ------------------------------------------------------------------
@@ -140,6 +152,34 @@ class TestUpsertSubscription(unittest.TestCase):
         self.assertEqual(row["ip_address"], "1.2.3.4")
         self.assertEqual(row["user_agent"], "TestBrowser/1.0")
 
+    # ------------------------------------------------------------------
+    # Batched writes (commit=False)
+    # ------------------------------------------------------------------
+
+    def test_commit_false_leaves_transaction_open(self):
+        with get_connection(self.db_path) as conn:
+            upsert_subscription(
+                conn, email="a@example.com", categories=["EB-1"],
+                subscribed_at=_NOW, commit=False,
+            )
+            self.assertTrue(conn.in_transaction)
+            conn.rollback()
+        with get_connection(self.db_path) as conn:
+            self.assertIsNone(get_subscription_by_email(conn, "a@example.com"))
+
+    def test_commit_false_batch_gets_distinct_ids(self):
+        with get_connection(self.db_path) as conn:
+            r1 = upsert_subscription(
+                conn, email="a@example.com", categories=["EB-1"],
+                subscribed_at=_NOW, commit=False,
+            )
+            r2 = upsert_subscription(
+                conn, email="b@example.com", categories=["EB-2"],
+                subscribed_at=_NOW, commit=False,
+            )
+            conn.commit()
+        self.assertNotEqual(r1["id"], r2["id"])
+
 
 class TestGetSubscriptionByEmail(unittest.TestCase):
     def setUp(self):
@@ -230,6 +270,59 @@ class TestGetActiveSubscriptionsForCategory(unittest.TestCase):
             subs = get_active_subscriptions_for_category(conn, "EB-2")
         self.assertEqual(len(subs), 2)
 
+    def test_changed_categories_replace_the_old_ones(self):
+        self._upsert("a@x.com", ["EB-2"])
+        self._upsert("a@x.com", ["F1"])
+        with get_connection(self.db_path) as conn:
+            self.assertEqual(get_active_subscriptions_for_category(conn, "EB-2"), [])
+            self.assertEqual(len(get_active_subscriptions_for_category(conn, "F1")), 1)
+
+    def test_init_db_drops_old_category_side_table(self):
+        with get_connection(self.db_path) as conn:
+            conn.execute(
+                "CREATE TABLE subscription_categories (category_key TEXT, "
+                "subscription_id INTEGER REFERENCES subscriptions(id))"
+            )
+            conn.commit()
+        init_db(self.db_path)
+        with get_connection(self.db_path) as conn:
+            table = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'subscription_categories'"
+            ).fetchone()
+        self.assertIsNone(table)
+
+
+class TestIterActiveSubscriptions(unittest.TestCase):
+    def setUp(self):
+        self.db_path = _make_db()
+        init_db(self.db_path)
+
+    def tearDown(self):
+        os.unlink(self.db_path)
+
+    def _upsert(self, email, categories):
+        with get_connection(self.db_path) as conn:
+            return upsert_subscription(conn, email, categories, _NOW)
+
+    def test_yields_projected_dicts_across_batches(self):
+        for i in range(5):
+            self._upsert(f"user{i}@x.com", ["EB-2"])
+        with get_connection(self.db_path) as conn:
+            subs = list(iter_active_subscriptions(conn, batch_size=2))
+        self.assertEqual(len(subs), 5)
+        self.assertEqual(
+            set(subs[0]), {"email", "categories", "unsubscribe_token"}
+        )
+        self.assertEqual(subs[0]["categories"], ["EB-2"])
+
+    def test_excludes_inactive_subscriptions(self):
+        self._upsert("a@x.com", ["EB-2"])
+        r = self._upsert("b@x.com", ["F1"])
+        with get_connection(self.db_path) as conn:
+            deactivate_subscription(conn, r["unsubscribe_token"])
+            emails = [s["email"] for s in iter_active_subscriptions(conn)]
+        self.assertEqual(emails, ["a@x.com"])
+
 
 class TestDeactivateSubscription(unittest.TestCase):
     def setUp(self):